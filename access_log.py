@@ -0,0 +1,147 @@
+"""
+access_log.py — 요청 경로에서 I/O 를 뺀 access log (ring buffer + background writer + 알림 digest)
+
+- 미들웨어는 항목을 메모리 ring buffer(deque, maxlen=capacity)에 넣기만 함
+  (버퍼가 가득 차면 가장 오래된 항목부터 버리고 dropped 로 집계)
+- background task 가 flush_ms 마다 버퍼를 비워 access_log.jsonl 에 한 번에 append
+  (파일 I/O 는 이벤트 루프 밖 스레드)
+- 데스크톱 알림(plyer)은 요청마다가 아니라 digest_secs 주기로 요약 1건
+    "37 requests from 3 IPs in the last 30s"
+  notify=False 면 알림 없이 콘솔 요약만 출력 (headless 배포)
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, List, Optional, Set
+
+
+class AccessLog:
+    def __init__(self, path, capacity: int = 10000, flush_ms: int = 500,
+                 digest_secs: int = 30, notify: bool = True,
+                 serialize: Optional[Callable[[dict], str]] = None):
+        self.path = Path(path)
+        self.capacity = max(capacity, 1)
+        self.flush_secs = max(flush_ms, 10) / 1000.0
+        self.digest_secs = max(digest_secs, 1)
+        self.notify = notify
+        self.serialize = serialize or (lambda e: json.dumps(e, ensure_ascii=False))
+        self._buf: Deque[dict] = deque(maxlen=self.capacity)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._notifier = None
+        # digest 창 집계
+        self._win_requests = 0
+        self._win_ips: Set[str] = set()
+        self._win_start = time.monotonic()
+        # 통계
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.digests = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def record(self, entry: dict):
+        """요청 경로에서 호출: 메모리에만 적재 (I/O 없음)"""
+        if len(self._buf) >= self.capacity:
+            self.dropped += 1
+        self._buf.append(entry)
+        self.recorded += 1
+        self._win_requests += 1
+        self._win_ips.add(entry.get("client_ip") or "-")
+
+    async def start(self):
+        if self.running:
+            return
+        self._stopping = False
+        self._win_start = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """남은 항목을 기록하고 종료 (종료 시 알림은 생략)"""
+        if not self.running:
+            return
+        self._stopping = True
+        await self._task
+        self._task = None
+        await asyncio.get_running_loop().run_in_executor(None, self._write, self._drain())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while not self._stopping:
+            await asyncio.sleep(self.flush_secs)
+            batch = self._drain()
+            if batch:
+                await loop.run_in_executor(None, self._write, batch)
+            if time.monotonic() - self._win_start >= self.digest_secs:
+                await self._digest(loop)
+
+    def _drain(self) -> List[dict]:
+        out = []
+        buf = self._buf
+        while buf:
+            try:
+                out.append(buf.popleft())
+            except IndexError:
+                break
+        return out
+
+    def _write(self, batch: List[dict]):
+        if not batch:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write("".join(self.serialize(e) + "\n" for e in batch))
+            self.written += len(batch)
+        except Exception as e:
+            self.last_error = str(e)
+
+    async def _digest(self, loop):
+        requests, ips = self._win_requests, len(self._win_ips)
+        window = int(round(time.monotonic() - self._win_start))
+        self._win_requests = 0
+        self._win_ips = set()
+        self._win_start = time.monotonic()
+        if not requests:
+            return
+        message = f"{requests} requests from {ips} IP{'s' if ips != 1 else ''} in the last {window}s"
+        self.digests += 1
+        print(f"🔔 API Access: {message}")
+        if self.notify:
+            await loop.run_in_executor(None, self._notify, message)
+
+    def _notify(self, message: str):
+        if self._notifier is None:
+            try:
+                from plyer import notification  # type: ignore
+                self._notifier = notification
+            except Exception as e:
+                print(f"❌ 알림 비활성화 (plyer 사용 불가): {e}")
+                self.notify = False
+                return
+        try:
+            self._notifier.notify(title="HVDC API Access", message=message, timeout=5)
+        except Exception as e:
+            print(f"❌ 알림 실패: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "path": str(self.path),
+            "buffered": len(self._buf),
+            "capacity": self.capacity,
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "digests": self.digests,
+            "notify": self.notify,
+            "digest_secs": self.digest_secs,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,180 @@
+"""
+arrow_format.py — KPI / logs 응답 형식 (`format=json|arrow|parquet`)
+
+- arrow  : Arrow IPC stream (application/vnd.apache.arrow.stream) → pyarrow.ipc.open_stream / pl.read_ipc
+- parquet: Parquet 파일 1개 (application/vnd.apache.parquet) → pd.read_parquet(io.BytesIO(...))
+- json   : 기존 JSON. DuckDB 결과는 Arrow 테이블에서 컬럼 단위(to_pylist)로 dict 생성 (df.iterrows 없음)
+- iter_encode / stream_records: record batch 를 기록할 때마다 그만큼의 bytes 를 내보냄 (StreamingResponse 용).
+  encode() 는 캐시/ETag 처럼 body 전체가 필요한 곳에서 같은 writer 로 모은 bytes
+- pyarrow 는 선택 의존성: 없으면 ARROW_AVAILABLE=False → arrow/parquet 은 406, json 은 행 단위 경로
+"""
+
+import io
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.ipc  # type: ignore  # noqa: F401
+    import pyarrow.parquet as pq  # type: ignore
+    ARROW_AVAILABLE = True
+except Exception:
+    pa = None  # type: ignore
+    pq = None  # type: ignore
+    ARROW_AVAILABLE = False
+
+FORMAT_PATTERN = "^(json|arrow|parquet)$"
+MEDIA_TYPES = {
+    "json": "application/json",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# (이름, pyarrow 타입 이름) — pyarrow 없이도 import 가능하도록 문자열로 둠
+KPI_COLUMNS: Sequence[Tuple[str, str]] = (
+    ("date", "date32"),
+    ("group_name", "string"),
+    ("logs_count", "int64"),
+    ("total_sla_breaches", "int64"),
+    ("unique_keywords_count", "int64"),
+)
+# granularity=hour 는 구간 시작 시각 (timestamp[s]), 나머지는 구간 시작 일자
+KPI_HOURLY_COLUMNS: Sequence[Tuple[str, str]] = (("date", "timestamp"),) + tuple(KPI_COLUMNS[1:])
+LOGS_COLUMNS: Sequence[Tuple[str, str]] = (
+    ("date_gst", "string"),
+    ("group_name", "string"),
+    ("summary", "string"),
+    ("top_keywords", "list<string>"),
+    ("sla_breaches", "int64"),
+    ("attachments", "list<string>"),
+    ("created_at", "string"),
+    ("request_id", "string"),
+    ("processed_status", "string"),
+)
+
+
+def kpi_columns(granularity: str = "day") -> Sequence[Tuple[str, str]]:
+    return KPI_HOURLY_COLUMNS if granularity == "hour" else KPI_COLUMNS
+
+
+def _type(name: str):
+    if name == "list<string>":
+        return pa.list_(pa.string())
+    if name == "timestamp":
+        return pa.timestamp("s")
+    return getattr(pa, name)()
+
+
+def schema(columns: Sequence[Tuple[str, str]]):
+    return pa.schema([(n, _type(t)) for n, t in columns])
+
+
+def is_table(obj: Any) -> bool:
+    return ARROW_AVAILABLE and isinstance(obj, pa.Table)
+
+
+def fetch_table(res):
+    """DuckDB 결과 → Arrow 테이블 (1.5+ to_arrow_table, 이전 버전 fetch_arrow_table)"""
+    fetch = getattr(res, "to_arrow_table", None) or res.fetch_arrow_table
+    return fetch()
+
+
+def conform(table, columns: Sequence[Tuple[str, str]]):
+    """이름으로 컬럼 선택 + 타입 cast (DuckDB HUGEINT sum, TIMESTAMP date 등을 고정 schema 로)"""
+    return pa.Table.from_arrays(
+        [table.column(n).cast(_type(t)) for n, t in columns], schema=schema(columns))
+
+
+def from_columns(data: Dict[str, Iterable[Any]], columns: Sequence[Tuple[str, str]]):
+    """컬럼별 Python 값 → 테이블. 날짜/시각 문자열은 string 배열을 거쳐 cast"""
+    arrays = []
+    for n, t in columns:
+        values = list(data[n])
+        if t.startswith("date") or t == "timestamp":
+            arrays.append(pa.array(values, pa.string()).cast(_type(t)))
+        else:
+            arrays.append(pa.array(values, _type(t)))
+    return pa.Table.from_arrays(arrays, schema=schema(columns))
+
+
+def from_records(records: List[dict], columns: Sequence[Tuple[str, str]]):
+    return from_columns({n: [r.get(n) for r in records] for n, _ in columns}, columns)
+
+
+def to_records(table) -> List[dict]:
+    """컬럼마다 to_pylist 1회 후 zip (행마다 Python 객체를 거치지 않음). 날짜/시각은 ISO 문자열"""
+    names = table.column_names
+    cols = []
+    for col in table.columns:
+        if pa.types.is_date(col.type) or pa.types.is_timestamp(col.type):
+            col = col.cast(pa.string())
+        cols.append(col.to_pylist())
+    return [dict(zip(names, row)) for row in zip(*cols)]
+
+
+class _ChunkSink(io.RawIOBase):
+    """writer 출력을 모았다가 drain() 으로 넘김. tell() 은 누적 위치 (Parquet footer offset 용)"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        data = bytes(b)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def iter_encode(batches: Iterable[Any], schema_, fmt: str) -> Iterator[bytes]:
+    """record batch 마다 기록된 bytes 를 yield (arrow: IPC message, parquet: row group, 마지막에 EOS / footer)"""
+    sink = _ChunkSink()
+    if fmt == "arrow":
+        writer = pa.ipc.new_stream(sink, schema_)
+        write = writer.write_batch
+    elif fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema_)
+        write = lambda batch: writer.write_table(pa.Table.from_batches([batch], schema=schema_))  # noqa: E731
+    else:
+        raise ValueError(f"unsupported format: {fmt}")
+    closed = False
+    try:
+        for batch in batches:
+            write(batch)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+        writer.close()
+        closed = True
+        yield sink.drain()
+    finally:
+        if not closed:
+            writer.close()
+
+
+def encode(table, fmt: str, metadata: Optional[Dict[str, str]] = None) -> bytes:
+    """Arrow IPC stream 또는 Parquet bytes (record batch 단위로 기록, 전체 복사 없음)"""
+    if metadata:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                               **{k: str(v) for k, v in metadata.items()}})
+    return b"".join(iter_encode(table.to_batches(), table.schema, fmt))
+
+
+def stream_records(records: List[dict], columns: Sequence[Tuple[str, str]], fmt: str,
+                   batch_rows: int = 1000) -> Iterator[bytes]:
+    """dict 행 → batch_rows 행씩 record batch 로 만들어 바로 기록 (전체 테이블 / 인코딩된 body 를 만들지 않음)"""
+    schema_ = schema(columns)
+    step = max(batch_rows, 1)
+    batches = (batch for i in range(0, len(records), step)
+               for batch in from_records(records[i:i + step], columns).to_batches())
+    return iter_encode(batches, schema_, fmt)
@@ -0,0 +1,239 @@
+"""
+duckdb_pool.py — KPI 조회용 장수명 read-only DuckDB 커넥션 (serving snapshot)
+
+- 요청마다 duckdb.connect/close (catalog 로드, buffer pool 워밍업) 대신 프로세스당 커넥션 1개를 유지
+- 원본 파일을 직접 열어 두면 파이프라인(bronze/silver/run_pipeline.py)의 쓰기 lock 과 충돌하므로
+  publish 시점에 원본을 serving_dir 로 복사(snapshot)하고 복사본을 read_only 로 연다
+    · 복사 중에는 원본을 read_only 로 잠깐 열어 두어 writer 가 끼어들지 않게 함 (일관된 snapshot)
+    · writer 가 실행 중이면 lock 실패 → 기존 snapshot 으로 계속 응답, check_interval 뒤 재시도
+    · writer_active() 가 참이면 (다른 프로세스의 파이프라인 lease 보유 중) 원본을 열지 않고 publish 를 미룸
+      → 파이프라인 subprocess 의 쓰기 connect 가 guard lock 에 걸려 실패하지 않음
+- 원본 (mtime, size) 이 바뀌거나 refresh() 가 호출되면 새 snapshot 으로 교체 (generation 증가)
+- 스레드마다 cursor() (같은 DB 인스턴스, 독립 커넥션) 를 만들어 재사용하고,
+  cursor 별로 PREPARE 한 statement 를 EXECUTE 로 재사용 (generation 이 바뀌면 다시 준비)
+"""
+
+import glob
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Sequence, Tuple, Union
+
+
+class SnapshotDeferred(RuntimeError):
+    """아직 snapshot 이 없고 writer 실행 중이라 만들 수 없음 → 원본 직접 connect 대신 호출 측 fallback"""
+
+
+def sql_literal(value: Any) -> str:
+    """EXECUTE 인자용 리터럴 (DuckDB 는 EXECUTE 에 ? 바인딩을 지원하지 않음)"""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class DuckDBReadPool:
+    def __init__(self, source: Union[str, Path], serving_dir: Union[str, Path],
+                 check_interval_secs: float = 1.0, threads: Optional[int] = None,
+                 writer_active: Optional[Callable[[], bool]] = None):
+        self.source = Path(source)
+        self.serving_dir = Path(serving_dir)
+        self.check_interval_secs = check_interval_secs
+        self.threads = threads
+        self.writer_active = writer_active
+        self._conn = None
+        self._path: Optional[Path] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self.generation = 0
+        self._publish_lock = threading.Lock()
+        self._local = threading.local()
+        self._next_check = 0.0
+        self._force = False
+        self.publishes = 0
+        self.publish_failures = 0
+        self.publish_deferred = 0
+        self._deferred = False
+        self.last_error: Optional[str] = None
+        self.last_publish_secs: Optional[float] = None
+        self.cursors_created = 0
+        self.prepared = 0
+
+    # --- snapshot ---
+    def _source_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.source.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def refresh(self):
+        """파이프라인 완료 알림: 다음 조회에서 snapshot 교체"""
+        self._force = True
+        self._next_check = 0.0
+
+    def _maybe_publish(self):
+        now = time.monotonic()
+        if self._conn is not None and now < self._next_check:
+            return
+        sig = self._source_signature()
+        if sig is None:
+            return
+        if self._conn is not None and sig == self._signature and not self._force:
+            self._next_check = now + self.check_interval_secs
+            return
+        # 파이프라인이 원본에 쓰는 중: guard lock 을 잡지 않고 기존 snapshot 유지 (없으면 호출 측 fallback)
+        if self._writer_busy():
+            self.publish_deferred += 1
+            self._deferred = True
+            self._next_check = now + self.check_interval_secs
+            return
+        self._deferred = False
+        # 다른 스레드가 교체 중이면 기존 snapshot 사용 (처음 여는 경우만 대기)
+        if not self._publish_lock.acquire(blocking=self._conn is None):
+            return
+        try:
+            if self._conn is None or sig != self._signature or self._force:
+                self._publish(sig)
+        finally:
+            self._next_check = time.monotonic() + self.check_interval_secs
+            self._publish_lock.release()
+
+    def _writer_busy(self) -> bool:
+        if self.writer_active is None:
+            return False
+        try:
+            return bool(self.writer_active())
+        except Exception:
+            return False
+
+    def _publish(self, sig: Tuple[int, int]):
+        import duckdb  # 선택 의존성: 없으면 호출 측 fallback
+
+        t0 = time.perf_counter()
+        self.serving_dir.mkdir(parents=True, exist_ok=True)
+        gen = self.generation + 1
+        target = self.serving_dir / f"{self.source.stem}.serving.{os.getpid()}.{gen}.duckdb"
+        try:
+            # 원본 read_only 연결 = 공유 lock → 복사하는 동안 writer 차단 (writer 실행 중이면 여기서 실패)
+            guard = duckdb.connect(str(self.source), read_only=True)
+            try:
+                sig = self._source_signature() or sig
+                shutil.copyfile(self.source, target)
+                wal = Path(str(self.source) + ".wal")
+                if wal.exists():
+                    shutil.copyfile(wal, Path(str(target) + ".wal"))
+            finally:
+                guard.close()
+            config = {"threads": self.threads} if self.threads else {}
+            conn = duckdb.connect(str(target), read_only=True, config=config)
+        except Exception as e:
+            self.publish_failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            for p in (target, Path(str(target) + ".wal")):
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+            if self._conn is None:
+                raise
+            return
+        old, old_path = self._conn, self._path
+        self._conn, self._path, self._signature = conn, target, sig
+        self.generation = gen
+        self._force = False
+        self.publishes += 1
+        self.last_error = None
+        self.last_publish_secs = round(time.perf_counter() - t0, 4)
+        # 이전 snapshot: 부모 커넥션만 닫음 (사용 중인 cursor 는 DB 인스턴스를 계속 참조)
+        if old is not None:
+            try:
+                old.close()
+            except Exception:
+                pass
+        self._cleanup(keep=target, previous=old_path)
+
+    def _cleanup(self, keep: Path, previous: Optional[Path]):
+        """이 프로세스의 오래된 snapshot 삭제 (직전 것은 아직 cursor 가 쓰고 있을 수 있어 한 세대 유지)"""
+        pattern = str(self.serving_dir / f"{self.source.stem}.serving.{os.getpid()}.*.duckdb*")
+        keep_names = {keep.name, keep.name + ".wal"}
+        if previous is not None:
+            keep_names |= {previous.name, previous.name + ".wal"}
+        for path in glob.glob(pattern):
+            if os.path.basename(path) not in keep_names:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        """같은 프로세스에서 원본에 쓰는 동안 publish(원본 read_only 연결)를 막고, 끝나면 교체 예약"""
+        with self._publish_lock:
+            yield
+        self.refresh()
+
+    # --- 조회 ---
+    @contextmanager
+    def cursor(self) -> Iterator[Any]:
+        """현재 snapshot 의 스레드 전용 cursor (snapshot 이 없고 만들 수도 없으면 예외)"""
+        self._maybe_publish()
+        if self._conn is None and self._deferred:
+            raise SnapshotDeferred(f"DuckDB source is being written: {self.source}")
+        if self._conn is None:
+            raise RuntimeError(f"DuckDB source not available: {self.source}")
+        local = self._local
+        if getattr(local, "generation", None) != self.generation or local.cursor is None:
+            if getattr(local, "cursor", None) is not None:
+                try:
+                    local.cursor.close()
+                except Exception:
+                    pass
+            local.cursor = self._conn.cursor()
+            local.generation = self.generation
+            local.prepared = set()
+            self.cursors_created += 1
+        yield local.cursor
+
+    def execute_prepared(self, cur, name: str, sql: str, args: Sequence[Any]):
+        """cursor 별 PREPARE 1회 → EXECUTE name(args). 결과는 cursor 로 (fetchall / fetch_arrow_table)"""
+        prepared = self._local.prepared
+        if name not in prepared:
+            cur.execute(f"PREPARE {name} AS {sql}")
+            prepared.add(name)
+            self.prepared += 1
+        return cur.execute(f"EXECUTE {name}({', '.join(sql_literal(a) for a in args)})")
+
+    def close(self):
+        with self._publish_lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+            self._conn = None
+            self._local = threading.local()
+            for path in glob.glob(str(self.serving_dir / f"{self.source.stem}.serving.{os.getpid()}.*.duckdb*")):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+    def stats(self) -> dict:
+        return {
+            "source": str(self.source),
+            "snapshot": str(self._path) if self._path else None,
+            "generation": self.generation,
+            "publishes": self.publishes,
+            "publish_failures": self.publish_failures,
+            "publish_deferred": self.publish_deferred,
+            "last_publish_secs": self.last_publish_secs,
+            "last_error": self.last_error,
+            "cursors_created": self.cursors_created,
+            "prepared_statements": self.prepared,
+        }
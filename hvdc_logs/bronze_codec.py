@@ -0,0 +1,205 @@
+"""
+Bronze segment codec — plain / gzip / zstd framed JSONL
+
+압축 segment 는 N 레코드마다 독립적으로 해제 가능한 frame 으로 기록된다.
+- gzip : frame = gzip member   (여러 member 를 이어 붙인 파일도 표준 .gz)
+- zstd : frame = zstd frame    (`zstandard` 패키지 필요, 없으면 gzip 사용)
+각 segment 옆에 `<segment>.idx` sidecar 를 두고 frame 마다 한 줄씩
+{"offset", "length", "first", "records"} 를 기록하므로, 특정 frame 으로 바로 seek 해서
+부분만 읽을 수 있다. sidecar 가 없어도 전체 순차 읽기는 가능하다.
+
+Reader (파이프라인 공용):
+- list_segments(root)      : *.jsonl / *.jsonl.gz / *.jsonl.zst segment 목록
+- iter_records(path)       : 포맷과 무관하게 dict 레코드 순회
+- read_index(path)         : frame 인덱스
+- read_frame(path, n)      : n 번째 frame 의 레코드만 읽기
+- resume_point(path, n)    : n 번째 레코드가 들어 있는 frame 의 byte offset (증분 적재)
+- iter_records_from(path, offset) / iter_complete_lines(path, offset) : offset 부터 읽기
+- write_plain(path, out)    : 압축 segment 를 plain JSONL 로 풀어 쓰기 (polars scan_ndjson 등 외부 reader 용)
+"""
+
+import gzip
+import io
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    import zstandard  # type: ignore
+    ZSTD_AVAILABLE = True
+except Exception:
+    zstandard = None  # type: ignore
+    ZSTD_AVAILABLE = False
+
+PLAIN = "none"
+GZIP = "gzip"
+ZSTD = "zstd"
+
+SUFFIXES = {PLAIN: ".jsonl", GZIP: ".jsonl.gz", ZSTD: ".jsonl.zst"}
+INDEX_SUFFIX = ".idx"
+
+PathLike = Union[str, Path]
+
+
+def resolve_compression(name: Optional[str]) -> str:
+    """설정값 → PLAIN/GZIP/ZSTD (zstd 미설치 시 gzip 으로 대체)"""
+    name = (name or PLAIN).lower()
+    if name in ("", "none", "off", "plain"):
+        return PLAIN
+    if name in ("gz", "gzip"):
+        return GZIP
+    if name in ("zst", "zstd"):
+        return ZSTD if ZSTD_AVAILABLE else GZIP
+    raise ValueError(f"unknown bronze compression: {name}")
+
+
+def compression_of(path: PathLike) -> str:
+    name = str(path)
+    if name.endswith(SUFFIXES[GZIP]):
+        return GZIP
+    if name.endswith(SUFFIXES[ZSTD]):
+        return ZSTD
+    return PLAIN
+
+
+def compress_frame(data: bytes, compression: str, level: int = 3) -> bytes:
+    if compression == GZIP:
+        return gzip.compress(data, compresslevel=min(max(level, 1), 9), mtime=0)
+    if compression == ZSTD:
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return data
+
+
+def decompress_frame(data: bytes, compression: str) -> bytes:
+    if compression == GZIP:
+        return gzip.decompress(data)
+    if compression == ZSTD:
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+def index_path(path: PathLike) -> Path:
+    return Path(str(path) + INDEX_SUFFIX)
+
+
+def index_entry(offset: int, length: int, first: int, records: int) -> str:
+    return json.dumps({"offset": offset, "length": length, "first": first, "records": records}) + "\n"
+
+
+# --- Reader ---
+def list_segments(root: PathLike, recursive: bool = True) -> List[Path]:
+    """root 아래 Bronze segment (plain/gzip/zstd) 를 이름순으로 반환"""
+    root = Path(root)
+    if not root.exists():
+        return []
+    pattern = "**/*" if recursive else "*"
+    suffixes = tuple(SUFFIXES.values())
+    return sorted(p for p in root.glob(pattern) if p.is_file() and p.name.endswith(suffixes))
+
+
+def _iter_lines(path: Path, offset: int = 0) -> Iterator[bytes]:
+    compression = compression_of(path)
+    if compression == GZIP:
+        with path.open("rb") as raw:
+            raw.seek(offset)  # member 경계
+            with gzip.GzipFile(fileobj=raw, mode="rb") as f:  # 여러 member 를 연속으로 읽음
+                yield from f
+    elif compression == ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError(f"zstandard is required to read {path}")
+        with path.open("rb") as raw:
+            raw.seek(offset)  # frame 경계
+            reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+            yield from io.BufferedReader(reader)
+    else:
+        with path.open("rb") as f:
+            f.seek(offset)
+            yield from f
+
+
+def _decode(lines: Iterable[bytes]) -> Iterator[dict]:
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+
+def iter_records(path: PathLike) -> Iterator[dict]:
+    """segment 하나의 레코드를 순서대로 반환 (빈 줄/잘린 마지막 줄은 건너뜀)"""
+    return _decode(_iter_lines(Path(path)))
+
+
+def iter_records_from(path: PathLike, offset: int = 0) -> Iterator[dict]:
+    """byte offset (압축: frame 경계, plain: 줄 경계) 부터 레코드 순회"""
+    return _decode(_iter_lines(Path(path), offset))
+
+
+def iter_complete_lines(path: PathLike, offset: int = 0) -> Iterator[Tuple[int, bytes]]:
+    """plain segment 의 offset 부터 개행으로 끝난 줄만 (다음 줄 offset, 줄).
+    writer 가 아직 쓰는 중인 마지막 줄은 돌려주지 않음 → 다음 호출에서 그 offset 부터"""
+    with Path(path).open("rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            offset += len(line)
+            yield offset, line
+
+
+def iter_all_records(paths: Iterable[PathLike]) -> Iterator[dict]:
+    for p in paths:
+        yield from iter_records(p)
+
+
+def read_index(path: PathLike) -> List[dict]:
+    """frame 인덱스 (sidecar 없으면 plain 은 단일 frame, 압축은 빈 목록)"""
+    idx = index_path(path)
+    if not idx.exists():
+        if compression_of(path) == PLAIN and Path(path).exists():
+            return [{"offset": 0, "length": os.path.getsize(path), "first": 0, "records": None}]
+        return []
+    entries = []
+    with idx.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    return entries
+
+
+def read_frame(path: PathLike, frame_no: int) -> List[dict]:
+    """인덱스로 n 번째 frame 위치에 seek 해서 해당 레코드만 읽기"""
+    entries = read_index(path)
+    entry = entries[frame_no]
+    with Path(path).open("rb") as f:
+        f.seek(entry["offset"])
+        data = f.read(entry["length"])
+    data = decompress_frame(data, compression_of(path))
+    return [json.loads(line) for line in data.splitlines() if line.strip()]
+
+
+def write_plain(path: PathLike, out) -> int:
+    """segment 를 줄 단위로 해제해 out (binary file) 에 기록 (전체를 메모리에 올리지 않음). 기록한 줄 수"""
+    n = 0
+    for line in _iter_lines(Path(path)):
+        if not line.strip():
+            continue
+        out.write(line if line.endswith(b"\n") else line + b"\n")
+        n += 1
+    return n
+
+
+def resume_point(path: PathLike, records: int) -> Tuple[int, int]:
+    """압축 segment 에서 앞의 records 개를 건너뛰고 읽을 위치: (frame byte offset, 그 frame 안에서 건너뛸 레코드 수).
+    sidecar 가 없으면 (0, records) — 처음부터 해제하며 건너뜀"""
+    start, first = 0, 0
+    for entry in read_index(path):
+        if entry.get("records") is None or entry["first"] > records:
+            break
+        start, first = entry["offset"], entry["first"]
+    return start, records - first
@@ -1,17 +1,153 @@
-﻿import duckdb, os
+﻿import duckdb, os, sys, json
+from pathlib import Path
+import pandas as pd
+
+try:
+    from .bronze_codec import PLAIN, compression_of, iter_complete_lines, iter_records_from, list_segments, resume_point
+    from .kpi_rollups import refresh_hybrid_kpi
+except ImportError:  # python bronze_stage.py 로 직접 실행
+    from bronze_codec import PLAIN, compression_of, iter_complete_lines, iter_records_from, list_segments, resume_point
+    from kpi_rollups import refresh_hybrid_kpi
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DUCKDB_FILE = os.path.join(BASE_DIR, 'duckdb', 'hvdc.duckdb')
 INPUT_DIR = os.path.join(BASE_DIR, 'input')
+BRONZE_DIR = os.path.join(BASE_DIR, 'bronze')
+BRONZE_COLUMNS = ['request_id', 'date_gst', 'group_name', 'summary', 'top_keywords',
+                  'sla_breaches', 'attachments', 'created_at', 'source']
+CHUNK_ROWS = 50000
+# hybrid KPI: API 적재 ~ Bronze 기록 사이 허용 지연 (tail 을 mark 보다 이만큼 앞에서 시작)
+WATERMARK_OVERLAP_SECS = int(os.getenv('KPI_WATERMARK_OVERLAP_SECS', '300'))
 
 def load_csv_to_duckdb():
     con = duckdb.connect(DUCKDB_FILE)
+    input_dir = INPUT_DIR.replace("\\", "/")
     con.execute(f'''
         CREATE OR REPLACE TABLE raw_logs AS
-        SELECT * FROM read_csv_auto('{INPUT_DIR.replace("\\", "/")}/*.csv', ignore_errors=true)
+        SELECT * FROM read_csv_auto('{input_dir}/*.csv', ignore_errors=true)
     ''')
     con.close()
     print('[BRONZE] CSV loaded to raw_logs')
 
+BRONZE_LOGS_DDL = '''
+    CREATE TABLE IF NOT EXISTS bronze_logs (
+        request_id VARCHAR, date_gst VARCHAR, group_name VARCHAR, summary VARCHAR,
+        top_keywords VARCHAR[], sla_breaches BIGINT, attachments VARCHAR[],
+        created_at VARCHAR, source VARCHAR, source_file VARCHAR
+    )
+'''
+# segment 별 적재 위치: plain 은 다음 줄 byte offset, 압축은 레코드 수 (frame 인덱스로 seek)
+LOAD_STATE_DDL = '''
+    CREATE TABLE IF NOT EXISTS bronze_load_state (
+        source_file VARCHAR PRIMARY KEY, size BIGINT, byte_offset BIGINT, records BIGINT,
+        loaded_at TIMESTAMP DEFAULT current_timestamp
+    )
+'''
+
+def _table_type(con, name):
+    row = con.execute("SELECT table_type FROM information_schema.tables WHERE table_name = ?", [name]).fetchone()
+    return row[0] if row else None
+
+def load_bronze_to_duckdb(full=False):
+    """Bronze segment(.jsonl / .jsonl.gz / .jsonl.zst) → bronze_logs 테이블.
+    segment 별로 지난 실행이 읽은 위치(bronze_load_state) 이후만 적재 (full=True: 전체 다시 적재)"""
+    con = duckdb.connect(DUCKDB_FILE)
+    # 이전 버전은 bronze_logs 를 view 로 만들었음 (테이블에 DROP VIEW 는 Catalog Error → view 일 때만)
+    if _table_type(con, 'bronze_logs') == 'VIEW':
+        con.execute('DROP VIEW bronze_logs')
+        full = True
+    if full or _table_type(con, 'bronze_load_state') is None:  # 적재 위치 기록 전 버전의 테이블도 다시 적재
+        con.execute('DROP TABLE IF EXISTS bronze_logs')
+        con.execute('DROP TABLE IF EXISTS bronze_load_state')
+    con.execute(BRONZE_LOGS_DDL)
+    con.execute(LOAD_STATE_DDL)
+    state = {r[0]: r[1:] for r in con.execute(
+        'SELECT source_file, size, byte_offset, records FROM bronze_load_state').fetchall()}
+    segments = {Path(p).relative_to(BRONZE_DIR).as_posix(): p for p in list_segments(BRONZE_DIR)}
+    total = changed = skipped = 0
+    con.execute('BEGIN TRANSACTION')
+    try:
+        for key in sorted(set(state) - set(segments)):  # 삭제된 segment
+            con.execute('DELETE FROM bronze_logs WHERE source_file = ?', [key])
+            con.execute('DELETE FROM bronze_load_state WHERE source_file = ?', [key])
+        for key, path in segments.items():
+            size = path.stat().st_size
+            prev = state.get(key)
+            if prev is not None and size == prev[0]:
+                continue
+            if prev is not None and size < prev[0]:  # 잘렸거나 교체됨 → segment 전체 다시
+                con.execute('DELETE FROM bronze_logs WHERE source_file = ?', [key])
+                prev = None
+            added, dups, offset, records = _load_segment(con, path, key, prev[1:] if prev else (0, 0))
+            con.execute('INSERT OR REPLACE INTO bronze_load_state VALUES (?, ?, ?, ?, current_timestamp)',
+                        [key, size, offset, records])
+            total += added
+            skipped += dups
+            changed += 1
+        con.execute('COMMIT')
+    except Exception:
+        con.execute('ROLLBACK')
+        con.close()
+        raise
+    # mark 와 hybrid rollup 을 방금 적재한 bronze_logs 에서 함께 갱신
+    high_water = refresh_hybrid_kpi(con, WATERMARK_OVERLAP_SECS)
+    rows = con.execute('SELECT COUNT(*) FROM bronze_logs').fetchone()[0]
+    con.close()
+    print(f'[BRONZE] {total} new records from {changed}/{len(segments)} segments loaded to bronze_logs ({rows} rows, {skipped} duplicate import rows skipped)')
+    print(f'[BRONZE] hybrid KPI high-water mark: {high_water}')
+
+def _load_segment(con, path, key, position):
+    """position (byte_offset, records) 이후 레코드 적재 → (읽은 수, 중복 제외 수, 새 byte_offset, 새 records)"""
+    offset, records = position
+    if compression_of(path) == PLAIN:
+        def _records():
+            nonlocal offset
+            for offset, line in iter_complete_lines(path, offset):
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        source = _records()
+    else:
+        start, skip = resume_point(path, records)
+        source = iter_records_from(path, start)
+        for _ in range(skip):
+            if next(source, None) is None:
+                break
+    added = inserted = 0
+    chunk = []
+    for rec in source:
+        chunk.append([rec.get(c) for c in BRONZE_COLUMNS] + [key])
+        if len(chunk) >= CHUNK_ROWS:
+            inserted += _insert_bronze_chunk(con, chunk)
+            added += len(chunk)
+            chunk = []
+    if chunk:
+        inserted += _insert_bronze_chunk(con, chunk)
+        added += len(chunk)
+    return added, added - inserted, offset, records + added
+
+# WhatsApp import 행 (source 있음) 은 request_id (= chat_import.msg_id: 그룹, byte offset, 시각, 발신자) 로 중복 제거.
+# import 가 Bronze 기록 후 checkpoint 전에 중단되면 resume 시 같은 chunk 가 다시 기록됨
+_INSERT_CHUNK_SQL = '''
+    INSERT INTO bronze_logs
+    SELECT * FROM bronze_chunk c
+    WHERE c.source IS NULL OR c.request_id IS NULL
+       OR NOT EXISTS (SELECT 1 FROM bronze_logs b WHERE b.source IS NOT NULL AND b.request_id = c.request_id)
+    QUALIFY c.source IS NULL OR c.request_id IS NULL
+         OR row_number() OVER (PARTITION BY c.request_id) = 1
+'''
+
+def _insert_bronze_chunk(con, rows):
+    df = pd.DataFrame(rows, columns=BRONZE_COLUMNS + ['source_file'])
+    df['sla_breaches'] = pd.to_numeric(df['sla_breaches'], errors='coerce').astype('Int64')
+    con.register('bronze_chunk', df)
+    inserted = con.execute(_INSERT_CHUNK_SQL).fetchone()[0]
+    con.unregister('bronze_chunk')
+    return inserted
+
 if __name__ == '__main__':
     load_csv_to_duckdb()
+    load_bronze_to_duckdb(full='--full' in sys.argv[1:])
@@ -0,0 +1,377 @@
+"""
+Bronze JSONL writer service
+
+- (일자, 그룹) 파일 핸들을 열어 둔 채 재사용 (LRU 상한 max_open, 초과 시 가장 오래된 핸들 close)
+- 크기(max_bytes) 또는 줄 수(max_lines) 기준 segment rotation
+    bronze/YYYY/MM/YYYY-MM-DD_group.jsonl            (part 0)
+    bronze/YYYY/MM/YYYY-MM-DD_group_part0001.jsonl   (part 1, ...)
+  가장 큰 part 번호가 현재 쓰는 segment 이고, 그보다 작은 part 는 닫힌 segment 라서
+  다운스트림에서 병렬로 처리해도 된다.
+- fsync 정책
+    always   : 매 write 마다 fsync
+    interval : 마지막 fsync 후 fsync_interval_ms 가 지나면 fsync
+    rotation : rotation / close 시에만 fsync
+  정책과 무관하게 매 write 후 flush 는 하므로 다른 프로세스(파이프라인)에서 바로 읽을 수 있다.
+- 압축 (선택, compression=gzip|zstd): frame_records 건마다 독립 frame 으로 기록 + .idx sidecar
+  (포맷은 bronze_codec 참고). 아직 frame 으로 내보내지 않은 레코드는 메모리에 있으므로
+  always 정책은 매 write 마다, interval 정책은 주기마다 미완성 frame 도 내보낸다.
+- mask_fields: 직렬화 전에 해당 필드를 pii.mask_many 로 마스킹 (write_many 는 배치 단위 1회 스캔)
+- shared=True (uvicorn --workers N): (일자, 그룹)마다 `.{stem}.lock` 파일 lock 을 잡고 append
+  lock 안에서 다른 worker 가 쓴 크기/줄 수와 rotation 을 반영하고, 압축 frame 도 lock 을
+  놓기 전에 내보낸다 (프로세스 메모리에 남은 frame 이 없도록)
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .bronze_codec import (PLAIN, SUFFIXES, compress_frame, index_entry, index_path,
+                           read_index, resolve_compression)
+from .file_lock import FileLock
+from .pii import mask_many
+
+FSYNC_ALWAYS = "always"
+FSYNC_INTERVAL = "interval"
+FSYNC_ROTATION = "rotation"
+FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_ROTATION)
+
+
+
+def safe_group_name(group_name: str) -> str:
+    """파일명 안전 문자만 허용: 영문/숫자/._- (연속 하이픈 정규화)"""
+    safe = re.sub(r'[^A-Za-z0-9._-]+', '-', group_name.strip())
+    return re.sub(r'-{2,}', '-', safe).strip('-')
+
+
+def segment_key(item: dict) -> Tuple[str, str, str]:
+    """item → (YYYY, MM, 'YYYY-MM-DD_group')"""
+    dt = datetime.strptime(item["date_gst"], "%Y-%m-%d %H:%M")
+    return dt.strftime("%Y"), dt.strftime("%m"), f"{dt.strftime('%Y-%m-%d')}_{safe_group_name(item['group_name'])}"
+
+
+def _default_serialize(item: dict) -> str:
+    return json.dumps(item, ensure_ascii=False) + "\n"
+
+
+class _Segment:
+    __slots__ = ("outdir", "stem", "part", "compression", "path", "fh", "idx_fh", "bytes", "lines",
+                 "frame", "frame_first", "last_fsync", "flock")
+
+    def __init__(self, outdir: Path, stem: str, part: int, compression: str, count_lines: bool):
+        self.outdir = outdir
+        self.stem = stem
+        self.part = part
+        self.compression = compression
+        self.path = outdir / segment_name(stem, part, compression)
+        self.fh = self.path.open("ab")
+        self.bytes = self.fh.tell()
+        self.idx_fh = None
+        self.frame: List[bytes] = []
+        if compression == PLAIN:
+            self.lines = _count_lines(self.path) if (count_lines and self.bytes) else 0
+        else:
+            self.lines = sum(e["records"] for e in read_index(self.path)) if self.bytes else 0
+            self.idx_fh = index_path(self.path).open("a", encoding="utf-8")
+        self.frame_first = self.lines
+        self.last_fsync = time.monotonic()
+        self.flock: Optional[FileLock] = None
+
+
+def segment_name(stem: str, part: int, compression: str = PLAIN) -> str:
+    suffix = SUFFIXES[compression]
+    return f"{stem}{suffix}" if part == 0 else f"{stem}_part{part:04d}{suffix}"
+
+
+def _count_lines(path: Path) -> int:
+    n = 0
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            n += chunk.count(b"\n")
+    return n
+
+
+def _count_lines_range(path: Path, start: int, end: int) -> int:
+    n = 0
+    with path.open("rb") as f:
+        f.seek(start)
+        left = end - start
+        while left > 0:
+            chunk = f.read(min(left, 1 << 20))
+            if not chunk:
+                break
+            n += chunk.count(b"\n")
+            left -= len(chunk)
+    return n
+
+
+def _indexed_records(path: Path) -> int:
+    """인덱스 마지막 줄의 first + records (= segment 전체 레코드 수)"""
+    idx = index_path(path)
+    try:
+        with idx.open("rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(size - 4096, 0))
+            tail = f.read().splitlines()
+    except FileNotFoundError:
+        return 0
+    for line in reversed(tail):
+        if line.strip():
+            entry = json.loads(line)
+            return entry["first"] + entry["records"]
+    return 0
+
+
+def _latest_part(outdir: Path, stem: str, compression: str) -> int:
+    latest = 0
+    part_re = re.compile(re.escape(stem) + r"_part(\d{4,})" + re.escape(SUFFIXES[compression]) + "$")
+    try:
+        names = os.listdir(outdir)
+    except FileNotFoundError:
+        return 0
+    for name in names:
+        m = part_re.match(name)
+        if m:
+            latest = max(latest, int(m.group(1)))
+    return latest
+
+
+class BronzeWriter:
+    def __init__(self, root, max_open: int = 64, max_bytes: int = 64 * 1024 * 1024,
+                 max_lines: int = 0, fsync: str = FSYNC_ROTATION, fsync_interval_ms: int = 1000,
+                 serialize: Optional[Callable[[dict], str]] = None,
+                 compression: Optional[str] = None, frame_records: int = 1000,
+                 compression_level: int = 3, mask_fields: Sequence[str] = (),
+                 shared: bool = False):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync policy must be one of {FSYNC_POLICIES}: {fsync}")
+        self.root = Path(root)
+        self.max_open = max(max_open, 1)
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval_ms / 1000.0
+        self.serialize = serialize or _default_serialize
+        self.compression = resolve_compression(compression)
+        self.frame_records = max(frame_records, 1)
+        self.compression_level = compression_level
+        self.mask_fields = tuple(mask_fields)
+        self.shared = shared
+        self._open: "OrderedDict[Tuple[str, str, str], _Segment]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.rotations = 0
+        self.evictions = 0
+
+    # --- 핸들 관리 ---
+    def _segment(self, key: Tuple[str, str, str]) -> _Segment:
+        seg = self._open.get(key)
+        if seg is not None:
+            self._open.move_to_end(key)
+            return seg
+        y, m, stem = key
+        outdir = self.root / y / m
+        outdir.mkdir(parents=True, exist_ok=True)
+        seg = _Segment(outdir, stem, _latest_part(outdir, stem, self.compression),
+                       self.compression, bool(self.max_lines))
+        if self.shared:
+            seg.flock = FileLock(outdir / f".{stem}.lock")
+        self._open[key] = seg
+        while len(self._open) > self.max_open:
+            _, old = self._open.popitem(last=False)
+            self._close_segment(old)
+            self.evictions += 1
+        return seg
+
+    def _close_segment(self, seg: _Segment, keep_lock: bool = False):
+        try:
+            self._emit_frame(seg)
+            seg.fh.flush()
+            os.fsync(seg.fh.fileno())
+        finally:
+            seg.fh.close()
+            if seg.idx_fh is not None:
+                seg.idx_fh.close()
+            if seg.flock is not None and not keep_lock:
+                seg.flock.close()
+
+    def _refresh(self, key: Tuple[str, str, str], seg: _Segment) -> _Segment:
+        """shared 모드, 파일 lock 안에서: 다른 worker 의 rotation / append 반영"""
+        if (seg.outdir / segment_name(seg.stem, seg.part + 1, seg.compression)).exists():
+            self._close_segment(seg, keep_lock=True)
+            nxt = _Segment(seg.outdir, seg.stem, _latest_part(seg.outdir, seg.stem, seg.compression),
+                           seg.compression, bool(self.max_lines))
+            nxt.flock = seg.flock
+            self._open[key] = nxt
+            return nxt
+        size = os.fstat(seg.fh.fileno()).st_size
+        if size != seg.bytes:
+            if seg.compression != PLAIN:
+                seg.lines = seg.frame_first = _indexed_records(seg.path)
+            elif self.max_lines:
+                seg.lines += _count_lines_range(seg.path, seg.bytes, size)
+            seg.bytes = size
+        return seg
+
+    def _emit_frame(self, seg: _Segment):
+        """버퍼된 레코드를 독립 frame 하나로 압축해 기록 + 인덱스 한 줄 추가"""
+        if seg.compression == PLAIN or not seg.frame:
+            return
+        data = compress_frame(b"".join(seg.frame), seg.compression, self.compression_level)
+        offset = seg.bytes
+        seg.fh.write(data)
+        seg.bytes += len(data)
+        seg.idx_fh.write(index_entry(offset, len(data), seg.frame_first, len(seg.frame)))
+        seg.frame_first += len(seg.frame)
+        seg.frame = []
+
+    def _needs_rotation(self, used_bytes: int, used_lines: int, nbytes: int) -> bool:
+        if used_bytes == 0:
+            return False
+        if self.max_bytes and used_bytes + nbytes > self.max_bytes:
+            return True
+        if self.max_lines and used_lines + 1 > self.max_lines:
+            return True
+        return False
+
+    def _rotate(self, key: Tuple[str, str, str], seg: _Segment) -> _Segment:
+        self._close_segment(seg, keep_lock=True)
+        nxt = _Segment(seg.outdir, seg.stem, seg.part + 1, seg.compression, False)
+        nxt.flock = seg.flock
+        self._open[key] = nxt
+        self.rotations += 1
+        return nxt
+
+    def _append(self, key: Tuple[str, str, str], lines: List[str]) -> List[Path]:
+        """한 (일자, 그룹) 파일에 여러 줄 append. 줄마다 기록된 segment 경로 반환"""
+        seg = self._segment(key)
+        if seg.flock is None:
+            return self._append_to(key, seg, lines)
+        with seg.flock:
+            return self._append_to(key, self._refresh(key, seg), lines)
+
+    def _append_to(self, key: Tuple[str, str, str], seg: _Segment, lines: List[str]) -> List[Path]:
+        paths: List[Path] = []
+        pending: List[bytes] = []
+        pending_bytes = 0
+        for line in lines:
+            data = line.encode("utf-8")
+            if self._needs_rotation(seg.bytes + pending_bytes, seg.lines + len(pending), len(data)):
+                if pending:
+                    self._write(seg, pending, pending_bytes)
+                    pending, pending_bytes = [], 0
+                seg = self._rotate(key, seg)
+            paths.append(seg.path)
+            if seg.compression != PLAIN:
+                # 압축 segment 는 frame 버퍼가 묶어 주므로 바로 넘기고, 크기는 압축 후 기준
+                self._write(seg, [data], len(data))
+                continue
+            pending.append(data)
+            pending_bytes += len(data)
+        if pending:
+            self._write(seg, pending, pending_bytes)
+        self._sync(seg)
+        return paths
+
+    def _write(self, seg: _Segment, chunks: List[bytes], nbytes: int):
+        seg.lines += len(chunks)
+        if seg.compression == PLAIN:
+            seg.fh.write(b"".join(chunks))
+            seg.bytes += nbytes
+            return
+        for chunk in chunks:
+            seg.frame.append(chunk)
+            if len(seg.frame) >= self.frame_records:
+                self._emit_frame(seg)
+
+    def _sync(self, seg: _Segment):
+        if self.shared:
+            # 다음 lock 보유자가 바로 이어 쓰므로 미완성 frame 을 남기지 않음
+            self._emit_frame(seg)
+        if self.fsync == FSYNC_ALWAYS:
+            self._emit_frame(seg)
+            self._flush(seg)
+            os.fsync(seg.fh.fileno())
+            seg.last_fsync = time.monotonic()
+            return
+        if self.fsync == FSYNC_INTERVAL:
+            now = time.monotonic()
+            if now - seg.last_fsync >= self.fsync_interval:
+                self._emit_frame(seg)
+                self._flush(seg)
+                os.fsync(seg.fh.fileno())
+                seg.last_fsync = now
+                return
+        self._flush(seg)
+
+    def _flush(self, seg: _Segment):
+        seg.fh.flush()
+        if seg.idx_fh is not None:
+            seg.idx_fh.flush()
+
+    def _masked(self, items: List[dict]) -> List[dict]:
+        if not self.mask_fields:
+            return items
+        out = [dict(item) for item in items]
+        for field in self.mask_fields:
+            idxs = [i for i, item in enumerate(out) if item.get(field)]
+            if idxs:
+                for i, value in zip(idxs, mask_many([out[i][field] for i in idxs])):
+                    out[i][field] = value
+        return out
+
+    # --- 공개 API ---
+    def write(self, item: dict) -> Path:
+        """한 건 적재. 기록된 segment 경로 반환"""
+        key = segment_key(item)
+        line = self.serialize(self._masked([item])[0])
+        with self._lock:
+            return self._append(key, [line])[0]
+
+    def write_many(self, items: List[dict]) -> List[Path]:
+        """여러 건 적재: (일자, 그룹) 단위로 묶어 한 번에 write. 항목 순서대로 경로 반환"""
+        items = self._masked(items)
+        grouped: Dict[Tuple[str, str, str], List[int]] = {}
+        for i, item in enumerate(items):
+            grouped.setdefault(segment_key(item), []).append(i)
+        out: List[Optional[Path]] = [None] * len(items)
+        with self._lock:
+            for key, idxs in grouped.items():
+                paths = self._append(key, [self.serialize(items[i]) for i in idxs])
+                for i, p in zip(idxs, paths):
+                    out[i] = p
+        return out  # type: ignore[return-value]
+
+    def flush(self):
+        """미완성 frame 포함 모든 버퍼를 파일로 내보내기"""
+        with self._lock:
+            for seg in self._open.values():
+                self._emit_frame(seg)
+                self._flush(seg)
+
+    def close(self):
+        """열린 모든 segment flush + fsync 후 close"""
+        with self._lock:
+            while self._open:
+                _, seg = self._open.popitem(last=False)
+                self._close_segment(seg)
+
+    def stats(self) -> dict:
+        return {
+            "open_handles": len(self._open),
+            "max_open": self.max_open,
+            "max_bytes": self.max_bytes,
+            "max_lines": self.max_lines,
+            "fsync": self.fsync,
+            "compression": self.compression,
+            "mask_fields": list(self.mask_fields),
+            "frame_records": self.frame_records if self.compression != PLAIN else None,
+            "rotations": self.rotations,
+            "evictions": self.evictions,
+            "shared": self.shared,
+        }
@@ -0,0 +1,387 @@
+"""
+WhatsApp chat export (_chat.txt) importer — 대용량 backfill 용
+
+- 스트리밍 파싱: 파일을 chunk_mb 단위 byte 구간으로 나눠 프로세스 풀에서 파싱
+  (메모리 = chunk 크기 x 동시 처리 chunk 수, 파일 크기와 무관)
+- 구간 경계는 줄 시작에 맞추고, 메시지는 "헤더 줄이 시작된 구간" 이 소유한다.
+  구간 앞쪽의 이어지는 줄(이전 메시지의 multi-line 본문)은 건너뛰고,
+  마지막 메시지는 다음 헤더가 나올 때까지 구간 밖까지 읽는다.
+- 지원 포맷
+    iOS     : [10/08/2025, 09:15:32] Sender: message
+    Android : 10/08/2025, 09:15 - Sender: message   (12시간제 AM/PM 포함)
+  첨부 표시: <attached: 00000012-PHOTO-....jpg>, IMG-....jpg (file attached),
+            <Media omitted>, image omitted 등
+- 적재 (부모 프로세스, 파일 순서대로)
+    Bronze   : hvdc_logs/bronze/YYYY/MM/YYYY-MM-DD_group.jsonl (BronzeWriter, PII 마스킹)
+    chat_log : {LOG_DIR}/{group}_{YYYYMMDD}_import.sqlite (scripts/whatsapp_automation 스키마)
+- resume: chunk 적재가 끝날 때마다 checkpoint(JSON) 에 byte offset 기록.
+  재실행 시 그 offset 부터 이어서 처리. chat_log 는 msg_id 단위로 교체하므로 재처리해도
+  중복이 생기지 않고, Bronze 는 중단 직전 chunk 가 한 번 더 기록될 수 있다 (request_id 동일 →
+  bronze_stage.py 가 bronze_logs 적재 시 request_id 로 중복 제거).
+
+CLI (repo root 에서):
+  python -m hvdc_logs.chat_import "exports/_chat.txt" --group "[HVDC] Project Lightning"
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .bronze_writer import BronzeWriter
+
+DEFAULT_CHUNK_MB = 8
+DEFAULT_BRONZE_ROOT = Path("hvdc_logs/bronze")
+CHECKPOINT_DIR = Path(os.getenv("HVDC_IMPORT_CHECKPOINT_DIR", "data/import_checkpoints"))
+PERIOD = "import"
+SOURCE = "whatsapp_export"
+MASK_FIELDS = ("summary", "sender")
+
+# 보이지 않는 방향 표시/좁은 공백 → 일반 공백 (iOS export 에 섞여 들어옴)
+_INVISIBLE = str.maketrans({"\u200e": None, "\u200f": None, "\ufeff": None,
+                            "\u202f": " ", "\xa0": " "})
+
+_DATE = r"(\d{1,2})[/.\-](\d{1,2})[/.\-](\d{2,4})"
+_TIME = r"(\d{1,2}):(\d{2})(?::(\d{2}))?(?:\s?([AaPp])\.?\s?[Mm]\.?)?"
+_IOS_HEADER = re.compile(r"^\[" + _DATE + r",?\s+" + _TIME + r"\]\s*(.*)$")
+_ANDROID_HEADER = re.compile(r"^" + _DATE + r",?\s+" + _TIME + r"\s+[-–]\s+(.*)$")
+
+_ATTACHED_IOS = re.compile(r"<attached:\s*([^>]+)>")
+_ATTACHED_ANDROID = re.compile(r"(\S+\.\w{2,5})\s+\(file attached\)")
+_OMITTED = re.compile(r"<Media omitted>|\b(?:image|video|audio|sticker|GIF|document|Contact card) omitted\b")
+
+
+# --- 파싱 (worker) ---
+def _to_date(a: str, b: str, y: str, dayfirst: bool) -> Optional[str]:
+    day, month = (int(a), int(b)) if dayfirst else (int(b), int(a))
+    if month > 12 and day <= 12:
+        day, month = month, day
+    year = int(y)
+    if year < 100:
+        year += 2000
+    try:
+        return datetime(year, month, day).strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def _to_time(h: str, m: str, ampm: Optional[str]) -> str:
+    hour = int(h)
+    if ampm:
+        ampm = ampm.lower()
+        if ampm == "p" and hour < 12:
+            hour += 12
+        elif ampm == "a" and hour == 12:
+            hour = 0
+    return f"{hour:02d}:{m}"
+
+
+def parse_header(line: str, dayfirst: bool = True) -> Optional[Tuple[str, str, str, str]]:
+    """메시지 시작 줄이면 (date, time, sender, text), 아니면 None"""
+    m = _IOS_HEADER.match(line) or _ANDROID_HEADER.match(line)
+    if not m:
+        return None
+    a, b, y, hh, mm, _ss, ampm, rest = m.groups()
+    d = _to_date(a, b, y, dayfirst)
+    if d is None:
+        return None
+    sender, sep, text = rest.partition(": ")
+    if not sep:
+        # 시스템 메시지 ("Messages and calls are end-to-end encrypted." 등)
+        sender, text = "", rest
+    return d, _to_time(hh, mm, ampm), sender.strip(), text
+
+
+def split_attachments(text: str) -> Tuple[str, List[str]]:
+    """본문에서 첨부 표시를 떼어 (본문, 첨부 목록) 반환"""
+    found: List[str] = []
+    for rx in (_ATTACHED_IOS, _ATTACHED_ANDROID):
+        found.extend(x.strip() for x in rx.findall(text))
+        text = rx.sub("", text)
+    found.extend(x.group(0).strip("<>").lower() for x in _OMITTED.finditer(text))
+    text = _OMITTED.sub("", text)
+    return text.strip(), found
+
+
+def parse_range(path: str, start: int, end: int, dayfirst: bool = True) -> List[dict]:
+    """[start, end) 에서 시작하는 메시지 파싱. 각 메시지에 byte 범위(offset, end) 포함"""
+    out: List[dict] = []
+    cur: Optional[dict] = None
+    lines: List[str] = []
+    pos = start
+    with open(path, "rb") as f:
+        f.seek(start)
+        for raw in f:
+            line_start = pos
+            pos += len(raw)
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n").translate(_INVISIBLE)
+            header = parse_header(line, dayfirst)
+            if header is None:
+                if cur is not None:
+                    lines.append(line)
+                continue
+            if cur is not None:
+                cur["end"] = line_start
+                out.append(_finish(cur, lines))
+            if line_start >= end:
+                cur = None
+                break
+            d, t, sender, text = header
+            cur = {"offset": line_start, "date": d, "time": t, "sender": sender}
+            lines = [text]
+        if cur is not None:
+            cur["end"] = pos
+            out.append(_finish(cur, lines))
+    return out
+
+
+def _finish(msg: dict, lines: List[str]) -> dict:
+    msg["message"], msg["attachments"] = split_attachments("\n".join(lines))
+    return msg
+
+
+def iter_ranges(path: str, start: int, chunk_bytes: int) -> Iterator[Tuple[int, int]]:
+    """start 부터 chunk_bytes 간격으로, 줄 시작에 맞춘 byte 구간"""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        lo = start
+        while lo < size:
+            hi = lo + chunk_bytes
+            if hi >= size:
+                hi = size
+            else:
+                f.seek(hi)
+                f.readline()  # 다음 줄 시작으로 정렬
+                hi = f.tell()
+            yield lo, hi
+            lo = hi
+
+
+# --- 적재 (parent) ---
+def msg_id(group_name: str, msg: dict) -> str:
+    base = f"{group_name}|{msg['offset']}|{msg['date']} {msg['time']}|{msg['sender']}"
+    return hashlib.sha1(base.encode("utf-8")).hexdigest()[:20]
+
+
+class _ChatLogSink:
+    """(그룹, 일자) 별 chat_log SQLite. 최근 연 커넥션을 max_open 개까지 유지"""
+
+    def __init__(self, log_dir: Path, group_name: str, max_open: int = 32):
+        # 스키마/파일명 규칙은 scripts/whatsapp_automation 과 공유
+        from scripts.whatsapp_automation import _open_conn, _sanitize_group
+        self._open_conn = _open_conn
+        self.log_dir = Path(log_dir)
+        self.safe_group = _sanitize_group(group_name)
+        self.max_open = max_open
+        self._conns: "OrderedDict[str, sqlite3.Connection]" = OrderedDict()
+
+    def _conn(self, day: str) -> sqlite3.Connection:
+        conn = self._conns.get(day)
+        if conn is not None:
+            self._conns.move_to_end(day)
+            return conn
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        path = self.log_dir / f"{self.safe_group}_{day.replace('-', '')}_{PERIOD}.sqlite"
+        conn = self._open_conn(path)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_log_msg_id ON chat_log(msg_id)")
+        self._conns[day] = conn
+        while len(self._conns) > self.max_open:
+            _, old = self._conns.popitem(last=False)
+            old.commit()
+            old.close()
+        return conn
+
+    def write(self, rows: List[tuple]):
+        by_day: Dict[str, List[tuple]] = {}
+        for row in rows:
+            by_day.setdefault(row[1], []).append(row)
+        for day, day_rows in by_day.items():
+            conn = self._conn(day)
+            conn.executemany("DELETE FROM chat_log WHERE msg_id = ?", [(r[0],) for r in day_rows])
+            conn.executemany(
+                "INSERT INTO chat_log(msg_id, date, time, sender, sender_role, message, tags, "
+                "sla_breach, attachments) VALUES(?,?,?,?,?,?,?,?,?)",
+                day_rows,
+            )
+
+    def commit(self):
+        for conn in self._conns.values():
+            conn.commit()
+
+    def close(self):
+        while self._conns:
+            _, conn = self._conns.popitem(last=False)
+            conn.commit()
+            conn.close()
+
+
+def checkpoint_path(path: str, group_name: str) -> Path:
+    key = hashlib.sha1(f"{os.path.abspath(path)}|{group_name}".encode("utf-8")).hexdigest()[:16]
+    return CHECKPOINT_DIR / f"{Path(path).stem}_{key}.json"
+
+
+def load_checkpoint(path: str, group_name: str) -> dict:
+    cp = checkpoint_path(path, group_name)
+    if not cp.exists():
+        return {}
+    try:
+        state = json.loads(cp.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+    # 파일이 잘리거나 교체됐으면 처음부터
+    if state.get("offset", 0) > os.path.getsize(path):
+        return {}
+    return state
+
+
+def _save_checkpoint(path: str, group_name: str, state: dict):
+    cp = checkpoint_path(path, group_name)
+    cp.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cp.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, cp)
+
+
+def import_chat(path: str, group_name: str, *, workers: Optional[int] = None,
+                chunk_mb: int = DEFAULT_CHUNK_MB, dayfirst: bool = True, resume: bool = True,
+                bronze_root=DEFAULT_BRONZE_ROOT, log_dir=None, compression: Optional[str] = None,
+                writer: Optional[BronzeWriter] = None,
+                progress: Optional[Callable[[dict], None]] = None,
+                progress_secs: float = 5.0) -> dict:
+    """export 파일 하나를 Bronze + chat_log 로 적재. 최종 통계 반환
+
+    writer 를 넘기면 (API 서버의 BronzeWriter 등) 그 핸들을 공유하고 닫지 않는다.
+    공유 writer 는 MASK_FIELDS 를 마스킹하도록 설정돼 있어야 한다.
+    """
+    if log_dir is None:
+        from scripts.whatsapp_automation import LOG_DB_DIR
+        log_dir = LOG_DB_DIR
+    size = os.path.getsize(path)
+    state = load_checkpoint(path, group_name) if resume else {}
+    start = int(state.get("offset", 0))
+    stats = {
+        "path": str(path),
+        "group_name": group_name,
+        "bytes_total": size,
+        "resumed_from": start,
+        "offset": start,
+        "rows": 0,
+        "rows_total": int(state.get("rows_total", 0)),
+        "chunks": 0,
+        "elapsed_s": 0.0,
+        "rows_per_sec": 0.0,
+    }
+    workers = max(workers or min(4, os.cpu_count() or 1), 1)
+    window = workers * 2
+    own_writer = writer is None
+    if own_writer:
+        writer = BronzeWriter(bronze_root, compression=compression, mask_fields=MASK_FIELDS)
+    sink = _ChatLogSink(log_dir, group_name)
+    started = time.monotonic()
+    last_report = started
+
+    def _commit_chunk(hi: int, msgs: List[dict]):
+        # main.py 적재 경로와 같은 형식 (naive UTC, 초 단위) → created_at 문자열 정렬/MAX 가 일관됨
+        created_at = datetime.utcnow().isoformat(timespec="seconds")
+        items, rows = [], []
+        for msg in msgs:
+            mid = msg_id(group_name, msg)
+            items.append({
+                "request_id": mid,
+                "date_gst": f"{msg['date']} {msg['time']}",
+                "group_name": group_name,
+                "summary": msg["message"],
+                "top_keywords": [],
+                "sla_breaches": 0,
+                "attachments": msg["attachments"],
+                "created_at": created_at,
+                "sender": msg["sender"],
+                "source": SOURCE,
+            })
+            rows.append((mid, msg["date"], msg["time"], msg["sender"], "", msg["message"],
+                         "", 0, ", ".join(msg["attachments"])))
+        if items:
+            writer.write_many(items)
+            writer.flush()
+            sink.write(rows)
+            sink.commit()
+        stats["offset"] = hi
+        stats["rows"] += len(msgs)
+        stats["rows_total"] += len(msgs)
+        stats["chunks"] += 1
+        _save_checkpoint(path, group_name, {
+            "offset": hi, "rows_total": stats["rows_total"], "bytes_total": size,
+            "updated_at": created_at,
+        })
+
+    def _report(now: float):
+        elapsed = now - started
+        stats["elapsed_s"] = round(elapsed, 3)
+        stats["rows_per_sec"] = round(stats["rows"] / elapsed, 1) if elapsed > 0 else 0.0
+        if progress is not None:
+            progress(dict(stats))
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending: List[Tuple[int, "object"]] = []
+            for lo, hi in iter_ranges(path, start, max(chunk_mb, 1) * 1024 * 1024):
+                pending.append((hi, pool.submit(parse_range, str(path), lo, hi, dayfirst)))
+                # 순서 보존: 가장 앞 chunk 부터 적재, 동시 처리 chunk 는 window 개로 제한
+                while len(pending) >= window:
+                    done_hi, fut = pending.pop(0)
+                    _commit_chunk(done_hi, fut.result())
+                    now = time.monotonic()
+                    if now - last_report >= progress_secs:
+                        last_report = now
+                        _report(now)
+            for done_hi, fut in pending:
+                _commit_chunk(done_hi, fut.result())
+    finally:
+        if own_writer:
+            writer.close()
+        sink.close()
+    _report(time.monotonic())
+    return stats
+
+
+def _print_progress(stats: dict):
+    mb = stats["offset"] / (1024 * 1024)
+    total = stats["bytes_total"] / (1024 * 1024)
+    print(f"[IMPORT] {stats['rows']} rows, {mb:.1f}/{total:.1f} MB, {stats['rows_per_sec']:.0f} rows/s",
+          flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="WhatsApp _chat.txt → Bronze + chat_log importer")
+    parser.add_argument("path", help="export 파일 (_chat.txt)")
+    parser.add_argument("--group", required=True, help="그룹 이름")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-mb", type=int, default=DEFAULT_CHUNK_MB)
+    parser.add_argument("--monthfirst", action="store_true", help="날짜가 M/D/Y 형식 (기본 D/M/Y)")
+    parser.add_argument("--no-resume", action="store_true", help="checkpoint 무시하고 처음부터")
+    parser.add_argument("--bronze-root", default=str(DEFAULT_BRONZE_ROOT))
+    parser.add_argument("--log-dir", default=None, help="chat_log SQLite 디렉터리")
+    parser.add_argument("--compression", default=os.getenv("BRONZE_COMPRESSION", "none"))
+    args = parser.parse_args(argv)
+
+    stats = import_chat(
+        args.path, args.group, workers=args.workers, chunk_mb=args.chunk_mb,
+        dayfirst=not args.monthfirst, resume=not args.no_resume, bronze_root=args.bronze_root,
+        log_dir=args.log_dir, compression=args.compression, progress=_print_progress,
+    )
+    _print_progress(stats)
+    print(json.dumps(stats, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+file_lock.py — 프로세스 간 advisory 파일 lock (uvicorn/gunicorn --workers N)
+
+- POSIX: fcntl.flock(LOCK_EX), Windows: msvcrt.locking (lock 파일 첫 1 byte)
+- lock 파일 핸들은 한 번 열어 재사용 (acquire 마다 open 하지 않음)
+- flock 은 같은 프로세스의 다른 스레드를 막지 못하므로 threading.Lock 을 함께 잡는다
+- advisory lock: 같은 lock 파일을 쓰는 프로세스끼리만 직렬화됨
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+try:
+    import fcntl  # type: ignore
+    _HAS_FCNTL = True
+except ImportError:  # Windows
+    fcntl = None  # type: ignore
+    _HAS_FCNTL = False
+    import msvcrt  # type: ignore
+
+
+class FileLock:
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._thread_lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self.acquisitions = 0
+        self.wait_secs = 0.0
+
+    def _open(self) -> int:
+        if self._fd is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        return self._fd
+
+    def acquire(self):
+        t0 = time.perf_counter()
+        self._thread_lock.acquire()
+        try:
+            fd = self._open()
+            if _HAS_FCNTL:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                while True:
+                    try:
+                        # LK_LOCK 은 1초 간격 10회 재시도 후 OSError → 계속 대기
+                        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        self.acquisitions += 1
+        self.wait_secs += time.perf_counter() - t0
+
+    def release(self):
+        try:
+            if self._fd is not None:
+                if _HAS_FCNTL:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(self._fd, 0, os.SEEK_SET)
+                    msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            self._thread_lock.release()
+
+    def close(self):
+        with self._thread_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def stats(self) -> dict:
+        return {
+            "path": str(self.path),
+            "acquisitions": self.acquisitions,
+            "wait_ms": round(self.wait_secs * 1000, 3),
+        }
@@ -0,0 +1,95 @@
+"""
+kpi_rollups.py — 파이프라인이 갱신하는 DuckDB KPI rollup (hour / day / week / month)
+
+- sla_log 에서 한 번 집계해 `kpi_rollup(granularity, bucket, group_name, ...)` 테이블로 교체
+- date_gst 는 GST (UTC+4) 벽시계 시각 → date_trunc 결과가 곧 GST 기준 구간
+  (week: ISO 주, 월요일 00:00 GST 시작 — scripts/whatsapp_automation.py 주간 보고서와 같은 경계)
+- 12개월 주 단위 조회도 (53주 × 그룹 수) 행만 읽음
+- hybrid KPI (API /kpi, KPI_HYBRID=on): API 적재 행(bronze_logs, source 없음)만으로 같은 rollup 과
+  high-water mark 를 한 트랜잭션에서 만듦 → KPI 와 mark 가 같은 relation / 같은 snapshot
+    · pipeline_watermark : max(created_at) + tail_from (= mark - overlap)
+    · kpi_hybrid_rollup  : 구간/그룹별 집계
+    · kpi_hybrid_edge    : 그중 created_at >= tail_from 인 행의 집계
+  API 는 SQLite 에서 created_at >= tail_from 행을 집계하고 edge 를 빼서 더함
+  (초 단위 created_at 의 같은 초, 적재 지연으로 mark 보다 늦게 Bronze 에 쓰인 행도 정확히 한 번)
+"""
+
+GRANULARITIES = ("hour", "day", "week", "month")
+
+KPI_ROLLUP_SQL = """
+CREATE OR REPLACE TABLE kpi_rollup AS
+SELECT
+  g.granularity,
+  date_trunc(g.granularity, CAST(s.date_gst AS TIMESTAMP)) AS bucket,
+  s.group_name,
+  COUNT(*) AS logs_count,
+  SUM(COALESCE(s.sla_breaches, 0)) AS total_sla_breaches,
+  COUNT(DISTINCT s.top_keywords) AS unique_keywords_count
+FROM sla_log s
+CROSS JOIN (VALUES ('hour'), ('day'), ('week'), ('month')) g(granularity)
+WHERE s.date_gst IS NOT NULL
+GROUP BY 1, 2, 3
+ORDER BY 1, 2, 3
+"""
+
+# API 적재 행 = Bronze 중 source 가 없는 행 (WhatsApp import 는 source='whatsapp_export', SQLite logs 에 없음)
+HYBRID_SOURCE_SQL = """
+CREATE OR REPLACE TEMP TABLE hybrid_api_logs AS
+SELECT date_gst, group_name, top_keywords, sla_breaches, created_at
+FROM bronze_logs
+WHERE source IS NULL AND date_gst IS NOT NULL AND created_at IS NOT NULL
+"""
+
+# 구간 경계는 date_gst 문자열 앞자리 (SQLite logs 쪽 bucket 식과 같은 값)
+_HYBRID_ROLLUP_SELECT = """
+SELECT
+  g.granularity,
+  CASE g.granularity
+    WHEN 'hour' THEN TRY_CAST(substr(s.date_gst, 1, 13) || ':00:00' AS TIMESTAMP)
+    WHEN 'day' THEN TRY_CAST(substr(s.date_gst, 1, 10) AS TIMESTAMP)
+    WHEN 'week' THEN CAST(date_trunc('week', TRY_CAST(substr(s.date_gst, 1, 10) AS DATE)) AS TIMESTAMP)
+    ELSE TRY_CAST(substr(s.date_gst, 1, 7) || '-01' AS TIMESTAMP)
+  END AS bucket,
+  s.group_name,
+  COUNT(*) AS logs_count,
+  SUM(COALESCE(s.sla_breaches, 0)) AS total_sla_breaches,
+  COUNT(DISTINCT s.top_keywords) AS unique_keywords_count
+FROM hybrid_api_logs s
+CROSS JOIN (VALUES ('hour'), ('day'), ('week'), ('month')) g(granularity)
+{where}
+GROUP BY 1, 2, 3
+HAVING bucket IS NOT NULL
+"""
+
+WATERMARK_SQL = """
+CREATE OR REPLACE TABLE pipeline_watermark AS
+SELECT MAX(created_at) AS high_water_created_at,
+       strftime(MAX(TRY_CAST(created_at AS TIMESTAMP)) - to_seconds(?), '%Y-%m-%dT%H:%M:%S') AS tail_from,
+       COUNT(*) AS bronze_rows,
+       current_timestamp AS refreshed_at
+FROM hybrid_api_logs
+"""
+
+
+def refresh_hybrid_kpi(con, overlap_secs: int = 300):
+    """bronze_logs 적재 직후 호출 (같은 커넥션). high-water mark 반환 (API 행이 없으면 None).
+    overlap_secs: 적재 ~ Bronze 기록 사이 최대 지연 (이보다 늦게 Bronze 에 쓰인 행은 다음 실행에 반영)"""
+    con.execute("BEGIN TRANSACTION")
+    try:
+        con.execute(HYBRID_SOURCE_SQL)
+        con.execute(WATERMARK_SQL, [int(overlap_secs)])
+        con.execute("CREATE OR REPLACE TABLE kpi_hybrid_rollup AS " + _HYBRID_ROLLUP_SELECT.format(where=""))
+        con.execute("CREATE OR REPLACE TABLE kpi_hybrid_edge AS " + _HYBRID_ROLLUP_SELECT.format(
+            where="WHERE s.created_at >= (SELECT tail_from FROM pipeline_watermark)"))
+        con.execute("DROP TABLE hybrid_api_logs")
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    return con.execute("SELECT high_water_created_at FROM pipeline_watermark").fetchone()[0]
+
+
+def refresh_kpi_rollups(con) -> int:
+    """sla_log 재생성 직후 호출 (같은 커넥션). rollup 행 수 반환"""
+    con.execute(KPI_ROLLUP_SQL)
+    return con.execute("SELECT COUNT(*) FROM kpi_rollup").fetchone()[0]
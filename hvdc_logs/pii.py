@@ -0,0 +1,115 @@
+"""
+PII 마스킹 엔진 — 모든 패턴을 named-group alternation 하나로 컴파일해 한 번의 스캔으로 처리
+
+마스킹 대상 (치환 '****'):
+- email       : a.b@c.com
+- emirates_id : 784-1990-1234567-1
+- kr_rrn      : 주민등록번호 900101-1234567
+- plate       : 차량 번호판 (UAE: Dubai A 12345 / Abu Dhabi 5 12345, 한국: 12가 3456)
+- sat_phone   : 선박/위성 전화 (Inmarsat +870, Iridium +8816/+8817, Thuraya +88216)
+- phone       : 일반 전화번호 (국가번호/괄호/하이픈/점/공백 구분, 숫자 8자리 이상)
+
+날짜/시각(2025-08-10 10:00, 10/08/2025 10:00)은 "keep" 그룹으로 먼저 소비해서 전화번호로
+오인해 지워지지 않게 한다. (08:00 같은 시각은 ':' 가 전화번호 구분자가 아니라 원래 안전)
+
+사용:
+    mask_pii(text)          # 한 건
+    mask_many(texts)        # 여러 건을 구분자로 이어 한 번에 치환
+"""
+
+import re
+from typing import Dict, List, Sequence
+
+REPLACEMENT = "****"
+
+_SEP = "\x00"  # mask_many 구분자 (어떤 패턴에도 매치되지 않음)
+
+_KR_PLATE_CHARS = "가나다라마거너더러머버서어저고노도로모보소오조구누두루무부수우주하허호배"
+_UAE_EMIRATES = r"Dubai|DXB|Abu\s?Dhabi|AUH|Sharjah|SHJ|RAK|Ajman|UAQ|Fujairah"
+
+# email 은 '@' 부터 매치하고 local part 는 뒤로 확장 (단어마다 local part 를 시도하지 않도록)
+_PATTERNS = [
+    ("email", r"@[\w-]+(?:\.[\w-]+)+"),
+    ("emirates_id", r"784-?\d{4}-?\d{7}-?\d(?!\d)"),
+    ("kr_rrn", r"\d{6}-[1-4]\d{6}(?!\d)"),
+    ("keep", r"\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2})?)?|\d{1,2}[/.]\d{1,2}[/.]\d{2,4}"),
+    ("plate", rf"(?:{_UAE_EMIRATES})[\s-]?(?:[A-Z]{{1,2}}|\d{{1,2}})[\s-]?\d{{1,5}}(?!\d)"
+              rf"|\d{{2,3}}\s?[{_KR_PLATE_CHARS}]\s?\d{{4}}(?!\d)"),
+    ("sat_phone", r"(?:\+|00)(?:870|881[6-9]|88216)[\s-]?\d(?:[\s-]?\d){6,11}(?!\d)"),
+    ("phone", r"(?:\+|00)?\(?\d(?:[\s\-.()]{0,2}\d){7,14}(?![\d/:])"),
+]
+
+# 선두 guard: 첫 글자 집합(re 엔진의 빠른 skip 에 사용) + 숫자/구분자 5자 이상 / '@' / 지명 으로 후보 축소.
+# 짧은 숫자(시각, 수량)는 guard 에서 바로 탈락하므로 alternation 전체를 시도하지 않는다.
+_GUARD = (r"(?=[\d+(@ADFRSU])"
+          rf"(?=[+(]?\d[\d\s\-./(){_KR_PLATE_CHARS}]{{4}}|@|{_UAE_EMIRATES})")
+
+PII_PATTERN = re.compile(_GUARD + "(?:" + "|".join(f"(?P<{name}>{rx})" for name, rx in _PATTERNS) + ")")
+PII_CLASSES = tuple(name for name, _ in _PATTERNS if name != "keep")
+
+# 숫자/@ 가 없는 문자열은 어떤 패턴에도 걸리지 않으므로 스캔 생략
+_TRIGGER = re.compile(r"[\d@]")
+_EMAIL_LOCAL = frozenset("._+-")
+
+
+def _email_start(text: str, at: int, floor: int) -> int:
+    i = at
+    while i > floor and (text[i - 1].isalnum() or text[i - 1] == "_" or text[i - 1] in _EMAIL_LOCAL):
+        i -= 1
+    return i
+
+
+def _scan(text: str) -> str:
+    out: List[str] = []
+    pos = 0
+    for m in PII_PATTERN.finditer(text):
+        kind = m.lastgroup
+        if kind == "keep":
+            continue
+        start = m.start()
+        if kind == "email":
+            start = _email_start(text, start, pos)
+            if start == m.start():
+                continue  # local part 없는 '@domain' 은 email 아님
+        out.append(text[pos:start])
+        out.append(REPLACEMENT)
+        pos = m.end()
+    if not out:
+        return text
+    out.append(text[pos:])
+    return "".join(out)
+
+
+def mask_pii(text: str) -> str:
+    """PII 마스킹 (단일 패스)"""
+    if not text or not _TRIGGER.search(text):
+        return text
+    return _scan(text)
+
+
+def mask_many(texts: Sequence[str]) -> List[str]:
+    """여러 문자열 마스킹. 구분자로 이어 붙여 한 번에 스캔"""
+    if not texts:
+        return []
+    values = [t or "" for t in texts]
+    if any(_SEP in t for t in values):
+        return [mask_pii(t) for t in texts]
+    joined = _SEP.join(values)
+    if not _TRIGGER.search(joined):
+        return list(texts)
+    out = _scan(joined).split(_SEP)
+    # None/빈 값은 그대로 돌려줌
+    return [o if t else t for t, o in zip(texts, out)]
+
+
+def find_pii(text: str) -> Dict[str, int]:
+    """클래스별 매치 수 (디버그/감사용)"""
+    counts: Dict[str, int] = {}
+    if not text:
+        return counts
+    for m in PII_PATTERN.finditer(text):
+        if m.lastgroup == "email" and _email_start(text, m.start(), 0) == m.start():
+            continue
+        if m.lastgroup != "keep":
+            counts[m.lastgroup] = counts.get(m.lastgroup, 0) + 1
+    return counts
@@ -4,16 +4,25 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DUCKDB_FILE = os.path.join(BASE_DIR, 'duckdb', 'hvdc.duckdb')
 TRANSFORM_SQL = os.path.join(BASE_DIR, 'transform.sql')
 
-def run_pipeline_sequence():
-    import duckdb  # Lazy import to avoid import-time failure during API startup
-    subprocess.run(['python', os.path.join(BASE_DIR, 'bronze_stage.py')], check=True)
-    subprocess.run(['python', os.path.join(BASE_DIR, 'silver_stage.py')], check=True)
+def stage_commands():
+    """Bronze/Silver 단계 (이름, 명령) — job 큐가 단계별로 실행/기록"""
+    return [
+        ('bronze', ['python', os.path.join(BASE_DIR, 'bronze_stage.py')]),
+        ('silver', ['python', os.path.join(BASE_DIR, 'silver_stage.py')]),
+    ]
 
+def run_transform():
+    import duckdb  # Lazy import to avoid import-time failure during API startup
     con = duckdb.connect(DUCKDB_FILE)
     with open(TRANSFORM_SQL, 'r', encoding='utf-8') as f:
         sql_script = f.read()
     con.execute(sql_script)
     con.close()
+
+def run_pipeline_sequence():
+    for _, cmd in stage_commands():
+        subprocess.run(cmd, check=True)
+    run_transform()
     print('[PIPELINE] Bronze → Silver → Transform completed')
     return {'status': 'ok'}
 
@@ -10,6 +10,13 @@ import glob
 from datetime import datetime
 import json
 
+try:
+    from .bronze_codec import list_segments
+    from .kpi_rollups import refresh_kpi_rollups
+except ImportError:  # python run_pipeline.py 로 직접 실행
+    from bronze_codec import list_segments
+    from kpi_rollups import refresh_kpi_rollups
+
 class HVDCPipeline:
     def __init__(self, base_path="."):
         self.base_path = base_path
@@ -30,7 +37,8 @@ class HVDCPipeline:
         print("Starting HVDC Pipeline...")
 
         # Check bronze data
-        jsonl_files = glob.glob(os.path.join(self.bronze_path, "*.jsonl"))
+        # plain / gzip / zstd segment 모두 포함
+        jsonl_files = [str(p) for p in list_segments(self.bronze_path, recursive=False)]
         if not jsonl_files:
             print("Warning: No JSONL files found in bronze directory")
             print(f"   Expected path: {self.bronze_path}")
@@ -67,6 +75,8 @@ class HVDCPipeline:
                 GROUP BY 1,2
                 """
             )
+            # hour/day/week/month rollup (API granularity 조회용)
+            refresh_kpi_rollups(self.conn)
 
             # Check results using available tables
             result = self.conn.execute(
@@ -1,5 +1,10 @@
 ﻿import duckdb, os
 
+try:
+    from .kpi_rollups import refresh_kpi_rollups
+except ImportError:  # python silver_stage.py 로 직접 실행
+    from kpi_rollups import refresh_kpi_rollups
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DUCKDB_FILE = os.path.join(BASE_DIR, 'duckdb', 'hvdc.duckdb')
 
@@ -12,8 +17,10 @@ def transform_raw_to_sla():
         FROM raw_logs
         WHERE date_gst IS NOT NULL
     ''')
+    rollup_rows = refresh_kpi_rollups(con)
     con.close()
     print('[SILVER] raw_logs transformed to sla_log')
+    print(f'[SILVER] kpi_rollup refreshed ({rollup_rows} rows)')
 
 if __name__ == '__main__':
     transform_raw_to_sla()
@@ -0,0 +1,95 @@
+"""
+idempotency.py — request_id 중복 판별용 in-process 필터
+
+- LRU: 최근 commit 된 request_id (확정 중복 → I/O 없이 즉시 거절)
+- Bloom filter: 시작 시 SQLite 전체 request_id 로 warm-up
+    * "없음" 판정은 확정 → 바로 저장 진행
+    * "있을 수 있음" 판정은 SQLite(UNIQUE, source of truth) 로 확인
+"""
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from typing import Iterable
+
+NEW = "new"
+DUPLICATE = "duplicate"
+MAYBE = "maybe"
+
+
+class BloomFilter:
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.num_bits = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.num_hashes = max(int(round(self.num_bits / capacity * math.log(2))), 1)
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class IdempotencyFilter:
+    def __init__(self, lru_size: int = 10000, bloom_capacity: int = 1_000_000,
+                 error_rate: float = 0.001):
+        self.lru_size = max(lru_size, 1)
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._bloom = BloomFilter(bloom_capacity, error_rate)
+        self._lock = threading.Lock()
+        self.hits = {NEW: 0, DUPLICATE: 0, MAYBE: 0}
+
+    def check(self, key: str) -> str:
+        """NEW(확정 신규) / DUPLICATE(확정 중복) / MAYBE(SQLite 확인 필요)"""
+        with self._lock:
+            if key in self._recent:
+                self._recent.move_to_end(key)
+                state = DUPLICATE
+            elif key in self._bloom:
+                state = MAYBE
+            else:
+                state = NEW
+            self.hits[state] += 1
+            return state
+
+    def add(self, key: str):
+        """SQLite 에 존재가 확인된 request_id 기록"""
+        with self._lock:
+            self._bloom.add(key)
+            self._recent[key] = None
+            self._recent.move_to_end(key)
+            if len(self._recent) > self.lru_size:
+                self._recent.popitem(last=False)
+
+    def warm(self, keys: Iterable[str]) -> int:
+        """시작 시 기존 request_id 로 Bloom filter 채우기 (LRU 는 비워 둠)"""
+        n = 0
+        with self._lock:
+            for key in keys:
+                if key:
+                    self._bloom.add(key)
+                    n += 1
+        return n
+
+    def stats(self) -> dict:
+        return {
+            "lru_size": len(self._recent),
+            "lru_capacity": self.lru_size,
+            "bloom_adds": self._bloom.count,
+            "bloom_bits": self._bloom.num_bits,
+            "bloom_hashes": self._bloom.num_hashes,
+            "checks": dict(self.hits),
+        }
@@ -0,0 +1,120 @@
+"""
+ingest_queue.py — write-behind 큐 (POST /logs group-commit)
+
+- 요청 핸들러는 검증된 항목을 bounded asyncio.Queue 에 넣고 바로 반환
+- 단일 writer task 가 flush_ms 경과 또는 max_rows 도달 시 한 번에 commit
+- commit 함수(블로킹 CSV/SQLite/Bronze I/O)는 이벤트 루프 밖 스레드에서 실행
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, List, Optional
+
+
+class QueueFull(Exception):
+    """큐 깊이 초과 (호출 측에서 503 으로 변환)"""
+
+
+class WriteBehindQueue:
+    def __init__(self, commit_fn: Callable[[List[Any]], List[Any]],
+                 flush_ms: int = 50, max_rows: int = 500, max_depth: int = 10000):
+        self.commit_fn = commit_fn
+        self.flush_secs = max(flush_ms, 0) / 1000.0
+        self.max_rows = max(max_rows, 1)
+        self.max_depth = max_depth
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.committed = 0
+        self.batches = 0
+        self.last_flush_ts: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_depth)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """남은 항목을 모두 commit 한 뒤 writer 종료"""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    def submit(self, item: Any) -> asyncio.Future:
+        """항목 적재. 반환된 future 는 commit 후 항목별 결과로 완료됨"""
+        if not self.running:
+            raise RuntimeError("write-behind queue is not running")
+        fut = asyncio.get_running_loop().create_future()
+        # ack-after-enqueue 모드에서 결과를 기다리지 않아도 경고가 남지 않도록
+        fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            self._queue.put_nowait((item, fut))
+        except asyncio.QueueFull:
+            raise QueueFull(f"ingest queue full ({self.max_depth})")
+        return fut
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = loop.time() + self.flush_secs
+            while len(batch) < self.max_rows:
+                try:
+                    nxt = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        nxt = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if nxt is None:
+                    stopping = True
+                    break
+                batch.append(nxt)
+            await self._flush(loop, batch)
+
+    async def _flush(self, loop, batch):
+        items = [item for item, _ in batch]
+        try:
+            results = await loop.run_in_executor(None, self.commit_fn, items)
+        except Exception as e:
+            self.last_error = str(e)
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        self.committed += len(items)
+        self.batches += 1
+        self.last_flush_ts = time.time()
+        for (_, fut), result in zip(batch, results):
+            if not fut.done():
+                fut.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "depth": self.depth(),
+            "max_depth": self.max_depth,
+            "flush_ms": int(self.flush_secs * 1000),
+            "max_rows": self.max_rows,
+            "committed": self.committed,
+            "batches": self.batches,
+            "last_flush_epoch": self.last_flush_ts,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,226 @@
+"""
+instrumentation.py — 경량 latency 히스토그램 / 카운터 (JSON + Prometheus text)
+
+- 고정 bucket 히스토그램: observe 는 bisect 1회 + 정수 증가 (lock 범위 최소)
+- timer() context manager / timed() decorator 로 route, 저장 단계, KPI 엔진 측정
+- snapshot(): p50/p95/p99 (bucket 내 선형 보간 추정) + count/sum → /metrics
+- render_prometheus(): text exposition format 0.0.4 → /metrics/prom
+- Server-Timing: 요청 단위 phase 목록 (contextvar) → "auth;dur=0.012, csv;dur=0.310"
+  timer()/timed() 에 phase= 를 주면 히스토그램과 함께 현재 요청의 phase 로도 기록
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 초 단위 bucket 상한 (0.1ms ~ 10s)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # 마지막 = +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lo = self.bounds[i - 1] if i > 0 else 0.0
+                hi = self.bounds[i] if i < len(self.bounds) else self.max
+                return lo + (hi - lo) * (rank - seen) / n
+            seen += n
+        return self.max
+
+
+class Registry:
+    def __init__(self, prefix: str = "hvdc", buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = buckets
+        self._hists: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._hists.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = Histogram(self.buckets)
+            hist.observe(seconds)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name: str, phase: Optional[str] = None, **labels) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            self.observe(name, elapsed, **labels)
+            if phase:
+                record_phase(phase, elapsed)
+
+    def timed(self, name: str, phase: Optional[str] = None, **labels):
+        """함수 전체 실행 시간을 name{labels} 히스토그램 (+ Server-Timing phase) 에 기록하는 decorator"""
+        def deco(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    elapsed = time.perf_counter() - t0
+                    self.observe(name, elapsed, **labels)
+                    if phase:
+                        record_phase(phase, elapsed)
+            return wrapper
+        return deco
+
+    # --- export ---
+    def snapshot(self) -> dict:
+        """JSON 용: 히스토그램별 count / sum / p50 / p95 / p99 (ms)"""
+        def ms(v):
+            return round(v * 1000, 3) if v is not None else None
+
+        with self._lock:
+            hists = [(n, k, h.count, h.sum, h.max, h.quantile(0.5), h.quantile(0.95), h.quantile(0.99))
+                     for n, series in self._hists.items() for k, h in series.items()]
+            counters = [(n, k, v) for n, series in self._counters.items() for k, v in series.items()]
+        return {
+            "histograms": [
+                {"name": n, "labels": dict(k), "count": c, "sum_ms": ms(s), "max_ms": ms(mx),
+                 "p50_ms": ms(p50), "p95_ms": ms(p95), "p99_ms": ms(p99)}
+                for n, k, c, s, mx, p50, p95, p99 in sorted(hists, key=lambda x: (x[0], x[1]))
+            ],
+            "counters": [
+                {"name": n, "labels": dict(k), "value": v}
+                for n, k, v in sorted(counters, key=lambda x: (x[0], x[1]))
+            ],
+        }
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._hists):
+                full = f"{self.prefix}_{name}_seconds"
+                if name in self._help:
+                    lines.append(f"# HELP {full} {self._help[name]}")
+                lines.append(f"# TYPE {full} histogram")
+                for key in sorted(self._hists[name]):
+                    h = self._hists[name][key]
+                    cumulative = 0
+                    for bound, n in zip(self.buckets, h.counts):
+                        cumulative += n
+                        lines.append(f"{full}_bucket{_fmt_labels(key, ('le', _fmt_float(bound)))} {cumulative}")
+                    lines.append(f"{full}_bucket{_fmt_labels(key, ('le', '+Inf'))} {h.count}")
+                    lines.append(f"{full}_sum{_fmt_labels(key)} {_fmt_float(h.sum)}")
+                    lines.append(f"{full}_count{_fmt_labels(key)} {h.count}")
+            for name in sorted(self._counters):
+                full = f"{self.prefix}_{name}_total"
+                if name in self._help:
+                    lines.append(f"# HELP {full} {self._help[name]}")
+                lines.append(f"# TYPE {full} counter")
+                for key in sorted(self._counters[name]):
+                    lines.append(f"{full}{_fmt_labels(key)} {_fmt_float(self._counters[name][key])}")
+        return "\n".join(lines) + "\n"
+
+
+# --- Server-Timing (요청 단위 phase) ---
+# 미들웨어가 요청마다 새 list 를 set → threadpool 로 넘어간 sync endpoint 도 같은 list 에 append
+_PHASES: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("hvdc_server_timing", default=None)
+
+
+def begin_phases() -> List[Tuple[str, float]]:
+    phases: List[Tuple[str, float]] = []
+    _PHASES.set(phases)
+    return phases
+
+
+def record_phase(name: str, seconds: float):
+    phases = _PHASES.get()
+    if phases is not None:
+        phases.append((name, seconds))
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """히스토그램 없이 Server-Timing phase 만 기록"""
+    if _PHASES.get() is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - t0)
+
+
+def server_timing_header(phases: List[Tuple[str, float]], total: Optional[float] = None) -> str:
+    """같은 이름은 합산 (batch 경로의 반복 호출), 첫 등장 순서 유지. dur 단위 ms"""
+    merged: Dict[str, float] = {}
+    for name, seconds in phases:
+        merged[name] = merged.get(name, 0.0) + seconds
+    parts = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in merged.items()]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(parts)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt_float(v: float) -> str:
+    return repr(float(v)) if v != int(v) else str(int(v))
+
+
+# main.py 공용 registry
+REGISTRY = Registry()
+timer = REGISTRY.timer
+timed = REGISTRY.timed
+observe = REGISTRY.observe
+inc = REGISTRY.inc
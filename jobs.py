@@ -0,0 +1,490 @@
+"""
+jobs.py — SQLite 기반 영속 job 큐 + bounded worker pool (파이프라인/transform/WhatsApp import 실행)
+
+- submit() 은 `jobs` 행(state=queued)만 쓰고 즉시 반환 → API worker 스레드를 잡지 않음
+- worker 스레드 N 개가 queued 행을 조건부 UPDATE 로 claim (여러 uvicorn worker 가 같은 DB 를 공유해도 1회만 실행)
+- job 함수는 JobContext 를 받아 단계(stage)별 진행/시간, subprocess 출력(tail), 진행 요약(report), 취소 확인을 기록
+- heartbeat 스레드가 실행 중 job 의 출력/단계를 주기적으로 저장하고 cancel_requested 를 읽어 옴
+  heartbeat 가 stale_secs 이상 끊긴 running job (프로세스 종료) 은 failed 로 정리
+- 상태: queued → running → succeeded | failed | cancelled
+"""
+
+import json
+import os
+import socket
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from sqlite_pool import SQLitePool
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+  job_id TEXT PRIMARY KEY,
+  kind TEXT NOT NULL,
+  state TEXT NOT NULL,
+  params TEXT,
+  queued_at REAL NOT NULL,
+  started_at REAL,
+  finished_at REAL,
+  heartbeat_at REAL,
+  worker TEXT,
+  stage TEXT,
+  stages TEXT,
+  output TEXT,
+  result_summary TEXT,
+  error TEXT,
+  cancel_requested INTEGER NOT NULL DEFAULT 0
+)
+"""
+_INDEX = "CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state, queued_at)"
+
+_COLUMNS = ("job_id", "kind", "state", "params", "queued_at", "started_at", "finished_at",
+            "heartbeat_at", "worker", "stage", "stages", "output", "result_summary", "error",
+            "cancel_requested")
+_SELECT = f"SELECT {', '.join(_COLUMNS)} FROM jobs"
+
+TERMINAL = ("succeeded", "failed", "cancelled")
+
+
+class JobQueueFull(Exception):
+    """queued job 수 초과 (호출 측에서 503 으로 변환)"""
+
+
+class JobCancelled(Exception):
+    """취소 요청으로 job 중단"""
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+
+
+class JobContext:
+    """job 함수에 전달: 단계 기록, 출력 수집, 취소 확인"""
+
+    def __init__(self, queue: "JobQueue", job_id: str, kind: str, params: dict,
+                 planned: Sequence[str], output_max: int):
+        self.queue = queue
+        self.job_id = job_id
+        self.kind = kind
+        self.params = params
+        self.stages: List[dict] = [{"name": n, "state": "pending"} for n in planned]
+        self.stage_name: Optional[str] = None
+        self.summary: Optional[dict] = None
+        self._output: deque = deque()
+        self._output_len = 0
+        self._output_max = output_max
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+
+    # --- 취소 ---
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled(f"job {self.job_id} cancelled")
+
+    # --- 출력 (최근 output_max 글자만 유지) ---
+    def log(self, text: str):
+        if not text:
+            return
+        with self._lock:
+            self._output.append(text if text.endswith("\n") else text + "\n")
+            self._output_len += len(self._output[-1])
+            while self._output_len > self._output_max and len(self._output) > 1:
+                self._output_len -= len(self._output.popleft())
+
+    def output(self) -> str:
+        with self._lock:
+            text = "".join(self._output)
+        return text[-self._output_max:]
+
+    # --- 진행 요약 (실행 중 result_summary, 결과가 없으면 마지막 값이 최종 요약) ---
+    def report(self, summary: dict):
+        self.summary = summary
+
+    # --- 단계 ---
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self.check_cancelled()
+        entry = next((s for s in self.stages if s["name"] == name and s["state"] == "pending"), None)
+        if entry is None:
+            entry = {"name": name}
+            self.stages.append(entry)
+        entry.update(state="running", started_at=time.time())
+        self.stage_name = name
+        self.queue._persist(self)
+        try:
+            yield
+        except JobCancelled:
+            entry["state"] = "cancelled"
+            raise
+        except BaseException:
+            entry["state"] = "failed"
+            raise
+        else:
+            entry["state"] = "succeeded"
+        finally:
+            entry["finished_at"] = time.time()
+            entry["duration_secs"] = round(entry["finished_at"] - entry["started_at"], 3)
+            self.queue._persist(self)
+
+    def run(self, cmd, cwd=None, timeout: Optional[float] = None, shell: bool = False) -> int:
+        """subprocess 실행: stdout/stderr 를 출력에 수집, 취소 시 terminate, 실패 시 CalledProcessError"""
+        self.check_cancelled()
+        self.log(f"$ {cmd if isinstance(cmd, str) else ' '.join(map(str, cmd))}")
+        proc = subprocess.Popen(cmd, cwd=cwd, shell=shell, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, text=True, encoding="utf-8", errors="replace")
+
+        def _read():
+            for line in proc.stdout:
+                self.log(line)
+
+        reader = threading.Thread(target=_read, name=f"job-output-{self.job_id[:8]}", daemon=True)
+        reader.start()
+        deadline = time.monotonic() + timeout if timeout else None
+        try:
+            while True:
+                try:
+                    rc = proc.wait(0.2)
+                    break
+                except subprocess.TimeoutExpired:
+                    if self._cancel.is_set():
+                        self._kill(proc)
+                        raise JobCancelled(f"job {self.job_id} cancelled")
+                    if deadline is not None and time.monotonic() > deadline:
+                        self._kill(proc)
+                        raise subprocess.TimeoutExpired(cmd, timeout)
+        finally:
+            reader.join(5)
+        if rc != 0:
+            raise subprocess.CalledProcessError(rc, cmd)
+        return rc
+
+    @staticmethod
+    def _kill(proc: subprocess.Popen):
+        proc.terminate()
+        try:
+            proc.wait(5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+class JobQueue:
+    def __init__(self, pool: SQLitePool, workers: int = 2, max_queued: int = 100,
+                 output_max_kb: int = 64, heartbeat_secs: float = 2.0, stale_secs: float = 60.0,
+                 retention_secs: float = 7 * 86400, poll_secs: float = 1.0):
+        self.pool = pool
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.output_max = output_max_kb * 1024
+        self.heartbeat_secs = heartbeat_secs
+        self.stale_secs = stale_secs
+        self.retention_secs = retention_secs
+        self.poll_secs = poll_secs
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._handlers: Dict[str, Callable[[JobContext], Any]] = {}
+        self._planned: Dict[str, Sequence[str]] = {}
+        self._active: Dict[str, JobContext] = {}
+        self._active_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._ready = False
+        self._last_cleanup = 0.0
+        self.executed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.reaped = 0
+
+    def register(self, kind: str, fn: Callable[[JobContext], Any], stages: Sequence[str] = ()):
+        """kind 별 실행 함수. stages 는 진행률 표시용 예정 단계 이름"""
+        self._handlers[kind] = fn
+        self._planned[kind] = tuple(stages)
+
+    # --- 저장소 ---
+    def _ensure(self, conn):
+        if not self._ready:
+            conn.execute(_SCHEMA)
+            conn.execute(_INDEX)
+            self._ready = True
+
+    def _ensure_ready(self):
+        if not self._ready:
+            with self.pool.write() as conn:
+                self._ensure(conn)
+
+    def _row_to_job(self, row) -> dict:
+        r = dict(zip(_COLUMNS, row))
+        stages = json.loads(r["stages"]) if r["stages"] else []
+        for s in stages:
+            s["started_at"] = _iso(s.get("started_at"))
+            s["finished_at"] = _iso(s.get("finished_at"))
+        done = sum(1 for s in stages if s["state"] == "succeeded")
+        end = r["finished_at"] or (time.time() if r["state"] == "running" else None)
+        return {
+            "job_id": r["job_id"],
+            "kind": r["kind"],
+            "state": r["state"],
+            "params": json.loads(r["params"]) if r["params"] else {},
+            "queued_at": _iso(r["queued_at"]),
+            "started_at": _iso(r["started_at"]),
+            "finished_at": _iso(r["finished_at"]),
+            "queue_wait_secs": round(r["started_at"] - r["queued_at"], 3) if r["started_at"] else None,
+            "duration_secs": round(end - r["started_at"], 3) if r["started_at"] and end else None,
+            "stage": r["stage"],
+            "progress": f"{done}/{len(stages)}" if stages else None,
+            "stages": stages,
+            "output_tail": r["output"] or "",
+            "result_summary": json.loads(r["result_summary"]) if r["result_summary"] else None,
+            "error": json.loads(r["error"]) if r["error"] else None,
+            "cancel_requested": bool(r["cancel_requested"]),
+            "worker": r["worker"],
+            "heartbeat_at": _iso(r["heartbeat_at"]),
+        }
+
+    def _persist(self, ctx: JobContext) -> bool:
+        """진행 상황 저장 + 취소 요청 확인. 취소 요청이 있으면 True"""
+        with self.pool.write() as conn:
+            conn.execute(
+                "UPDATE jobs SET heartbeat_at = ?, stage = ?, stages = ?, output = ?, "
+                "result_summary = COALESCE(?, result_summary) WHERE job_id = ?",
+                (time.time(), ctx.stage_name, json.dumps(ctx.stages, ensure_ascii=False), ctx.output(),
+                 json.dumps(ctx.summary, ensure_ascii=False, default=str) if ctx.summary is not None else None,
+                 ctx.job_id),
+            )
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", (ctx.job_id,)).fetchone()
+        if row and row[0]:
+            ctx._cancel.set()
+        return ctx.cancelled
+
+    # --- API ---
+    def submit(self, kind: str, params: Optional[dict] = None) -> dict:
+        if kind not in self._handlers:
+            raise KeyError(f"unknown job kind: {kind}")
+        job_id = str(uuid.uuid4())
+        planned = [{"name": n, "state": "pending"} for n in self._planned[kind]]
+        with self.pool.write() as conn:
+            self._ensure(conn)
+            if self.max_queued:
+                queued = conn.execute("SELECT COUNT(1) FROM jobs WHERE state = 'queued'").fetchone()[0]
+                if queued >= self.max_queued:
+                    raise JobQueueFull(f"{queued} jobs queued (max {self.max_queued})")
+            conn.execute(
+                "INSERT INTO jobs (job_id, kind, state, params, queued_at, stages) VALUES (?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, json.dumps(params or {}, ensure_ascii=False), time.time(), json.dumps(planned)),
+            )
+        with self._cond:
+            self._cond.notify()
+        return self.get(job_id)
+
+    def run_inline(self, kind: str, params: Optional[dict] = None) -> dict:
+        """호출 스레드에서 바로 실행 (scheduler 처럼 이미 lease 를 잡은 호출자용). 완료된 job 반환"""
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        with self.pool.write() as conn:
+            self._ensure(conn)
+            conn.execute(
+                "INSERT INTO jobs (job_id, kind, state, params, queued_at, started_at, heartbeat_at, worker) "
+                "VALUES (?, ?, 'running', ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(params or {}, ensure_ascii=False), now, now, now,
+                 f"{self.worker_id}:inline"),
+            )
+        self._execute(job_id, kind, params or {})
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        self._ensure_ready()
+        with self.pool.connection() as conn:
+            row = conn.execute(f"{_SELECT} WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list(self, state: Optional[str] = None, kind: Optional[str] = None, limit: int = 50) -> List[dict]:
+        self._ensure_ready()
+        q, args = f"{_SELECT} WHERE 1=1", []
+        if state:
+            q += " AND state = ?"
+            args.append(state)
+        if kind:
+            q += " AND kind = ?"
+            args.append(kind)
+        q += " ORDER BY queued_at DESC LIMIT ?"
+        args.append(limit)
+        with self.pool.connection() as conn:
+            rows = conn.execute(q, args).fetchall()
+        return [self._row_to_job(r) for r in rows]
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        """queued 는 즉시 cancelled, running 은 cancel_requested 표시 (실행 worker 가 중단)"""
+        self._ensure_ready()
+        with self.pool.write() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET state = 'cancelled', finished_at = ?, cancel_requested = 1 "
+                "WHERE job_id = ? AND state = 'queued'", (time.time(), job_id))
+            if cur.rowcount == 0:
+                conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE job_id = ? AND state = 'running'",
+                             (job_id,))
+        with self._active_lock:
+            ctx = self._active.get(job_id)
+        if ctx is not None:
+            ctx._cancel.set()
+        return self.get(job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, interval: float = 0.2) -> Optional[dict]:
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            job = self.get(job_id)
+            if job is None or job["state"] in TERMINAL:
+                return job
+            if deadline is not None and time.monotonic() > deadline:
+                return job
+            time.sleep(interval)
+
+    # --- worker pool ---
+    def start(self):
+        if self._threads:
+            return
+        self._ensure_ready()
+        self._stop.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    def stop(self, timeout: float = 5.0):
+        """새 job claim 중단. 실행 중 job 은 취소 요청 후 timeout 까지 대기 (남으면 heartbeat 만료로 정리)"""
+        self._stop.set()
+        with self._active_lock:
+            for ctx in self._active.values():
+                ctx._cancel.set()
+        with self._cond:
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def _claim(self) -> Optional[tuple]:
+        kinds = list(self._handlers)
+        if not kinds:
+            return None
+        marks = ",".join("?" * len(kinds))
+        with self.pool.write() as conn:
+            row = conn.execute(
+                f"SELECT job_id, kind, params FROM jobs WHERE state = 'queued' AND kind IN ({marks}) "
+                "ORDER BY queued_at LIMIT 1", kinds).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            # 다른 프로세스가 먼저 claim 했으면 rowcount 0
+            cur = conn.execute(
+                "UPDATE jobs SET state = 'running', started_at = ?, heartbeat_at = ?, worker = ? "
+                "WHERE job_id = ? AND state = 'queued'",
+                (now, now, f"{self.worker_id}:{threading.current_thread().name}", row[0]))
+            if cur.rowcount != 1:
+                return None
+        return row[0], row[1], json.loads(row[2]) if row[2] else {}
+
+    def _worker(self):
+        while not self._stop.is_set():
+            try:
+                claimed = self._claim()
+            except Exception as e:
+                print(f"❌ job claim: {e}")
+                claimed = None
+            if claimed is None:
+                with self._cond:
+                    self._cond.wait(self.poll_secs)
+                continue
+            self._execute(*claimed)
+
+    def _execute(self, job_id: str, kind: str, params: dict):
+        ctx = JobContext(self, job_id, kind, params, self._planned.get(kind, ()), self.output_max)
+        with self._active_lock:
+            self._active[job_id] = ctx
+        state, result, error = "succeeded", None, None
+        try:
+            self._persist(ctx)
+            result = self._handlers[kind](ctx)
+        except JobCancelled as e:
+            state, error = "cancelled", {"type": "JobCancelled", "message": str(e)}
+        except Exception as e:
+            state, error = "failed", {"type": type(e).__name__, "message": str(e)[:2000]}
+            ctx.log(f"{type(e).__name__}: {e}")
+        finally:
+            with self._active_lock:
+                self._active.pop(job_id, None)
+        if result is None:
+            result = ctx.summary
+        for s in ctx.stages:
+            if s["state"] == "pending":
+                s["state"] = "skipped"
+        self.executed += 1
+        self.failed += state == "failed"
+        self.cancelled += state == "cancelled"
+        with self.pool.write() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, finished_at = ?, heartbeat_at = ?, stage = NULL, stages = ?, "
+                "output = ?, result_summary = ?, error = ? WHERE job_id = ?",
+                (state, time.time(), time.time(), json.dumps(ctx.stages, ensure_ascii=False), ctx.output(),
+                 json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+                 json.dumps(error, ensure_ascii=False) if error else None, job_id),
+            )
+
+    # --- heartbeat / 정리 ---
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.heartbeat_secs):
+            try:
+                self.heartbeat()
+            except Exception as e:
+                print(f"❌ job heartbeat: {e}")
+
+    def heartbeat(self):
+        with self._active_lock:
+            active = list(self._active.values())
+        for ctx in active:
+            self._persist(ctx)
+        now = time.time()
+        with self.pool.write() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET state = 'failed', finished_at = ?, error = ? "
+                "WHERE state = 'running' AND heartbeat_at < ?",
+                (now, json.dumps({"type": "WorkerLost", "message": "no heartbeat (worker exited)"}),
+                 now - self.stale_secs))
+            self.reaped += cur.rowcount
+            if self.retention_secs and now - self._last_cleanup > 300:
+                conn.execute("DELETE FROM jobs WHERE state IN ('succeeded', 'failed', 'cancelled') "
+                             "AND finished_at < ?", (now - self.retention_secs,))
+                self._last_cleanup = now
+
+    def stats(self) -> dict:
+        counts: Dict[str, int] = {}
+        try:
+            self._ensure_ready()
+            with self.pool.connection() as conn:
+                counts = dict(conn.execute("SELECT state, COUNT(1) FROM jobs GROUP BY state").fetchall())
+        except Exception as e:
+            print(f"❌ job stats: {e}")
+        with self._active_lock:
+            active = sorted(self._active)
+        return {
+            "workers": self.workers,
+            "workers_alive": sum(1 for t in self._threads if t.is_alive() and t.name.startswith("job-worker")),
+            "max_queued": self.max_queued,
+            "states": counts,
+            "active_here": active,
+            "executed_here": self.executed,
+            "failed_here": self.failed,
+            "cancelled_here": self.cancelled,
+            "reaped_here": self.reaped,
+        }
@@ -0,0 +1,104 @@
+"""
+json_codec.py — main.py 공용 JSON 인코더/디코더 (orjson → msgspec → stdlib 순으로 선택)
+
+- JSON_CODEC=auto|orjson|msgspec|json (기본 auto: 설치된 것 중 가장 빠른 것)
+- 출력은 항상 UTF-8, 비ASCII 문자 그대로 (json.dumps(..., ensure_ascii=False) 와 동일 의미)
+  단, orjson/msgspec 은 공백 없는 compact 형식 (["a","b"])
+- loads 는 bytes/str 모두 받음 → 요청 raw body 를 한 번만 파싱해서 HMAC 검증과 공유
+- CodecJSONResponse: FastAPI default_response_class 로 쓰는 응답 클래스
+"""
+
+import json
+import os
+from typing import Any, Callable, NamedTuple, Union
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson  # type: ignore
+    _ORJSON_AVAILABLE = True
+except Exception:
+    orjson = None  # type: ignore
+    _ORJSON_AVAILABLE = False
+
+try:
+    import msgspec  # type: ignore
+    _MSGSPEC_AVAILABLE = True
+except Exception:
+    msgspec = None  # type: ignore
+    _MSGSPEC_AVAILABLE = False
+
+
+class Codec(NamedTuple):
+    name: str
+    loads: Callable[[Union[bytes, str]], Any]
+    dumps_bytes: Callable[[Any], bytes]
+
+
+def _stdlib_dumps_bytes(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _orjson_dumps_bytes(obj: Any) -> bytes:
+    try:
+        return orjson.dumps(obj)
+    except TypeError:
+        # orjson 이 처리 못 하는 타입 (str 이 아닌 dict key, 64bit 초과 정수 등)
+        return _stdlib_dumps_bytes(obj)
+
+
+def _msgspec_codec() -> Codec:
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def loads(data: Union[bytes, str]) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            # 다른 codec 과 같이 ValueError 로 통일
+            raise ValueError(str(e)) from e
+
+    def dumps_bytes(obj: Any) -> bytes:
+        try:
+            return encoder.encode(obj)
+        except TypeError:
+            return _stdlib_dumps_bytes(obj)
+
+    return Codec("msgspec", loads, dumps_bytes)
+
+
+STDLIB = Codec("json", json.loads, _stdlib_dumps_bytes)
+
+
+def get_codec(name: str = "auto") -> Codec:
+    """이름으로 codec 선택. 요청한 라이브러리가 없으면 다음 후보로 대체"""
+    name = (name or "auto").lower()
+    if name in ("auto", "orjson") and _ORJSON_AVAILABLE:
+        return Codec("orjson", orjson.loads, _orjson_dumps_bytes)
+    if name in ("auto", "orjson", "msgspec") and _MSGSPEC_AVAILABLE:
+        return _msgspec_codec()
+    return STDLIB
+
+
+CODEC = get_codec(os.getenv("JSON_CODEC", "auto"))
+BACKEND = CODEC.name
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    return CODEC.loads(data)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    return CODEC.dumps_bytes(obj)
+
+
+def dumps(obj: Any) -> str:
+    """문자열 JSON (CSV/SQLite 컬럼, Bronze 한 줄 등)"""
+    return CODEC.dumps_bytes(obj).decode("utf-8")
+
+
+class CodecJSONResponse(JSONResponse):
+    """선택된 codec 으로 렌더링하는 JSONResponse"""
+
+    def render(self, content: Any) -> bytes:
+        return CODEC.dumps_bytes(content)
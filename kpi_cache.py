@@ -0,0 +1,203 @@
+"""
+kpi_cache.py — 데이터 버전 기반 KPI 응답 캐시 (ETag + single-flight)
+
+- data_version 테이블 (SQLite, 모든 worker 공유): ingest commit 마다 `logs`, 파이프라인 완료마다
+  `pipeline` 버전 증가. 캐시 키에 버전이 들어가므로 무효화 없이 새 데이터 → 새 키
+- 응답은 직렬화된 body bytes 로 저장 (hit 시 DuckDB/직렬화 없이 그대로 반환), ETag = body 해시
+- single-flight: 같은 키의 동시 miss N 개 중 1개만 계산, 나머지는 결과를 기다림 (프로세스 내)
+- shared=True: 프로세스 LRU miss 시 SQLite `kpi_cache` 테이블 조회/저장 (uvicorn --workers N 간 공유)
+- ttl_secs: 버전으로 잡히지 않는 외부 변경 (API 밖에서 돈 파이프라인 등) 대비 상한
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlite_pool import SQLitePool
+
+_VERSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS data_version (
+  name TEXT PRIMARY KEY,
+  version INTEGER NOT NULL DEFAULT 0,
+  updated_at REAL
+)
+"""
+
+_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kpi_cache (
+  key TEXT PRIMARY KEY,
+  etag TEXT NOT NULL,
+  body BLOB NOT NULL,
+  headers TEXT,
+  created_at REAL NOT NULL
+)
+"""
+
+_BUMP_SQL = """
+INSERT INTO data_version(name, version, updated_at) VALUES(?, 1, ?)
+ON CONFLICT(name) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at
+"""
+
+# (etag, body, headers, created_at)
+Entry = Tuple[str, bytes, Dict[str, str], float]
+
+
+class KpiCache:
+    def __init__(self, pool: SQLitePool, size: int = 256, ttl_secs: float = 60, shared: bool = False):
+        self.pool = pool
+        self.size = size
+        self.ttl_secs = ttl_secs
+        self.shared = shared
+        self._lru: "OrderedDict[str, Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Event] = {}
+        self._ready = False
+        self._last_prune = 0.0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.not_modified = 0
+
+    # --- 데이터 버전 ---
+    def ensure(self, conn):
+        if not self._ready:
+            conn.execute(_VERSION_SCHEMA)
+            conn.execute(_CACHE_SCHEMA)
+            self._ready = True
+
+    def bump_in(self, conn, name: str):
+        """호출 측 쓰기 트랜잭션 안에서 버전 증가 (commit 과 원자적)"""
+        conn.execute(_BUMP_SQL, (name, time.time()))
+
+    def bump(self, name: str):
+        with self.pool.write() as conn:
+            self.ensure(conn)
+            self.bump_in(conn, name)
+
+    def versions(self) -> Dict[str, int]:
+        if not self._ready:
+            with self.pool.write() as conn:
+                self.ensure(conn)
+        with self.pool.connection() as conn:
+            return dict(conn.execute("SELECT name, version FROM data_version").fetchall())
+
+    # --- 캐시 ---
+    @staticmethod
+    def make_key(*parts) -> str:
+        raw = json.dumps(parts, ensure_ascii=False, default=str, separators=(",", ":"))
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+    def _fresh(self, entry: Entry) -> bool:
+        return not self.ttl_secs or time.time() - entry[3] < self.ttl_secs
+
+    def _local_get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is None:
+                return None
+            if not self._fresh(entry):
+                del self._lru[key]
+                return None
+            self._lru.move_to_end(key)
+            return entry
+
+    def _local_put(self, key: str, entry: Entry):
+        with self._lock:
+            self._lru[key] = entry
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.size:
+                self._lru.popitem(last=False)
+
+    def _shared_get(self, key: str) -> Optional[Entry]:
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT etag, body, headers, created_at FROM kpi_cache WHERE key = ?",
+                               (key,)).fetchone()
+        if row is None:
+            return None
+        entry = (row[0], bytes(row[1]), json.loads(row[2] or "{}"), row[3])
+        return entry if self._fresh(entry) else None
+
+    def _shared_put(self, key: str, entry: Entry):
+        now = time.time()
+        with self.pool.write() as conn:
+            conn.execute("INSERT OR REPLACE INTO kpi_cache(key, etag, body, headers, created_at) VALUES(?,?,?,?,?)",
+                         (key, entry[0], entry[1], json.dumps(entry[2]), entry[3]))
+            # 키에 버전이 들어가므로 옛 항목은 다시 읽히지 않음 → 주기적으로 정리
+            if now - self._last_prune > max(self.ttl_secs, 10):
+                conn.execute("DELETE FROM kpi_cache WHERE created_at < ?", (now - max(self.ttl_secs, 10),))
+                self._last_prune = now
+
+    def get_or_compute(self, key: str,
+                       compute: Callable[[], Tuple[bytes, Dict[str, str], bool]]) -> Tuple[Entry, str]:
+        """(entry, source) — source: hit | shared | miss | coalesced | uncached.
+        compute() → (body, headers, cacheable). 실패 결과(cacheable=False)는 저장하지 않음"""
+        while True:
+            entry = self._local_get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry, "hit"
+            with self._lock:
+                waiter = self._inflight.get(key)
+                if waiter is None:
+                    leader = self._inflight[key] = threading.Event()
+            if waiter is None:
+                break
+            # 같은 키를 계산 중인 요청이 있으면 끝날 때까지 대기 후 다시 조회
+            waiter.wait()
+            entry = self._local_get(key)
+            if entry is not None:
+                self.coalesced += 1
+                return entry, "coalesced"
+            # leader 결과가 cacheable 이 아니었음 → 직접 계산 (다시 single-flight)
+        try:
+            if self.shared:
+                try:
+                    entry = self._shared_get(key)
+                except Exception as e:
+                    print(f"❌ kpi cache shared get: {e}")
+                    entry = None
+                if entry is not None:
+                    self.shared_hits += 1
+                    self._local_put(key, entry)
+                    return entry, "shared"
+            self.misses += 1
+            body, headers, cacheable = compute()
+            entry = (self.make_etag(body), body, headers, time.time())
+            if not cacheable:
+                return entry, "uncached"
+            self._local_put(key, entry)
+            if self.shared:
+                try:
+                    self._shared_put(key, entry)
+                except Exception as e:
+                    print(f"❌ kpi cache shared put: {e}")
+            return entry, "miss"
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            leader.set()
+
+    def not_modified_hit(self):
+        self.not_modified += 1
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._lru),
+            "size": self.size,
+            "ttl_secs": self.ttl_secs,
+            "shared": self.shared,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "not_modified": self.not_modified,
+            "inflight": len(self._inflight),
+        }
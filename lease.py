@@ -0,0 +1,118 @@
+"""
+lease.py — SQLite 기반 프로세스 간 debounce + 실행 lease (uvicorn/gunicorn --workers N)
+
+- 모든 worker 가 같은 SQLite 파일의 `leases` 행 하나를 공유
+- try_acquire: 조건부 UPDATE 한 문장으로 판정 (read → write 승격 없이 원자적)
+    · 실행 중인 lease (expires_at > now) 가 있으면 실패 → 동시 실행 없음
+    · debounce 창 (last_run + debounce_secs > now) 안이면 실패
+- release: 보유자(holder 토큰)만 해제 가능. 프로세스가 죽으면 ttl 경과 후 자동 만료
+- 실패 시 debounce 창 끝까지 (실행 중이면 최소 retry_secs) SQLite 에 가지 않고 프로세스 안에서 바로 거절
+  → 요청마다 트리거해도 SQLite 쓰기는 worker 당 초당 1회 이하
+"""
+
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from typing import Optional
+
+from sqlite_pool import SQLitePool
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+  name TEXT PRIMARY KEY,
+  holder TEXT,
+  last_run REAL NOT NULL DEFAULT 0,
+  expires_at REAL NOT NULL DEFAULT 0,
+  last_finished REAL,
+  last_status TEXT,
+  runs INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+_ACQUIRE_SQL = """
+UPDATE leases SET holder = ?, last_run = ?, expires_at = ?, runs = runs + 1
+ WHERE name = ? AND expires_at <= ? AND last_run <= ?
+"""
+
+_RELEASE_SQL = """
+UPDATE leases SET holder = NULL, expires_at = 0, last_finished = ?, last_status = ?
+ WHERE name = ? AND holder = ?
+"""
+
+
+class SQLiteLease:
+    def __init__(self, pool: SQLitePool, name: str, debounce_secs: float = 60, ttl_secs: float = 900,
+                 retry_secs: float = 1.0):
+        self.pool = pool
+        self.name = name
+        self.debounce_secs = debounce_secs
+        self.ttl_secs = ttl_secs
+        self.retry_secs = retry_secs
+        self._not_before = 0.0
+        self._ready = False
+        self.acquired = 0
+        self.skipped = 0
+
+    def _ensure(self, conn):
+        if not self._ready:
+            conn.execute(_SCHEMA)
+            conn.execute("INSERT OR IGNORE INTO leases(name) VALUES(?)", (self.name,))
+            self._ready = True
+
+    def try_acquire(self, debounce: bool = True) -> Optional[str]:
+        """획득 시 holder 토큰, 실행 중이거나 debounce 창 안이면 None"""
+        now = time.time()
+        if debounce and now < self._not_before:
+            self.skipped += 1
+            return None
+        token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        newest_allowed = now - self.debounce_secs if debounce else now
+        with self.pool.write() as conn:
+            self._ensure(conn)
+            cur = conn.execute(_ACQUIRE_SQL, (token, now, now + self.ttl_secs,
+                                              self.name, now, newest_allowed))
+            ok = cur.rowcount == 1
+            if not ok:
+                last_run, expires_at = conn.execute(
+                    "SELECT last_run, expires_at FROM leases WHERE name = ?", (self.name,)).fetchone()
+        if ok:
+            self.acquired += 1
+            return token
+        self.skipped += 1
+        if debounce:
+            # 실행 중이면 언제 끝날지 모르므로 retry_secs 간격, 아니면 debounce 창 끝까지
+            self._not_before = last_run + self.debounce_secs
+            if expires_at > now:
+                self._not_before = max(self._not_before, now + self.retry_secs)
+        return None
+
+    def release(self, token: str, status: str = "ok") -> bool:
+        with self.pool.write() as conn:
+            self._ensure(conn)
+            cur = conn.execute(_RELEASE_SQL, (time.time(), status, self.name, token))
+            return cur.rowcount == 1
+
+    def state(self) -> dict:
+        try:
+            with self.pool.connection() as conn:
+                row = conn.execute(
+                    "SELECT holder, last_run, expires_at, last_finished, last_status, runs FROM leases WHERE name = ?",
+                    (self.name,),
+                ).fetchone()
+        except sqlite3.OperationalError:  # 아직 어느 worker 도 lease 를 잡지 않음 (테이블 없음)
+            row = None
+        holder, last_run, expires_at, last_finished, last_status, runs = row or (None, 0, 0, None, None, 0)
+        return {
+            "name": self.name,
+            "running": bool(holder) and expires_at > time.time(),
+            "holder": holder,
+            "last_run": last_run,
+            "expires_at": expires_at,
+            "last_finished": last_finished,
+            "last_status": last_status,
+            "runs": runs,
+            "acquired_here": self.acquired,
+            "skipped_here": self.skipped,
+        }
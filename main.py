@@ -1,14 +1,12 @@
-from fastapi import FastAPI, Header, HTTPException, Request, Query, APIRouter, BackgroundTasks
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from fastapi import FastAPI, Header, HTTPException, Request, Query, APIRouter, BackgroundTasks, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, ValidationError
+from typing import Iterator, List, Optional
 from datetime import datetime, timezone, timedelta
 import base64, hmac, hashlib, os, csv, sqlite3, json
-import uuid
 from pathlib import Path
 import subprocess
 import sys
-import os
 from fastapi.openapi.utils import get_openapi
 import threading
 import time
@@ -18,11 +16,28 @@ try:
 except Exception:
     psutil = None  # type: ignore
     _PSUTIL_AVAILABLE = False
-import json, re
+import re
 import io
-from fastapi import Response
-from typing import Optional
-from hvdc_logs.pipeline_sequence import run_pipeline_sequence
+import zlib
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from hvdc_logs.pipeline_sequence import stage_commands, run_transform
+from hvdc_logs.bronze_writer import BronzeWriter
+from hvdc_logs.file_lock import FileLock
+from ingest_queue import WriteBehindQueue, QueueFull
+from sqlite_pool import SQLitePool
+from idempotency import IdempotencyFilter, DUPLICATE, NEW
+from lease import SQLiteLease
+from pipeline_scheduler import CoalescingScheduler
+from jobs import JobQueue, JobQueueFull
+from kpi_cache import KpiCache
+from duckdb_pool import DuckDBReadPool, SnapshotDeferred
+import json_codec
+import arrow_format
+from json_codec import CodecJSONResponse
+from access_log import AccessLog
+import instrumentation
+from instrumentation import timed
 
 # --- 설정 ---
 API_KEY = os.getenv("API_KEY", "")  # 선택
@@ -35,11 +50,35 @@ DATA_DIR = Path(
 )
 CSV_PATH = DATA_DIR / "logs.csv"
 SQLITE_PATH = DATA_DIR / "sqlite"
+# SQLite 커넥션 풀 (WAL)
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+SQLITE_MMAP_MB = int(os.getenv("SQLITE_MMAP_MB", "256"))
+SQLITE_CACHE_MB = int(os.getenv("SQLITE_CACHE_MB", "64"))
+# request_id 중복 필터 (LRU + Bloom)
+IDEMPOTENCY_LRU_SIZE = int(os.getenv("IDEMPOTENCY_LRU_SIZE", "10000"))
+IDEMPOTENCY_BLOOM_CAPACITY = int(os.getenv("IDEMPOTENCY_BLOOM_CAPACITY", "1000000"))
+IDEMPOTENCY_BLOOM_FP = float(os.getenv("IDEMPOTENCY_BLOOM_FP", "0.001"))
+# GET /logs 페이지 크기 상한 (bulk-sync 토큰을 보낸 클라이언트는 LOGS_BULK_PAGE_MAX 까지)
+LOGS_PAGE_MAX = int(os.getenv("LOGS_PAGE_MAX", "200"))
+LOGS_BULK_PAGE_MAX = int(os.getenv("LOGS_BULK_PAGE_MAX", "5000"))
+LOGS_BULK_SYNC_TOKEN = os.getenv("LOGS_BULK_SYNC_TOKEN", "")  # 비어 있으면 bulk 페이지 비활성
+LOGS_ARROW_BATCH_ROWS = int(os.getenv("LOGS_ARROW_BATCH_ROWS", "1000"))  # format=arrow|parquet 스트리밍 record batch 크기
+# GET /kpi/export.csv 스트리밍: fetchmany 배치 = 응답 chunk 단위, Accept-Encoding: gzip 이면 압축
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "5000"))
+EXPORT_GZIP = os.getenv("EXPORT_GZIP", "on").lower() in ("1", "on", "true", "yes")
+EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "6"))
 # WhatsApp JSON 저장 루트 (선택)
 WHATSAPP_LOG_DIR = Path(os.getenv("HVDC_WHATSAPP_LOG_DIR", r"C:\hvdc\data\whatsapp_logs"))
 
 DUCKDB_PATH = Path(os.getenv("DUCKDB_PATH", "hvdc_logs/duckdb/hvdc.duckdb"))
 DUCKDB_ENABLED = DUCKDB_PATH.exists()
+# KPI 조회용 read-only snapshot 커넥션 (off: 요청마다 원본 connect)
+DUCKDB_POOL = os.getenv("DUCKDB_POOL", "on").lower() in ("1", "on", "true", "yes")
+DUCKDB_SERVING_DIR = Path(os.getenv("DUCKDB_SERVING_DIR", str(DATA_DIR / "duckdb_serving")))
+DUCKDB_POOL_CHECK_MS = int(os.getenv("DUCKDB_POOL_CHECK_MS", "1000"))  # 원본 변경 (mtime/size) 확인 주기
+# /kpi: API 적재 행의 DuckDB rollup (bronze_stage.py 의 high-water mark 까지) + 그 이후 SQLite 행을 합침
+# (off: 기존 DuckDB sla_log KPI)
+KPI_HYBRID = os.getenv("KPI_HYBRID", "off").lower() in ("1", "on", "true", "yes")
 
 # HVDC Pipeline paths
 HVDC_BASE = Path("hvdc_logs")
@@ -49,20 +88,99 @@ HVDC_TRANSFORM_SQL = HVDC_BASE / "transform.sql"
 # --- Bronze 자동화 설정 ---
 GST = timezone(timedelta(hours=4))  # Asia/Dubai
 BRONZE_ROOT = Path("hvdc_logs/bronze")
-
-# --- 파이프라인 디바운스 설정 ---
-_last_run = 0
-_lock = threading.Lock()
-DEBOUNCE_SECS = 60
+BRONZE_MAX_OPEN = int(os.getenv("BRONZE_MAX_OPEN", "64"))      # 열어 둘 (일자, 그룹) 핸들 수
+BRONZE_MAX_MB = int(os.getenv("BRONZE_MAX_MB", "64"))          # segment 크기 상한 (0 = 무제한)
+BRONZE_MAX_LINES = int(os.getenv("BRONZE_MAX_LINES", "0"))     # segment 줄 수 상한 (0 = 무제한)
+BRONZE_FSYNC = os.getenv("BRONZE_FSYNC", "rotation").lower()   # always | interval | rotation
+BRONZE_FSYNC_MS = int(os.getenv("BRONZE_FSYNC_MS", "1000"))    # interval 정책 주기
+BRONZE_COMPRESSION = os.getenv("BRONZE_COMPRESSION", "none")  # none | gzip | zstd (zstandard 필요)
+BRONZE_FRAME_RECORDS = int(os.getenv("BRONZE_FRAME_RECORDS", "256"))  # 압축 frame 당 레코드 수
+# 여러 worker 가 같은 Bronze 파일에 append (파일 lock + rotation 동기화). 기본: WEB_CONCURRENCY > 1 이면 on
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+BRONZE_SHARED = os.getenv("BRONZE_SHARED", "on" if WEB_CONCURRENCY > 1 else "off").lower() in ("1", "on", "true", "yes")
+BRONZE_MASK_FIELDS = ("summary", "sender")                      # PII 마스킹 필드 (hvdc_logs.pii)
+
+# --- WhatsApp export import 설정 ---
+IMPORT_DIR = Path(os.getenv("WHATSAPP_IMPORT_DIR", str(DATA_DIR / "imports")))  # 허용 경로 루트
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "0"))     # 파싱 프로세스 수 (0 = min(4, CPU))
+IMPORT_CHUNK_MB = int(os.getenv("IMPORT_CHUNK_MB", "8"))   # 프로세스당 파싱 구간 크기
+
+# --- 파이프라인 스케줄러 설정 ---
+# ingest 는 dirty 표시만, 실행/dirty 상태는 SQLite (leases, pipeline_state) 로 모든 worker 가 공유
+PIPELINE_MIN_INTERVAL_SECS = int(os.getenv("PIPELINE_MIN_INTERVAL_SECS", "60"))    # 실행 시작 간 최소 간격
+PIPELINE_MAX_STALENESS_SECS = int(os.getenv("PIPELINE_MAX_STALENESS_SECS", "300"))  # 초과 시 최소 간격 무시 (0 = 끔)
+PIPELINE_TICK_MS = int(os.getenv("PIPELINE_TICK_MS", "500"))                       # dirty 반영/실행 판정 주기
+PIPELINE_LEASE_SECS = int(os.getenv("PIPELINE_LEASE_SECS", "900"))  # 실행 lease 만료 = 파이프라인 timeout
+
+# --- KPI 응답 캐시 (/kpi, /hvdc/kpi) ---
+KPI_CACHE = os.getenv("KPI_CACHE", "on").lower() in ("1", "on", "true", "yes")
+KPI_CACHE_SIZE = int(os.getenv("KPI_CACHE_SIZE", "256"))            # 프로세스 LRU 항목 수
+KPI_CACHE_TTL_SECS = float(os.getenv("KPI_CACHE_TTL_SECS", "60"))   # 버전 밖 변경 (외부 파이프라인) 대비 상한
+# SQLite kpi_cache 테이블로 worker 간 공유 (여러 worker 면 기본 on)
+KPI_CACHE_SHARED = os.getenv("KPI_CACHE_SHARED", "on" if WEB_CONCURRENCY > 1 else "off").lower() in ("1", "on", "true", "yes")
+
+# --- job 큐 (/hvdc/run, /hvdc/transform, 자동 실행) ---
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))                  # worker 프로세스당 job 실행 스레드 수
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "100"))            # queued job 상한 (초과 시 503, 0 = 무제한)
+JOB_OUTPUT_MAX_KB = int(os.getenv("JOB_OUTPUT_MAX_KB", "64"))     # job 당 보관하는 출력 tail
+JOB_HEARTBEAT_SECS = float(os.getenv("JOB_HEARTBEAT_SECS", "2"))  # 진행 상황 저장/취소 확인 주기
+JOB_STALE_SECS = float(os.getenv("JOB_STALE_SECS", "60"))         # heartbeat 끊긴 running job → failed
+JOB_RETENTION_DAYS = float(os.getenv("JOB_RETENTION_DAYS", "7"))  # 완료 job 보관 기간
 start_ts = time.time()
 
+# --- write-behind 적재 설정 ---
+# INGEST_MODE: sync(기본, 요청마다 즉시 저장) | write_behind(큐 적재 후 group-commit)
+INGEST_MODE = os.getenv("INGEST_MODE", "sync").lower()
+INGEST_FLUSH_MS = int(os.getenv("INGEST_FLUSH_MS", "50"))        # 최대 대기 시간 (N ms)
+INGEST_BATCH_ROWS = int(os.getenv("INGEST_BATCH_ROWS", "500"))   # 최대 묶음 크기 (M rows)
+INGEST_QUEUE_MAX = int(os.getenv("INGEST_QUEUE_MAX", "10000"))   # 큐 깊이 상한 (초과 시 503)
+# INGEST_DURABILITY: commit(commit 후 응답) | enqueue(큐 적재 즉시 202 응답)
+INGEST_DURABILITY = os.getenv("INGEST_DURABILITY", "commit").lower()
+
+# --- access log 설정 ---
+ACCESS_LOG_BUFFER = int(os.getenv("ACCESS_LOG_BUFFER", "10000"))      # ring buffer 크기 (초과 시 오래된 항목 버림)
+ACCESS_LOG_FLUSH_MS = int(os.getenv("ACCESS_LOG_FLUSH_MS", "500"))    # 파일 append 주기
+ACCESS_DIGEST_SECS = int(os.getenv("ACCESS_DIGEST_SECS", "30"))       # 알림 요약 주기
+ACCESS_NOTIFY = os.getenv("ACCESS_NOTIFY", "on").lower() not in ("0", "off", "false", "no")  # headless: off
+
+# Server-Timing 응답 헤더 (auth/hmac/csv/sqlite/bronze/trigger, KPI duckdb 단계). 내부 구조가 노출되므로 기본 off
+SERVER_TIMING = os.getenv("SERVER_TIMING", "off").lower() in ("1", "on", "true", "yes")
+
 TZ = timezone.utc
 
+_sqlite_pool = SQLitePool(
+    SQLITE_PATH,
+    size=SQLITE_POOL_SIZE,
+    mmap_size=SQLITE_MMAP_MB * 1024 * 1024,
+    cache_size_kib=SQLITE_CACHE_MB * 1024,
+)
+
+_pipeline_lease = SQLiteLease(_sqlite_pool, "hvdc_pipeline",
+                              debounce_secs=PIPELINE_MIN_INTERVAL_SECS, ttl_secs=PIPELINE_LEASE_SECS)
+
+# data_version (logs: ingest commit, pipeline: 파이프라인 완료) + KPI 응답 캐시
+_kpi_cache = KpiCache(_sqlite_pool, size=KPI_CACHE_SIZE, ttl_secs=KPI_CACHE_TTL_SECS, shared=KPI_CACHE_SHARED)
+
+# 파이프라인 lease 보유 중 (어느 worker 든 bronze/silver/run_pipeline 이 원본에 쓰는 중) 이면 publish 보류
+_duckdb_pool = DuckDBReadPool(DUCKDB_PATH, DUCKDB_SERVING_DIR, check_interval_secs=DUCKDB_POOL_CHECK_MS / 1000.0,
+                              writer_active=lambda: _pipeline_lease.state()["running"])
+
+# logs.csv append 는 worker 간 파일 lock 으로 직렬화 (헤더 생성 포함)
+_csv_lock = FileLock(CSV_PATH.parent / (CSV_PATH.name + ".lock"))
+
+_idempotency = IdempotencyFilter(
+    lru_size=IDEMPOTENCY_LRU_SIZE,
+    bloom_capacity=IDEMPOTENCY_BLOOM_CAPACITY,
+    error_rate=IDEMPOTENCY_BLOOM_FP,
+)
+
 # --- 보조: 보안 ---
+@timed("stage", phase="auth", stage="auth")
 def _require_api_key(x_api_key: Optional[str]):
     if API_KEY and x_api_key != API_KEY:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
+@timed("stage", phase="hmac", stage="hmac")
 def _verify_hmac(raw_body: bytes, x_signature: Optional[str]):
     if not HMAC_SECRET:
         return
@@ -81,17 +199,27 @@ def _ensure_storage():
     SQLITE_PATH.parent.mkdir(exist_ok=True)
     
     # Create CSV if not exists
-    if not CSV_PATH.exists():
-        with CSV_PATH.open("w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                "date_gst", "group_name", "summary", "top_keywords",
-                "sla_breaches", "attachments", "created_at", "request_id", "processed_status"
-            ])
+    with _csv_lock:
+        if not CSV_PATH.exists():
+            with CSV_PATH.open("w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow([
+                    "date_gst", "group_name", "summary", "top_keywords",
+                    "sla_breaches", "attachments", "created_at", "request_id", "processed_status"
+                ])
     
     # Create SQLite if not exists
-    if not SQLITE_PATH.exists():
-        conn = sqlite3.connect(str(SQLITE_PATH))
+    # (파일 존재 여부가 아니라 테이블 기준: 다른 worker 가 빈 파일만 만든 상태일 수 있음)
+    with _sqlite_pool.write() as conn:
+        # 스키마 확인 → migration 을 worker 간 직렬화 (두 worker 가 같은 ALTER 를 실행하지 않도록)
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS groups (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE,
+                created_at TEXT
+            )
+        """)
         conn.execute("""
             CREATE TABLE IF NOT EXISTS logs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -103,124 +231,547 @@ def _ensure_storage():
                 attachments TEXT,
                 created_at TEXT NOT NULL,
                 request_id TEXT UNIQUE,
-                processed_status TEXT DEFAULT 'ok'
+                processed_status TEXT DEFAULT 'ok',
+                group_id INTEGER REFERENCES groups(id)
             )
         """)
-        conn.commit()
-        conn.close()
+        _kpi_cache.ensure(conn)
+        backfilled = _migrate_group_ids(conn)
+        rollups_exist = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ('kpi_daily', 'kpi_rollup')"
+        ).fetchone()[0] == 2
+        conn.execute(_KPI_DAILY_SCHEMA)
+        conn.execute(_KPI_ROLLUP_SCHEMA)
+        if not rollups_exist or backfilled:
+            # 기존 DB / rollup 밖에서 들어온 행: logs 전체에서 생성 (이후에는 insert 트랜잭션에서 증분 갱신)
+            print(f"🔧 migration: kpi rollups built ({_rebuild_kpi_rollups_in(conn)})")
+        # GET /logs keyset pagination: ORDER BY created_at DESC, id DESC 를 인덱스 순회로
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_created_id ON logs(created_at DESC, id DESC)")
+        # 그룹 필터: (group_id, created_at) → /logs, /kpi since/until, (group_id, date_gst) → 일자별 KPI
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_group_created ON logs(group_id, created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_group_date ON logs(group_id, date_gst)")
+        # /kpi/export.csv: ORDER BY date_gst DESC 를 정렬 없이 인덱스 순회로 (첫 바이트가 테이블 크기와 무관)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_date ON logs(date_gst)")
+
+# --- 일자별 KPI rollup (logs insert 와 같은 트랜잭션에서 증분 갱신) ---
+_KPI_DAILY_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS kpi_daily (
+        date TEXT NOT NULL,
+        group_id INTEGER NOT NULL REFERENCES groups(id),
+        logs_count INTEGER NOT NULL DEFAULT 0,
+        sla_breaches_sum INTEGER NOT NULL DEFAULT 0,
+        last_created_at TEXT,
+        PRIMARY KEY (date, group_id)
+    ) WITHOUT ROWID
+"""
+
+_KPI_DAILY_UPSERT_SQL = """
+  INSERT INTO kpi_daily(date, group_id, logs_count, sla_breaches_sum, last_created_at)
+  VALUES(?,?,?,?,?)
+  ON CONFLICT(date, group_id) DO UPDATE SET
+    logs_count = logs_count + excluded.logs_count,
+    sla_breaches_sum = sla_breaches_sum + excluded.sla_breaches_sum,
+    last_created_at = MAX(COALESCE(last_created_at, ''), excluded.last_created_at)
+"""
+
+# logs 에서 직접 집계 (rebuild / 정합성 검사 공용)
+_KPI_DAILY_AGG_SQL = """
+  SELECT substr(date_gst,1,10), group_id, COUNT(*), SUM(COALESCE(sla_breaches,0)), MAX(created_at)
+    FROM logs WHERE group_id IS NOT NULL GROUP BY 1, 2
+"""
+
+# 시간/주/월 rollup (일자는 kpi_daily). date_gst 가 GST 벽시계 시각이므로 구간 경계도 GST
+# bucket: hour 'YYYY-MM-DD HH:00:00', week 월요일 'YYYY-MM-DD' (ISO 주), month 'YYYY-MM-01'
+_KPI_ROLLUP_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS kpi_rollup (
+        granularity TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        group_id INTEGER NOT NULL REFERENCES groups(id),
+        logs_count INTEGER NOT NULL DEFAULT 0,
+        sla_breaches_sum INTEGER NOT NULL DEFAULT 0,
+        last_created_at TEXT,
+        PRIMARY KEY (granularity, bucket, group_id)
+    ) WITHOUT ROWID
+"""
+
+_KPI_ROLLUP_UPSERT_SQL = """
+  INSERT INTO kpi_rollup(granularity, bucket, group_id, logs_count, sla_breaches_sum, last_created_at)
+  VALUES(?,?,?,?,?,?)
+  ON CONFLICT(granularity, bucket, group_id) DO UPDATE SET
+    logs_count = logs_count + excluded.logs_count,
+    sla_breaches_sum = sla_breaches_sum + excluded.sla_breaches_sum,
+    last_created_at = MAX(COALESCE(last_created_at, ''), excluded.last_created_at)
+"""
+
+KPI_GRANULARITY_PATTERN = "^(hour|day|week|month)$"
+
+def _week_start(day: str) -> str:
+    d = datetime.strptime(day, "%Y-%m-%d")
+    return (d - timedelta(days=d.weekday())).strftime("%Y-%m-%d")
+
+# granularity → (date_gst → bucket, 같은 값을 만드는 SQLite 식)
+_KPI_BUCKETS = {
+    "hour": (lambda dg: dg[:13] + ":00:00", "substr(date_gst,1,13) || ':00:00'"),
+    "week": (lambda dg: _week_start(dg[:10]), "date(substr(date_gst,1,10), 'weekday 0', '-6 days')"),
+    "month": (lambda dg: dg[:7] + "-01", "substr(date_gst,1,7) || '-01'"),
+}
+
+def _kpi_rollup_agg_sql(granularity: str) -> str:
+    return (f"SELECT '{granularity}' AS granularity, {_KPI_BUCKETS[granularity][1]} AS bucket, group_id, "
+            "COUNT(*) AS cnt, SUM(COALESCE(sla_breaches,0)) AS sla, MAX(created_at) AS last_created_at "
+            "FROM logs WHERE group_id IS NOT NULL GROUP BY 2, 3")
+
+def _kpi_rollups_add(conn, payloads: List[dict], group_ids: dict):
+    """삽입된 행을 (일자, 그룹) · (granularity, 구간, 그룹) 별로 합쳐 upsert (배치 500건 → 몇 건의 upsert)"""
+    daily: dict = {}
+    buckets: dict = {}
+
+    def _acc(agg: dict, key: tuple, sla: int, created_at: str):
+        cnt, total, last = agg.get(key, (0, 0, ""))
+        agg[key] = (cnt + 1, total + sla, max(last, created_at))
+
+    for p in payloads:
+        gid = group_ids[p["group_name"]]
+        sla = int(p.get("sla_breaches") or 0)
+        _acc(daily, (p["date_gst"][:10], gid), sla, p["created_at"])
+        for granularity, (bucket_of, _) in _KPI_BUCKETS.items():
+            _acc(buckets, (granularity, bucket_of(p["date_gst"]), gid), sla, p["created_at"])
+    conn.executemany(_KPI_DAILY_UPSERT_SQL, [(d, g, c, s, l) for (d, g), (c, s, l) in daily.items()])
+    conn.executemany(_KPI_ROLLUP_UPSERT_SQL, [k + v for k, v in buckets.items()])
+
+def _rebuild_kpi_rollups_in(conn) -> dict:
+    conn.execute("DELETE FROM kpi_daily")
+    conn.execute(f"INSERT INTO kpi_daily(date, group_id, logs_count, sla_breaches_sum, last_created_at) {_KPI_DAILY_AGG_SQL}")
+    conn.execute("DELETE FROM kpi_rollup")
+    for granularity in _KPI_BUCKETS:
+        conn.execute("INSERT INTO kpi_rollup(granularity, bucket, group_id, logs_count, sla_breaches_sum, "
+                     f"last_created_at) {_kpi_rollup_agg_sql(granularity)}")
+    counts = {"day": conn.execute("SELECT COUNT(*) FROM kpi_daily").fetchone()[0]}
+    counts.update(conn.execute("SELECT granularity, COUNT(*) FROM kpi_rollup GROUP BY 1").fetchall())
+    return counts
+
+def rebuild_kpi_rollups() -> dict:
+    """kpi_daily / kpi_rollup 을 logs 전체에서 다시 생성 (한 트랜잭션, 쓰기는 그동안 대기). granularity 별 행 수"""
+    with _sqlite_pool.write() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        return _rebuild_kpi_rollups_in(conn)
+
+def check_kpi_rollups() -> dict:
+    """rollup 과 logs 전체 집계 비교 (granularity 별). mismatches: (bucket, group_id, rollup, expected)"""
+    levels = {}
+    with _sqlite_pool.connection() as conn:
+        # 한 read 트랜잭션 안에서 두 쪽을 읽어 같은 snapshot 비교
+        conn.execute("BEGIN")
+        sources = {"day": (_KPI_DAILY_AGG_SQL, "SELECT date, group_id, logs_count, sla_breaches_sum FROM kpi_daily")}
+        for granularity in _KPI_BUCKETS:
+            sources[granularity] = (
+                f"SELECT bucket, group_id, cnt, sla FROM ({_kpi_rollup_agg_sql(granularity)})",
+                "SELECT bucket, group_id, logs_count, sla_breaches_sum FROM kpi_rollup "
+                f"WHERE granularity = '{granularity}'")
+        for granularity, (expected_sql, rollup_sql) in sources.items():
+            expected = {(r[0], r[1]): (r[2], r[3]) for r in conn.execute(expected_sql)}
+            rollup = {(r[0], r[1]): (r[2], r[3]) for r in conn.execute(rollup_sql)}
+            mismatches = [
+                {"bucket": k[0], "group_id": k[1], "rollup": rollup.get(k), "expected": expected.get(k)}
+                for k in sorted(set(expected) | set(rollup), key=lambda k: (k[0], k[1]))
+                if rollup.get(k) != expected.get(k)
+            ]
+            levels[granularity] = {"buckets": len(expected), "rollup_rows": len(rollup),
+                                   "mismatches": mismatches[:100], "mismatch_count": len(mismatches)}
+    return {"ok": not any(v["mismatch_count"] for v in levels.values()), "levels": levels}
+
+def _migrate_group_ids(conn) -> int:
+    """기존 DB: logs.group_id 컬럼 추가 + groups 채우기 + group_id 가 비어 있는 행 backfill (행 수 반환)"""
+    columns = {r[1] for r in conn.execute("PRAGMA table_info(logs)")}
+    if "group_id" not in columns:
+        conn.execute("ALTER TABLE logs ADD COLUMN group_id INTEGER REFERENCES groups(id)")
+        print("🔧 migration: logs.group_id added")
+    # 이전 버전 worker 가 group_id 없이 넣은 행도 매 시작 시 채움 (group_id IS NULL → 인덱스 조회)
+    if conn.execute("SELECT 1 FROM logs WHERE group_id IS NULL LIMIT 1").fetchone():
+        conn.execute("""
+            INSERT OR IGNORE INTO groups(name, created_at)
+            SELECT group_name, MIN(created_at) FROM logs WHERE group_id IS NULL GROUP BY group_name
+        """)
+        cur = conn.execute("""
+            UPDATE logs SET group_id = (SELECT id FROM groups WHERE groups.name = logs.group_name)
+             WHERE group_id IS NULL
+        """)
+        print(f"🔧 migration: group_id backfilled for {cur.rowcount} rows")
+        return cur.rowcount
+    return 0
 
 # --- Bronze 자동화 함수들 ---
-def _mask_pii(text: str) -> str:
-    """PII 마스킹 (전화번호, 이메일 등)"""
-    if not text:
-        return text
-    # 전화번호/이메일 간단 마스킹 (정책에 맞게 보완 가능)
-    text = re.sub(r'\b(\+?\d[\d\-\s]{6,}\d)\b', '****', text)
-    text = re.sub(r'[\w\.-]+@[\w\.-]+\.\w+', '****', text)
-    return text
+def _bronze_line(item: dict) -> str:
+    return json_codec.dumps(item) + "\n"
+
+_bronze_writer = BronzeWriter(
+    BRONZE_ROOT,
+    max_open=BRONZE_MAX_OPEN,
+    max_bytes=BRONZE_MAX_MB * 1024 * 1024,
+    max_lines=BRONZE_MAX_LINES,
+    fsync=BRONZE_FSYNC,
+    fsync_interval_ms=BRONZE_FSYNC_MS,
+    compression=BRONZE_COMPRESSION,
+    frame_records=BRONZE_FRAME_RECORDS,
+    mask_fields=BRONZE_MASK_FIELDS,
+    serialize=_bronze_line,
+    shared=BRONZE_SHARED,
+)
 
+@timed("stage", phase="bronze", stage="bronze_write")
 def write_bronze_jsonl(item: dict) -> Path:
-    """로그를 Bronze JSONL 파일에 자동 적재"""
-    dt = datetime.strptime(item["date_gst"], "%Y-%m-%d %H:%M").replace(tzinfo=GST)
-    y, m, d = dt.strftime("%Y"), dt.strftime("%m"), dt.strftime("%Y-%m-%d")
-    # 파일명 안전 문자만 허용: 영문/숫자/._- (연속 하이픈 정규화)
-    safe = re.sub(r'[^A-Za-z0-9._-]+', '-', item["group_name"].strip())
-    group = re.sub(r'-{2,}', '-', safe).strip('-')
-    outdir = BRONZE_ROOT / y / m
-    outdir.mkdir(parents=True, exist_ok=True)
-    fn = outdir / f"{d}_{group}.jsonl"
-    
-    payload = dict(item)
-    payload["summary"] = _mask_pii(payload.get("summary", ""))
-    
-    with fn.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(payload, ensure_ascii=False) + "\n")
-    
-    return fn
+    """로그를 Bronze JSONL 파일에 자동 적재 (열린 핸들 재사용 + segment rotation)"""
+    return _bronze_writer.write(item)
+
+@timed("stage", phase="bronze", stage="bronze_write_many")
+def write_bronze_jsonl_many(items: List[dict]) -> List[Path]:
+    """배치 적재: (일자, 그룹) 파일당 한 번만 write. 항목 순서대로 경로 반환"""
+    return _bronze_writer.write_many(items)
 
-# --- 파이프라인 디바운스 함수들 ---
+# --- 파이프라인 자동 실행 (coalescing scheduler) ---
+@timed("stage", stage="pipeline_trigger")
 def trigger_hvdc_pipeline_debounced():
-    """60초 디바운스로 HVDC 파이프라인 자동 트리거"""
-    global _last_run
-    with _lock:
-        now = time.time()
-        if now - _last_run < DEBOUNCE_SECS:
-            return
-        _last_run = now
-    
-    threading.Thread(target=_run_pipeline, daemon=True).start()
+    """새 데이터 도착 표시. 실행은 scheduler 가 최소 간격/최대 지연 안에서 합쳐서 1회씩"""
+    _pipeline_scheduler.mark_dirty()
 
 def _run_pipeline():
-    """백그라운드에서 HVDC 파이프라인 실행"""
+    """scheduler 스레드에서 HVDC 파이프라인 실행 (job 으로 기록, 실패 시 예외 → dirty 유지, 재시도)"""
+    job = _job_queue.run_inline("auto_pipeline", {"trigger": "scheduler"})
+    if job["state"] != "succeeded":
+        raise RuntimeError((job["error"] or {}).get("message") or job["state"])
+    print("HVDC pipeline completed successfully")
+
+# --- 파이프라인 job (bounded worker pool, 진행/출력/취소는 jobs 테이블) ---
+_job_queue = JobQueue(
+    _sqlite_pool,
+    workers=JOB_WORKERS,
+    max_queued=JOB_QUEUE_MAX,
+    output_max_kb=JOB_OUTPUT_MAX_KB,
+    heartbeat_secs=JOB_HEARTBEAT_SECS,
+    stale_secs=JOB_STALE_SECS,
+    retention_secs=JOB_RETENTION_DAYS * 86400,
+)
+
+# WSL hvdc311 venv 에서 파이프라인 실행 (출력은 job output 으로 수집)
+_WSL_PIPELINE_CMD = (
+    r"wsl -d Ubuntu -- bash -lc "
+    r"\"source ~/hvdc311/bin/activate && "
+    r"cd '/mnt/c/cursor-mcp/whatsapp db/hvdc_logs' && "
+    r"python3 run_pipeline.py 2>&1\""
+)
+
+def _pipeline_published():
+    """파이프라인 완료: KPI 캐시 버전 증가 + DuckDB serving snapshot 교체 예약"""
+    _kpi_cache.bump("pipeline")
+    _duckdb_pool.refresh()
+
+def _acquire_pipeline_lease(ctx) -> str:
+    """다른 worker/자동 실행이 끝날 때까지 대기 (취소 가능, 최대 PIPELINE_LEASE_SECS)"""
+    deadline = time.time() + PIPELINE_LEASE_SECS
+    waited = False
+    while True:
+        token = _pipeline_lease.try_acquire(debounce=False)
+        if token is not None:
+            return token
+        if not waited:
+            ctx.log("waiting for running HVDC pipeline ...")
+            waited = True
+        ctx.check_cancelled()
+        if time.time() > deadline:
+            raise TimeoutError("HVDC pipeline lease not released")
+        time.sleep(1.0)
+
+def _job_pipeline(ctx):
+    """수동 실행: Bronze → Silver → Transform (단계별 기록)"""
+    token = _acquire_pipeline_lease(ctx)
+    status = "error"
     try:
-        subprocess.run(
-            ["python", "run_pipeline.py"], 
-            check=True, 
-            cwd=HVDC_BASE,
-            capture_output=True,
-            text=True
-        )
-        print("HVDC pipeline completed successfully")
-    except Exception as e:
-        print(f"HVDC pipeline error: {e}")
+        for name, cmd in stage_commands():
+            with ctx.stage(name), _duckdb_pool.writing():
+                ctx.run(cmd, timeout=PIPELINE_LEASE_SECS)
+        with ctx.stage("transform"), _duckdb_pool.writing():
+            run_transform()
+        status = "ok"
+        _pipeline_published()
+        return {"status": "ok"}
+    finally:
+        _pipeline_lease.release(token, status)
+
+def _job_auto_pipeline(ctx):
+    """자동 실행: scheduler 가 lease 를 잡은 상태에서 run_inline 으로 호출.
+    Bronze 단계가 bronze_logs 와 hybrid KPI mark 를 새로 적재한 뒤 run_pipeline.py"""
+    for name, cmd in stage_commands():
+        with ctx.stage(name), _duckdb_pool.writing():
+            ctx.run(cmd, timeout=PIPELINE_LEASE_SECS)
+    with ctx.stage("run_pipeline"), _duckdb_pool.writing():
+        ctx.run(["python", "run_pipeline.py"], cwd=HVDC_BASE, timeout=PIPELINE_LEASE_SECS)
+    _pipeline_published()
+    return {"status": "ok"}
+
+def _job_transform_wsl(ctx):
+    """WSL DuckDB 파이프라인 (/hvdc/transform)"""
+    import shlex
+    token = _acquire_pipeline_lease(ctx)
+    status = "error"
+    try:
+        with ctx.stage("wsl_pipeline"), _duckdb_pool.writing():
+            ctx.run(shlex.split("powershell -NoProfile -Command " + _WSL_PIPELINE_CMD),
+                    timeout=PIPELINE_LEASE_SECS)
+        status = "ok"
+        _pipeline_published()
+        return {"status": "ok"}
+    finally:
+        _pipeline_lease.release(token, status)
+
+_job_queue.register("pipeline", _job_pipeline, stages=[n for n, _ in stage_commands()] + ["transform"])
+_job_queue.register("auto_pipeline", _job_auto_pipeline, stages=[n for n, _ in stage_commands()] + ["run_pipeline"])
+_job_queue.register("transform_wsl", _job_transform_wsl, stages=["wsl_pipeline"])
+
+_pipeline_scheduler = CoalescingScheduler(
+    _sqlite_pool,
+    _pipeline_lease,
+    lambda: _run_pipeline(),
+    min_interval_secs=PIPELINE_MIN_INTERVAL_SECS,
+    max_staleness_secs=PIPELINE_MAX_STALENESS_SECS,
+    tick_ms=PIPELINE_TICK_MS,
+)
+
+def _json_columns(body: dict) -> tuple:
+    """top_keywords/attachments 를 한 번만 인코딩 (CSV/SQLite 공용)"""
+    return (json_codec.dumps(body.get("top_keywords") or []),
+            json_codec.dumps(body.get("attachments") or []))
 
+def _csv_row(body: dict, cols: tuple) -> list:
+    return [
+        body["date_gst"], body["group_name"], body["summary"],
+        cols[0],
+        int(body.get("sla_breaches", 0)),
+        cols[1],
+        body["created_at"], body.get("request_id"), "ok"
+    ]
+
+@timed("stage", phase="csv", stage="csv_append")
 def _csv_append(row: List[str]):
-    with CSV_PATH.open("a", newline="", encoding="utf-8") as f:
+    with _csv_lock, CSV_PATH.open("a", newline="", encoding="utf-8") as f:
         csv.writer(f).writerow(row)
 
-def _sqlite_insert(payload: dict):
-    with sqlite3.connect(SQLITE_PATH) as conn:
-        try:
-            conn.execute("""
-              INSERT INTO logs(date_gst, group_name, summary, top_keywords,
-                               sla_breaches, attachments, created_at, request_id, processed_status)
-              VALUES(?,?,?,?,?,?,?,?,?)
-            """, (
-                payload["date_gst"],
-                payload["group_name"],
-                payload["summary"],
-                json.dumps(payload.get("top_keywords", []), ensure_ascii=False),
-                int(payload.get("sla_breaches", 0)),
-                json.dumps(payload.get("attachments", []), ensure_ascii=False),
-                payload["created_at"],
-                payload.get("request_id"),
-                "ok"
-            ))
-            conn.commit()
-            return True
-        except sqlite3.IntegrityError as e:
-            if "UNIQUE constraint failed: logs.request_id" in str(e):
-                return False
-            raise
-
-def _sqlite_query(limit: int = 10, since: Optional[str] = None, group_name: Optional[str] = None):
-    q = "SELECT date_gst, group_name, summary, top_keywords, sla_breaches, attachments, created_at, request_id, processed_status FROM logs WHERE 1=1"
+@timed("stage", phase="csv", stage="csv_append_many")
+def _csv_append_many(rows: List[list]):
+    if not rows:
+        return
+    with _csv_lock, CSV_PATH.open("a", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(rows)
+
+_INSERT_LOG_SQL = """
+  INSERT INTO logs(date_gst, group_name, summary, top_keywords,
+                   sla_breaches, attachments, created_at, request_id, processed_status, group_id)
+  VALUES(?,?,?,?,?,?,?,?,?,?)
+"""
+
+# groups.name → id (commit 된 것만 캐시: rollback 된 id 를 다른 이름에 재사용하지 않도록)
+_group_ids: dict = {}
+
+def _resolve_group_ids(conn, names) -> dict:
+    """쓰기 트랜잭션 안에서 그룹 id 조회/생성. 호출 측이 commit 후 _group_ids 에 반영"""
+    resolved = {}
+    for name in names:
+        if name in resolved:
+            continue
+        gid = _group_ids.get(name)
+        if gid is None:
+            conn.execute("INSERT OR IGNORE INTO groups(name, created_at) VALUES(?, ?)",
+                         (name, datetime.utcnow().isoformat(timespec="seconds")))
+            gid = conn.execute("SELECT id FROM groups WHERE name = ?", (name,)).fetchone()[0]
+        resolved[name] = gid
+    return resolved
+
+def _log_params(payload: dict, cols: tuple, group_id: int) -> tuple:
+    return (
+        payload["date_gst"],
+        payload["group_name"],
+        payload["summary"],
+        cols[0],
+        int(payload.get("sla_breaches", 0)),
+        cols[1],
+        payload["created_at"],
+        payload.get("request_id"),
+        "ok",
+        group_id,
+    )
+
+def _is_duplicate_error(e: sqlite3.IntegrityError) -> bool:
+    return "UNIQUE constraint failed: logs.request_id" in str(e)
+
+@timed("stage", phase="sqlite", stage="sqlite_insert")
+def _sqlite_insert(payload: dict, cols: tuple):
+    rid = payload.get("request_id")
+    try:
+        with _sqlite_pool.write() as conn:
+            gids = _resolve_group_ids(conn, [payload["group_name"]])
+            conn.execute(_INSERT_LOG_SQL, _log_params(payload, cols, gids[payload["group_name"]]))
+            _kpi_rollups_add(conn, [payload], gids)
+            _kpi_cache.bump_in(conn, "logs")
+    except sqlite3.IntegrityError as e:
+        if _is_duplicate_error(e):
+            _idempotency.add(rid)
+            return False
+        raise
+    _group_ids.update(gids)
+    if rid:
+        _idempotency.add(rid)
+    return True
+
+@timed("stage", phase="sqlite", stage="sqlite_insert_many")
+def _sqlite_insert_many(payloads: List[dict], cols: List[tuple]) -> List[bool]:
+    """단일 트랜잭션으로 일괄 INSERT. request_id 중복 항목은 False"""
+    inserted = []
+    with _sqlite_pool.write() as conn:
+        gids = _resolve_group_ids(conn, [p["group_name"] for p in payloads])
+        for payload, c in zip(payloads, cols):
+            try:
+                conn.execute(_INSERT_LOG_SQL, _log_params(payload, c, gids[payload["group_name"]]))
+                inserted.append(True)
+            except sqlite3.IntegrityError as e:
+                if not _is_duplicate_error(e):
+                    raise
+                inserted.append(False)
+        _kpi_rollups_add(conn, [p for p, ok in zip(payloads, inserted) if ok], gids)
+        if any(inserted):
+            _kpi_cache.bump_in(conn, "logs")
+    _group_ids.update(gids)
+    for payload in payloads:
+        if payload.get("request_id"):
+            _idempotency.add(payload["request_id"])
+    return inserted
+
+def _warm_idempotency() -> int:
+    """시작 시 SQLite 의 기존 request_id 로 Bloom filter 채우기"""
+    with _sqlite_pool.connection() as conn:
+        cur = conn.execute("SELECT request_id FROM logs WHERE request_id IS NOT NULL")
+        return _idempotency.warm(r[0] for r in cur)
+
+@timed("stage", phase="dedupe", stage="idempotency_check")
+def _is_known_request_id(rid: Optional[str]) -> bool:
+    """I/O 전에 중복 판별. Bloom 이 '있을 수 있음'이면 SQLite 로 확인"""
+    if not rid:
+        return False
+    state = _idempotency.check(rid)
+    if state == DUPLICATE:
+        return True
+    if state == NEW:
+        return False
+    return _confirm_request_id(rid)
+
+def _confirm_request_id(rid: str) -> bool:
+    """Bloom '있을 수 있음' → SQLite 조회 (blocking, async 경로에서는 threadpool 로)"""
+    with _sqlite_pool.connection() as conn:
+        found = conn.execute("SELECT 1 FROM logs WHERE request_id = ?", (rid,)).fetchone() is not None
+    if found:
+        _idempotency.add(rid)
+    return found
+
+def _store_bodies(bodies: List[dict]) -> List[dict]:
+    """SQLite 단일 트랜잭션 → 신규 행만 CSV/Bronze 일괄 append. 항목별 결과 반환"""
+    cols = [_json_columns(body) for body in bodies]
+    inserted = _sqlite_insert_many(bodies, cols)
+    stored = [body for body, ok in zip(bodies, inserted) if ok]
+    _csv_append_many([_csv_row(body, c) for body, c, ok in zip(bodies, cols, inserted) if ok])
+    try:
+        bronze_files = iter(write_bronze_jsonl_many(stored))
+        bronze_error = None
+    except Exception as e:
+        bronze_files = None
+        bronze_error = f"Bronze failed: {str(e)}"
+    results = []
+    for ok in inserted:
+        if not ok:
+            results.append({"inserted": False, "bronze_file": None})
+        else:
+            results.append({"inserted": True,
+                            "bronze_file": bronze_error or f"Bronze: {next(bronze_files).name}"})
+    return results
+
+# 그룹 필터 모드: exact/prefix 는 groups 에서 id 를 찾아 (group_id, ...) 인덱스 사용, contains 는 opt-in
+GROUP_MATCH_PATTERN = r"^(exact|prefix|contains)$"
+
+def _group_filter_sqlite(group_name: Optional[str], match: str = "exact", column: str = "group_id") -> tuple:
+    """logs/kpi_daily WHERE 절 조각 + 파라미터"""
+    if not group_name:
+        return "", []
+    if match == "prefix":
+        return (f" AND {column} IN (SELECT id FROM groups WHERE substr(name, 1, ?) = ?)",
+                [len(group_name), group_name])
+    if match == "contains":
+        return f" AND {column} IN (SELECT id FROM groups WHERE name LIKE ?)", [f"%{group_name}%"]
+    return f" AND {column} = (SELECT id FROM groups WHERE name = ?)", [group_name]
+
+def _group_filter_duckdb(group_name: Optional[str], match: str = "exact") -> tuple:
+    """DuckDB view/Parquet 용 (SQLite 와 같은 의미)"""
+    if not group_name:
+        return "", []
+    if match == "prefix":
+        return " AND starts_with(group_name, ?)", [group_name]
+    if match == "contains":
+        return " AND group_name ILIKE ?", [f"%{group_name}%"]
+    return " AND group_name = ?", [group_name]
+
+def _encode_cursor(created_at: str, row_id: int) -> str:
+    """(created_at, id) → opaque cursor (base64url)"""
+    return base64.urlsafe_b64encode(json_codec.dumps([created_at, row_id]).encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        created_at, row_id = json_codec.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(created_at, str) or not isinstance(row_id, int):
+            raise ValueError(cursor)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, row_id
+
+@timed("stage", phase="sqlite", stage="sqlite_query")
+def _sqlite_query(limit: int = 10, since: Optional[str] = None, group_name: Optional[str] = None,
+                  cursor: Optional[str] = None, group_match: str = "exact") -> tuple:
+    """최신순 한 페이지 + next_cursor (마지막 페이지면 None). 깊은 페이지도 인덱스 seek 1회"""
+    q = "SELECT date_gst, group_name, summary, top_keywords, sla_breaches, attachments, created_at, request_id, processed_status, id FROM logs WHERE 1=1"
     params = []
     if since:
         q += " AND created_at >= ?"
         params.append(since)
-    if group_name:
-        q += " AND group_name LIKE ?"
-        params.append(f"%{group_name}%")
-    q += " ORDER BY created_at DESC LIMIT ?"
-    params.append(limit)
-    with sqlite3.connect(SQLITE_PATH) as conn:
-        rows = [dict(
-            date_gst=r[0], group_name=r[1], summary=r[2],
-            top_keywords=json.loads(r[3] or "[]"),
-            sla_breaches=r[4],
-            attachments=json.loads(r[5] or "[]"),
-            created_at=r[6], request_id=r[7], processed_status=r[8]
-        ) for r in conn.execute(q, params).fetchall()]
-    return rows
+    group_sql, group_params = _group_filter_sqlite(group_name, group_match)
+    q += group_sql
+    params.extend(group_params)
+    if cursor:
+        q += " AND (created_at, id) < (?, ?)"
+        params.extend(_decode_cursor(cursor))
+    q += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    params.append(limit + 1)  # 다음 페이지 존재 여부 확인용 1행
+    with _sqlite_pool.connection() as conn:
+        fetched = conn.execute(q, params).fetchall()
+    page = fetched[:limit]
+    rows = [dict(
+        date_gst=r[0], group_name=r[1], summary=r[2],
+        top_keywords=json_codec.loads(r[3] or "[]"),
+        sla_breaches=r[4],
+        attachments=json_codec.loads(r[5] or "[]"),
+        created_at=r[6], request_id=r[7], processed_status=r[8]
+    ) for r in page]
+    next_cursor = _encode_cursor(page[-1][6], page[-1][9]) if len(fetched) > limit else None
+    return rows, next_cursor
 
 # --- HVDC Pipeline Integration ---
-def _run_hvdc_pipeline():
-    """Run unified local pipeline (Bronze→Silver→transform)."""
+def _submit_job(kind: str, params: dict) -> CodecJSONResponse:
+    """job 등록 후 202 (조회: GET /hvdc/jobs/{job_id}). queued 상한 초과 시 503"""
     try:
-        return run_pipeline_sequence()
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+        job = _job_queue.submit(kind, params)
+    except JobQueueFull as e:
+        return CodecJSONResponse(status_code=503, content={"status": "error", "message": f"Job queue full: {e}"})
+    status_url = f"/hvdc/jobs/{job['job_id']}"
+    return CodecJSONResponse(
+        status_code=202,
+        content={"status": "accepted", "job_id": job["job_id"], "kind": kind,
+                 "queued_at": job["queued_at"], "status_url": status_url},
+        headers={"Location": status_url},
+    )
 
 def _get_hvdc_status():
     """Get HVDC pipeline status and file information"""
@@ -230,7 +781,9 @@ def _get_hvdc_status():
             "transform_sql": HVDC_TRANSFORM_SQL.exists(),
             "bronze_data": [],
             "silver_data": [],
-            "duckdb_file": DUCKDB_PATH.exists()
+            "duckdb_file": DUCKDB_PATH.exists(),
+            "scheduler": _pipeline_scheduler.state(),
+            "jobs": _job_queue.stats(),
         }
         
         bronze_path = HVDC_BASE / "bronze" / "2025" / "08"
@@ -246,40 +799,216 @@ def _get_hvdc_status():
         return {"error": str(e)}
 
 # --- DuckDB KPI ---
-def _kpi_from_duckdb(since: Optional[str], until: Optional[str], group_name: Optional[str]):
+# 현재 snapshot generation 의 KPI statement (view 컬럼 구성에 맞춰 생성)
+_duckdb_kpi_statements: dict = {}
+
+def _duckdb_kpi_statement(cur) -> tuple:
+    """(이름, SQL) — $1 since, $2 until, $3 group_name, $4 group_match"""
+    gen = _duckdb_pool.generation
+    stmt = _duckdb_kpi_statements.get(gen)
+    if stmt is not None:
+        return stmt
+    cols = {r[0] for r in cur.execute(
+        "SELECT column_name FROM information_schema.columns WHERE table_name = 'v_kpi_daily'").fetchall()}
+    # direct 경로와 같은 선택: view 에 KPI 컬럼이 모두 있을 때만 view, 아니면 silver Parquet 집계
+    silver_path = HVDC_BASE / "silver" / "logs"
+    if {"date", "group_name", "logs_count", "total_sla_breaches", "unique_keywords_count"} <= cols:
+        name, source = "kpi_view", (
+            "SELECT date, group_name, logs_count, total_sla_breaches, unique_keywords_count FROM v_kpi_daily")
+    elif silver_path.exists():
+        name, source = "kpi_parquet", (
+            "SELECT date, group_name, count(*) AS logs_count, sum(sla_breaches) AS total_sla_breaches, "
+            "count(DISTINCT top_keywords) AS unique_keywords_count "
+            f"FROM read_parquet('{silver_path}/**/*.parquet') GROUP BY 1, 2")
+    else:
+        raise RuntimeError("v_kpi_daily view and silver Parquet not available")
+    sql = (f"SELECT * FROM ({source}) "
+           "WHERE ($1 IS NULL OR date >= CAST($1 AS DATE)) AND ($2 IS NULL OR date <= CAST($2 AS DATE)) "
+           "AND ($3 IS NULL OR CASE $4 WHEN 'prefix' THEN starts_with(group_name, $3) "
+           "WHEN 'contains' THEN group_name ILIKE '%' || $3 || '%' ELSE group_name = $3 END) "
+           "ORDER BY date DESC, group_name")
+    _duckdb_kpi_statements.clear()
+    _duckdb_kpi_statements[gen] = (name, sql)
+    return name, sql
+
+# (snapshot generation 또는 파일 mtime) → 테이블/뷰 이름. 없는 테이블을 요청마다 조회하다 실패하지 않도록
+_duckdb_tables_cache: dict = {}
+
+def _duckdb_tables(cur, key) -> set:
+    tables = _duckdb_tables_cache.get(key)
+    if tables is None:
+        tables = {r[0] for r in cur.execute("SELECT table_name FROM information_schema.tables").fetchall()}
+        for old in [k for k in _duckdb_tables_cache if k[0] == key[0]]:
+            del _duckdb_tables_cache[old]
+        _duckdb_tables_cache[key] = tables
+    return tables
+
+def _kpi_metrics(res, granularity: str = "day"):
+    """DuckDB KPI 결과 (date, group_name, logs_count, total_sla_breaches, unique_keywords_count)
+    → Arrow 테이블 (pyarrow 있으면, 응답 시 형식별 변환) 또는 dict list"""
+    if arrow_format.ARROW_AVAILABLE:
+        return arrow_format.conform(arrow_format.fetch_table(res), arrow_format.kpi_columns(granularity))
+    return [
+        {
+            "date": str(r[0])[:19] if granularity == "hour" else str(r[0])[:10],
+            "group_name": r[1],
+            "logs_count": int(r[2]),
+            "total_sla_breaches": int(r[3]),
+            "unique_keywords_count": int(r[4]),
+        }
+        for r in res.fetchall()
+    ]
+
+def _kpi_from_duckdb_pool(since, until, group_name, group_match) -> dict:
+    with instrumentation.phase("duckdb_connect"):
+        cm = _duckdb_pool.cursor()
+        cur = cm.__enter__()
+    try:
+        name, sql = _duckdb_kpi_statement(cur)
+        with instrumentation.phase("duckdb_query"):
+            res = _duckdb_pool.execute_prepared(
+                cur, name, sql, [since[:10] if since else None, until[:10] if until else None,
+                                 group_name or None, group_match])
+        with instrumentation.phase("df_convert"):
+            metrics = _kpi_metrics(res)
+    finally:
+        cm.__exit__(None, None, None)
+    return {"status": "ok", "since": since or "", "until": until or "", "metrics": metrics}
+
+# 파이프라인이 만드는 rollup 조회: kpi_rollup (silver_stage.py / run_pipeline.py, sla_log 기준),
+# kpi_hybrid_rollup / kpi_hybrid_edge (bronze_stage.py, API 적재 행 기준 — hybrid KPI)
+def _duckdb_rollup_sql(table: str) -> str:
+    return (
+    f"SELECT bucket AS date, group_name, logs_count, total_sla_breaches, unique_keywords_count FROM {table} "
+    "WHERE granularity = $1 AND ($2 IS NULL OR bucket >= CAST($2 AS TIMESTAMP)) "
+    "AND ($3 IS NULL OR bucket < CAST($3 AS TIMESTAMP)) "
+    "AND ($4 IS NULL OR CASE $5 WHEN 'prefix' THEN starts_with(group_name, $4) "
+    "WHEN 'contains' THEN group_name ILIKE '%' || $4 || '%' ELSE group_name = $4 END) "
+    "ORDER BY bucket DESC, group_name")
+
+_DUCKDB_ROLLUP_SQL = _duckdb_rollup_sql("kpi_rollup")
+
+def _kpi_rollup_from_duckdb(since, until, group_name, group_match, granularity):
+    """kpi_rollup 조회 (pool → 실패 시 read_only connect).
+    파이프라인이 아직 kpi_rollup 을 만들지 않았으면 None (호출 측은 SQLite rollup 으로)"""
+    lo, hi = _kpi_bounds(since, until, granularity)
+    args = [granularity, lo, hi, group_name or None, group_match]
+    if DUCKDB_POOL:
+        try:
+            with _duckdb_pool.cursor() as cur:
+                if "kpi_rollup" not in _duckdb_tables(cur, ("pool", _duckdb_pool.generation)):
+                    return None
+                with instrumentation.phase("duckdb_query"):
+                    res = _duckdb_pool.execute_prepared(cur, "kpi_rollup", _DUCKDB_ROLLUP_SQL, args)
+                with instrumentation.phase("df_convert"):
+                    return _kpi_metrics(res, granularity)
+        except SnapshotDeferred:
+            raise  # 파이프라인이 원본에 쓰는 중: 직접 connect 하지 않고 호출 측 fallback
+        except Exception as e:
+            print(f"❌ DuckDB pool KPI rollup: {e} → direct connect")
+    import duckdb
+    with instrumentation.phase("duckdb_connect"):
+        conn = duckdb.connect(str(DUCKDB_PATH.absolute()), read_only=True)
+    try:
+        if "kpi_rollup" not in _duckdb_tables(conn, ("file", _duckdb_mtime())):
+            return None
+        with instrumentation.phase("duckdb_query"):
+            res = conn.execute(_DUCKDB_ROLLUP_SQL, args)
+        with instrumentation.phase("df_convert"):
+            return _kpi_metrics(res, granularity)
+    finally:
+        conn.close()
+
+_HYBRID_TABLES = {"pipeline_watermark", "kpi_hybrid_rollup", "kpi_hybrid_edge"}
+
+def _read_hybrid(cur, tables_key, execute, granularity):
+    if not _HYBRID_TABLES <= _duckdb_tables(cur, tables_key):
+        return None
+    mark = cur.execute("SELECT high_water_created_at, tail_from FROM pipeline_watermark").fetchone()
+    if not mark or not mark[0] or not mark[1]:
+        return None
+    with instrumentation.phase("duckdb_query"):
+        res = execute("kpi_hybrid", _duckdb_rollup_sql("kpi_hybrid_rollup"))
+    with instrumentation.phase("df_convert"):
+        history = _kpi_metrics(res, granularity)
+    width = 19 if granularity == "hour" else 10
+    edge = [(str(r[0])[:width], r[1], int(r[2]), int(r[3] or 0))
+            for r in execute("kpi_hybrid_edge", _duckdb_rollup_sql("kpi_hybrid_edge")).fetchall()]
+    return history, edge, mark[0], mark[1]
+
+def _kpi_hybrid_from_duckdb(since, until, group_name, group_match, granularity="day"):
+    """hybrid 의 DuckDB 쪽: (history metrics, edge 행, high-water mark, tail_from). mark 와 두 rollup 을
+    같은 cursor (같은 snapshot) 에서 읽음. bronze_stage.py 가 아직 만들지 않았으면 None"""
+    lo, hi = _kpi_bounds(since, until, granularity)
+    args = [granularity, lo, hi, group_name or None, group_match]
+    if DUCKDB_POOL:
+        try:
+            with _duckdb_pool.cursor() as cur:
+                return _read_hybrid(cur, ("pool", _duckdb_pool.generation),
+                                    lambda name, sql: _duckdb_pool.execute_prepared(cur, name, sql, args),
+                                    granularity)
+        except SnapshotDeferred:
+            raise  # 파이프라인이 원본에 쓰는 중: 직접 connect 하지 않고 호출 측 fallback
+        except Exception as e:
+            print(f"❌ DuckDB pool hybrid KPI: {e} → direct connect")
+    import duckdb
+    with instrumentation.phase("duckdb_connect"):
+        conn = duckdb.connect(str(DUCKDB_PATH.absolute()), read_only=True)
+    try:
+        return _read_hybrid(conn, ("file", _duckdb_mtime()), lambda name, sql: conn.execute(sql, args), granularity)
+    finally:
+        conn.close()
+
+@timed("kpi", engine="duckdb")
+def _kpi_from_duckdb(since: Optional[str], until: Optional[str], group_name: Optional[str],
+                     group_match: str = "exact", granularity: str = "day", from_rollup: bool = False):
+    """from_rollup: day 도 kpi_rollup 에서 (/kpi — 모든 granularity 가 같은 sla_log 집계)"""
+    if granularity != "day" or from_rollup:
+        metrics = _kpi_rollup_from_duckdb(since, until, group_name, group_match, granularity)
+        if metrics is None:
+            return {
+                "status": "error",
+                "message": "DuckDB kpi_rollup not built yet (run the HVDC pipeline)",
+                "fallback": "Use /kpi endpoint for SQLite-based KPI"
+            }
+        return {"status": "ok", "since": since or "", "until": until or "", "metrics": metrics}
+    if DUCKDB_POOL:
+        try:
+            return _kpi_from_duckdb_pool(since, until, group_name, group_match)
+        except SnapshotDeferred:
+            raise  # 파이프라인이 원본에 쓰는 중: 직접 connect 하지 않고 호출 측 fallback
+        except Exception as e:
+            print(f"❌ DuckDB pool KPI: {e} → direct connect")
+    return _kpi_from_duckdb_direct(since, until, group_name, group_match)
+
+def _kpi_from_duckdb_direct(since: Optional[str], until: Optional[str], group_name: Optional[str],
+                            group_match: str = "exact"):
+    """요청마다 원본 파일 connect (DUCKDB_POOL=off 또는 pool 실패 시)"""
     import duckdb
     
     try:
         # Use absolute path to DuckDB file
         duckdb_abs_path = DUCKDB_PATH.absolute()
-        conn = duckdb.connect(str(duckdb_abs_path))
+        with instrumentation.phase("duckdb_connect"):
+            conn = duckdb.connect(str(duckdb_abs_path), read_only=True)
         
         try:
             # Try to query the v_kpi_daily view first
             try:
-                q = "SELECT * FROM v_kpi_daily WHERE 1=1"
+                q = ("SELECT date, group_name, logs_count, total_sla_breaches, unique_keywords_count "
+                     "FROM v_kpi_daily WHERE 1=1")
                 params = []
                 if since: q += " AND date >= ?"; params.append(since.split(" ")[0])
                 if until: q += " AND date <= ?"; params.append(until.split(" ")[0])
-                if group_name: q += " AND group_name LIKE ?"; params.append(f"%{group_name}%")
+                group_sql, group_params = _group_filter_duckdb(group_name, group_match)
+                q += group_sql; params.extend(group_params)
                 q += " ORDER BY date DESC, group_name"
                 
-                df = conn.execute(q, params).fetch_df()
-                return {
-                    "status": "ok",
-                    "since": since or "",
-                    "until": until or "",
-                    "metrics": [
-                        {
-                            "date": str(r["date"]),
-                            "group_name": r["group_name"],
-                            "logs_count": int(r["logs_count"]),
-                            "total_sla_breaches": int(r["total_sla_breaches"]),
-                            "unique_keywords_count": int(r["unique_keywords_count"]),
-                        }
-                        for _, r in df.iterrows()
-                    ]
-                }
+                with instrumentation.phase("duckdb_query"):
+                    cur = conn.execute(q, params)
+                with instrumentation.phase("df_convert"):
+                    metrics = _kpi_metrics(cur)
+                return {"status": "ok", "since": since or "", "until": until or "", "metrics": metrics}
             except Exception as view_error:
                 # If view fails, try direct Parquet query
                 silver_path = HVDC_BASE / "silver" / "logs"
@@ -297,25 +1026,15 @@ def _kpi_from_duckdb(since: Optional[str], until: Optional[str], group_name: Opt
                     params = []
                     if since: q += " AND date >= ?"; params.append(since.split(" ")[0])
                     if until: q += " AND date <= ?"; params.append(until.split(" ")[0])
-                    if group_name: q += " AND group_name LIKE ?"; params.append(f"%{group_name}%")
+                    group_sql, group_params = _group_filter_duckdb(group_name, group_match)
+                    q += group_sql; params.extend(group_params)
                     q += " GROUP BY 1, 2 ORDER BY 1 DESC, 2"
                     
-                    df = conn.execute(q, params).fetch_df()
-                    return {
-                        "status": "ok",
-                        "since": since or "",
-                        "until": until or "",
-                        "metrics": [
-                            {
-                                "date": str(r["date"]),
-                                "group_name": r["group_name"],
-                                "logs_count": int(r["logs_count"]),
-                                "total_sla_breaches": int(r["total_sla_breaches"]),
-                                "unique_keywords_count": int(r["unique_keywords_count"]),
-                            }
-                            for _, r in df.iterrows()
-                        ]
-                    }
+                    with instrumentation.phase("parquet_fallback"):
+                        cur = conn.execute(q, params)
+                    with instrumentation.phase("df_convert"):
+                        metrics = _kpi_metrics(cur)
+                    return {"status": "ok", "since": since or "", "until": until or "", "metrics": metrics}
                 else:
                     raise view_error
         except Exception as e:
@@ -334,14 +1053,38 @@ def _kpi_from_duckdb(since: Optional[str], until: Optional[str], group_name: Opt
         }
 
 # --- SQLite KPI ---
-def _kpi_from_sqlite(since: Optional[str], until: Optional[str], group_name: Optional[str]):
-    q = "SELECT substr(date_gst,1,10) AS date, group_name, COUNT(*) AS logs_count, SUM(COALESCE(sla_breaches,0)) AS total_sla_breaches FROM logs WHERE 1=1"
-    params = []
-    if since: q += " AND created_at >= ?"; params.append(since)
-    if until: q += " AND created_at <= ?"; params.append(until)
-    if group_name: q += " AND group_name LIKE ?"; params.append(f"%{group_name}%")
-    q += " GROUP BY 1,2 ORDER BY 1 DESC, 2"
-    with sqlite3.connect(SQLITE_PATH) as conn:
+def _kpi_bounds(since: Optional[str], until: Optional[str], granularity: str = "day") -> tuple:
+    """since/until (일자) → 구간 시작 기준 [lo, hi). since 는 그 날이 속한 주/월 시작으로 내림, until 은 그 날 포함"""
+    try:
+        lo = datetime.strptime(since[:10], "%Y-%m-%d") if since else None
+        hi = datetime.strptime(until[:10], "%Y-%m-%d") + timedelta(days=1) if until else None
+    except ValueError:
+        raise HTTPException(status_code=422, detail="since/until must start with YYYY-MM-DD")
+    if lo is not None and granularity == "week":
+        lo -= timedelta(days=lo.weekday())
+    elif lo is not None and granularity == "month":
+        lo = lo.replace(day=1)
+    return (lo.strftime("%Y-%m-%d") if lo else None, hi.strftime("%Y-%m-%d") if hi else None)
+
+@timed("kpi", engine="sqlite")
+def _kpi_from_sqlite(since: Optional[str], until: Optional[str], group_name: Optional[str],
+                     group_match: str = "exact", granularity: str = "day"):
+    """kpi_daily / kpi_rollup 조회 (일자 기준 since/until, DuckDB 경로와 같은 의미)"""
+    if granularity == "day":
+        q = ("SELECT k.date, g.name, k.logs_count, k.sla_breaches_sum FROM kpi_daily k "
+             "JOIN groups g ON g.id = k.group_id WHERE 1=1")
+        params, column = [], "k.date"
+    else:
+        q = ("SELECT k.bucket, g.name, k.logs_count, k.sla_breaches_sum FROM kpi_rollup k "
+             "JOIN groups g ON g.id = k.group_id WHERE k.granularity = ?")
+        params, column = [granularity], "k.bucket"
+    lo, hi = _kpi_bounds(since, until, granularity)
+    if lo: q += f" AND {column} >= ?"; params.append(lo)
+    if hi: q += f" AND {column} < ?"; params.append(hi)
+    group_sql, group_params = _group_filter_sqlite(group_name, group_match, column="k.group_id")
+    q += group_sql; params.extend(group_params)
+    q += " ORDER BY 1 DESC, 2"
+    with _sqlite_pool.connection() as conn:
         rows = conn.execute(q, params).fetchall()
     return {
         "status": "ok",
@@ -358,6 +1101,52 @@ def _kpi_from_sqlite(since: Optional[str], until: Optional[str], group_name: Opt
         ]
     }
 
+# --- Hybrid KPI (DuckDB history + SQLite hot tail) ---
+@timed("kpi", engine="sqlite_tail")
+def _kpi_tail_from_sqlite(tail_from: str, since: Optional[str], until: Optional[str], group_name: Optional[str],
+                          group_match: str = "exact", granularity: str = "day") -> list:
+    """created_at >= tail_from 인 logs 만 (구간, 그룹) 별 집계 → [(date, group_name, count, sla)].
+    created_at 범위 조회 (idx_logs_created_id) 라 overlap 구간 + 파이프라인 이후 행만 읽음"""
+    bucket = "substr(l.date_gst,1,10)" if granularity == "day" else _KPI_BUCKETS[granularity][1]
+    q = (f"SELECT {bucket}, g.name, COUNT(*), SUM(COALESCE(l.sla_breaches,0)) "
+         "FROM logs l JOIN groups g ON g.id = l.group_id WHERE l.created_at >= ?")
+    params = [tail_from]
+    lo, hi = _kpi_bounds(since, until, granularity)
+    if lo: q += f" AND {bucket} >= ?"; params.append(lo)
+    if hi: q += f" AND {bucket} < ?"; params.append(hi)
+    group_sql, group_params = _group_filter_sqlite(group_name, group_match, column="l.group_id")
+    q += group_sql; params.extend(group_params)
+    q += " GROUP BY 1, 2"
+    with _sqlite_pool.connection() as conn:
+        return [(r[0], r[1], int(r[2]), int(r[3] or 0)) for r in conn.execute(q, params)]
+
+def _merge_kpi_tail(metrics, tail: list, edge: list) -> tuple:
+    """history + (tail - edge) 를 (date, group_name) 별로 합산 → (행 list, 순증 행 수 = tail - edge).
+    edge = history 중 tail_from 이후 행 (tail 과 겹치는 부분). 값이 바뀐 구간의
+    unique_keywords_count 는 None (서로 다른 키워드 수는 더할 수 없음)"""
+    delta: dict = {}
+    for rows, sign in ((tail, 1), (edge, -1)):
+        for date, group, count, sla in rows:
+            d = delta.setdefault((date, group), [0, 0])
+            d[0] += sign * count
+            d[1] += sign * sla
+    delta = {k: v for k, v in delta.items() if v != [0, 0]}
+    if not delta:
+        return metrics, 0
+    if arrow_format.is_table(metrics):
+        metrics = arrow_format.to_records(metrics)
+    merged = {(m["date"], m["group_name"]): dict(m) for m in metrics}
+    for (date, group), (count, sla) in delta.items():
+        m = merged.setdefault((date, group), {"date": date, "group_name": group, "logs_count": 0,
+                                              "total_sla_breaches": 0})
+        m["logs_count"] = (m["logs_count"] or 0) + count
+        m["total_sla_breaches"] = (m["total_sla_breaches"] or 0) + sla
+        m["unique_keywords_count"] = None
+    # 다른 경로와 같은 정렬 (date DESC, group_name)
+    rows = sorted((m for m in merged.values() if m["logs_count"] > 0), key=lambda m: m["group_name"] or "")
+    rows.sort(key=lambda m: m["date"], reverse=True)
+    return rows, sum(v[0] for v in delta.values())
+
 # --- 스키마 ---
 class AppendLogRequest(BaseModel):
     request_id: Optional[str] = Field(None, description="Idempotency key (UUID 권장)")
@@ -369,47 +1158,106 @@ class AppendLogRequest(BaseModel):
     attachments: Optional[List[str]] = Field(default_factory=list)
     signature: Optional[str] = None
 
+class ChatImportRequest(BaseModel):
+    path: str = Field(..., description="WHATSAPP_IMPORT_DIR 기준 export 파일 경로 (_chat.txt)")
+    group_name: str = Field(..., max_length=200)
+    dayfirst: bool = Field(True, description="날짜 D/M/Y (false 면 M/D/Y)")
+    resume: bool = Field(True, description="checkpoint offset 부터 이어서 처리")
+
 app = FastAPI(title="HVDC WhatsApp → Local KPI Store (FastAPI + DuckDB Pipeline)",
               version="2.0.0",
-              description="CSV/SQLite 저장 + 멱등성 + HMAC + KPI + DuckDB 연동 + HVDC Pipeline 통합")
+              description="CSV/SQLite 저장 + 멱등성 + HMAC + KPI + DuckDB 연동 + HVDC Pipeline 통합",
+              default_response_class=CodecJSONResponse)
 
 # === Request access logging middleware ===
-from plyer import notification  # type: ignore
-
 LOG_FILE = "access_log.jsonl"
 
+_access_log = AccessLog(
+    LOG_FILE,
+    capacity=ACCESS_LOG_BUFFER,
+    flush_ms=ACCESS_LOG_FLUSH_MS,
+    digest_secs=ACCESS_DIGEST_SECS,
+    notify=ACCESS_NOTIFY,
+    serialize=json_codec.dumps,
+)
+
+# latency 히스토그램 (/metrics "latency", /metrics/prom)
+instrumentation.REGISTRY.describe("http_request", "HTTP request latency by route template, method and status")
+instrumentation.REGISTRY.describe("stage", "Ingest/read stage latency (auth, hmac, csv, sqlite, bronze, pipeline trigger)")
+instrumentation.REGISTRY.describe("kpi", "KPI aggregation latency by engine")
+instrumentation.REGISTRY.describe("kpi_requests", "KPI requests served by engine and outcome (error = fell back)")
+instrumentation.REGISTRY.describe("kpi_cache", "KPI cache lookups by outcome (hit, shared, miss, coalesced, uncached, off)")
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    entry = {
+    t0 = time.perf_counter()
+    # 메모리 버퍼에만 기록 → 파일 append / 알림 digest 는 background task 가 처리
+    _access_log.record({
         "timestamp": datetime.now().isoformat(),
         "client_ip": getattr(request.client, "host", "-"),
         "method": request.method,
         "url": str(request.url),
         "api_key": request.headers.get("x-api-key"),
-    }
-    os.makedirs(os.path.dirname(LOG_FILE) or ".", exist_ok=True)
-    try:
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
-    except Exception:
-        pass
-
-    print(f"🔔 API Access: {entry['client_ip']} → {entry['url']}")
-
+    })
+    instrumentation.observe("stage", time.perf_counter() - t0, stage="access_log")
+    phases = instrumentation.begin_phases() if SERVER_TIMING else None
+    status = 500
     try:
-        notification.notify(
-            title="HVDC API Access",
-            message=f"{entry['client_ip']} → {entry['url']}",
-            timeout=5,
+        response = await call_next(request)
+        status = response.status_code
+        if phases is not None:
+            response.headers["Server-Timing"] = instrumentation.server_timing_header(
+                phases, total=time.perf_counter() - t0)
+        return response
+    finally:
+        # 라벨은 route 템플릿 (/import/whatsapp/{job_id}) 으로 고정해 cardinality 제한
+        route = request.scope.get("route")
+        instrumentation.observe(
+            "http_request", time.perf_counter() - t0,
+            route=getattr(route, "path", "<unmatched>"), method=request.method, status=str(status),
         )
-    except Exception as e:
-        print(f"❌ 알림 실패: {e}")
 
-    return await call_next(request)
+@app.on_event("startup")
+async def _start_access_log():
+    await _access_log.start()
 
 @app.on_event("startup")
 def _startup():
     _ensure_storage()
+    _warm_idempotency()
+
+def _commit_queued(bodies: List[dict]) -> List[dict]:
+    """write-behind writer 가 호출하는 group-commit"""
+    results = _store_bodies(bodies)
+    if any(r["inserted"] for r in results):
+        trigger_hvdc_pipeline_debounced()
+    return results
+
+_ingest_queue = WriteBehindQueue(
+    _commit_queued,
+    flush_ms=INGEST_FLUSH_MS,
+    max_rows=INGEST_BATCH_ROWS,
+    max_depth=INGEST_QUEUE_MAX,
+)
+
+@app.on_event("startup")
+async def _start_ingest_queue():
+    if INGEST_MODE == "write_behind":
+        await _ingest_queue.start()
+    _job_queue.start()
+    _pipeline_scheduler.start()
+
+@app.on_event("shutdown")
+async def _stop_ingest_queue():
+    # 남은 항목을 모두 commit 후 종료
+    await _ingest_queue.stop()
+    # 실행 중 job (자동 실행 포함) 에 취소 요청 → scheduler 스레드도 바로 종료
+    _job_queue.stop()
+    _pipeline_scheduler.stop()
+    await _access_log.stop()
+    _bronze_writer.close()
+    _duckdb_pool.close()
+    _sqlite_pool.close_all()
 
 # --- 디버그: 실제 경로 확인 ---
 router = APIRouter()
@@ -449,85 +1297,451 @@ def health():
 
 @app.get("/logs")
 def get_recent_rows(
-    limit: int = Query(10, ge=1, le=200),
+    limit: int = Query(10, ge=1, le=max(LOGS_PAGE_MAX, LOGS_BULK_PAGE_MAX)),
     since: Optional[str] = None,
     group_name: Optional[str] = None,
-    x_api_key: Optional[str] = Header(None)
+    group_match: str = Query("exact", pattern=GROUP_MATCH_PATTERN),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+    fmt: str = Query("json", alias="format", pattern=arrow_format.FORMAT_PATTERN),
+    x_api_key: Optional[str] = Header(None),
+    x_bulk_sync_token: Optional[str] = Header(None),
 ):
     _require_api_key(x_api_key)
-    rows = _sqlite_query(limit=limit, since=since, group_name=group_name)
-    return {"status": "ok", "rows": rows, "timestamp": datetime.utcnow().isoformat()}
+    _require_format(fmt)
+    if limit > LOGS_PAGE_MAX and not (
+        LOGS_BULK_SYNC_TOKEN and x_bulk_sync_token
+        and hmac.compare_digest(x_bulk_sync_token, LOGS_BULK_SYNC_TOKEN)
+    ):
+        raise HTTPException(status_code=422, detail=f"limit > {LOGS_PAGE_MAX} requires X-Bulk-Sync-Token")
+    rows, next_cursor = _sqlite_query(limit=limit, since=since, group_name=group_name, cursor=cursor,
+                                      group_match=group_match)
+    if fmt != "json":
+        # LOGS_ARROW_BATCH_ROWS 행씩 record batch 로 만들어 바로 전송 (전체 테이블 / body 복사본 없음), cursor 는 헤더로
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+        return StreamingResponse(arrow_format.stream_records(rows, arrow_format.LOGS_COLUMNS, fmt, LOGS_ARROW_BATCH_ROWS),
+                                 media_type=arrow_format.MEDIA_TYPES[fmt], headers=headers)
+    # 행은 이미 JSON 기본 타입 → Response 를 직접 반환해 jsonable_encoder 순회 생략
+    return CodecJSONResponse({"status": "ok", "rows": rows, "next_cursor": next_cursor,
+                              "timestamp": datetime.utcnow().isoformat()})
+
+@timed("stage", phase="parse", stage="parse_body")
+def _parse_log_body(raw: bytes) -> dict:
+    """raw body 한 번 파싱 → AppendLogRequest 검증 (FastAPI 와 같은 422 형식)"""
+    try:
+        data = json_codec.loads(raw)
+    except ValueError as e:
+        raise RequestValidationError([{
+            "type": "json_invalid", "loc": ("body",), "msg": "JSON decode error",
+            "input": {}, "ctx": {"error": str(e)},
+        }])
+    try:
+        return AppendLogRequest.model_validate(data).dict()
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        )
 
-@app.post("/logs")
+@app.post("/logs", openapi_extra={"requestBody": {
+    "required": True,
+    "content": {"application/json": {"schema": {"$ref": "#/components/schemas/AppendLogRequest"}}},
+}})
 async def append_log(
     req: Request,
-    payload: AppendLogRequest,
     x_api_key: Optional[str] = Header(None),
     x_signature: Optional[str] = Header(None),
     background_tasks: BackgroundTasks = None,
 ):
     _require_api_key(x_api_key)
+    # HMAC 검증과 모델 검증이 같은 raw bytes 를 사용 (본문 파싱 1회)
     raw = await req.body()
     _verify_hmac(raw, x_signature)
 
-    body = payload.dict()
+    body = _parse_log_body(raw)
     now_iso = datetime.utcnow().isoformat(timespec="seconds")
     body["created_at"] = now_iso
 
-    _csv_append([
-        body["date_gst"], body["group_name"], body["summary"],
-        json.dumps(body.get("top_keywords", []), ensure_ascii=False),
-        int(body.get("sla_breaches", 0)),
-        json.dumps(body.get("attachments", []), ensure_ascii=False),
-        body["created_at"], body.get("request_id"), "ok"
-    ])
+    # 중복 request_id 는 디스크 I/O 전에 거절 (Bloom 판정은 메모리, SQLite 확인만 event loop 밖에서)
+    rid = body.get("request_id")
+    state = _idempotency.check(rid) if rid else NEW
+    if state == DUPLICATE or (state != NEW and await run_in_threadpool(_confirm_request_id, rid)):
+        return CodecJSONResponse(status_code=409, content={
+            "status": "error",
+            "message": "Duplicate request_id"
+        })
+
+    if INGEST_MODE == "write_behind":
+        return await _enqueue_log(body)
 
-    inserted = _sqlite_insert(body)
-    if not inserted:
-        return JSONResponse(status_code=409, content={
+    # SQLite/CSV/Bronze 쓰기는 event loop 밖에서
+    bronze_status = await run_in_threadpool(_store_log, body)
+    if bronze_status is None:
+        return CodecJSONResponse(status_code=409, content={
             "status": "error",
             "message": "Duplicate request_id"
         })
 
+    # HVDC 파이프라인 자동 트리거 (응답 후 비동기 실행 → Server-Timing 에는 예약 비용만 표시)
+    with instrumentation.phase("trigger"):
+        if background_tasks is not None:
+            background_tasks.add_task(trigger_hvdc_pipeline_debounced)
+        else:
+            # fallback (일부 실행환경에서 BackgroundTasks 미주입 시)
+            trigger_hvdc_pipeline_debounced()
+
+    return {
+        "status": "ok",
+        "idempotency_key": body.get("request_id", ""),
+        "attempt": 1,
+        "priority": "FYI",
+        "sla_breach": int(body.get("sla_breaches", 0)),
+        "message": "Stored in local CSV/SQLite + Bronze JSONL",
+        "bronze_file": bronze_status,
+        "pipeline_triggered": True
+    }
+
+def _store_log(body: dict) -> Optional[str]:
+    """sync 모드 단건 적재. SQLite(UNIQUE) 가 최종 판정 → 통과한 행만 CSV/Bronze. 중복이면 None"""
+    cols = _json_columns(body)
+    if not _sqlite_insert(body, cols):
+        return None
+    _csv_append(_csv_row(body, cols))
+
     # Bronze JSONL 자동 적재
     try:
         bronze_file = write_bronze_jsonl(body)
-        bronze_status = f"Bronze: {bronze_file.name}"
+        return f"Bronze: {bronze_file.name}"
     except Exception as e:
-        bronze_status = f"Bronze failed: {str(e)}"
+        return f"Bronze failed: {str(e)}"
 
-    # HVDC 파이프라인 자동 트리거 (응답 후 비동기 실행)
-    if background_tasks is not None:
-        background_tasks.add_task(trigger_hvdc_pipeline_debounced)
-    else:
-        # fallback (일부 실행환경에서 BackgroundTasks 미주입 시)
-        trigger_hvdc_pipeline_debounced()
+async def _enqueue_log(body: dict):
+    """write-behind 모드: 큐 적재 후 durability 설정에 따라 즉시(202) 또는 commit 후 응답"""
+    try:
+        fut = _ingest_queue.submit(body)
+    except QueueFull:
+        return CodecJSONResponse(status_code=503, content={
+            "status": "error",
+            "message": "Ingest queue full, retry later"
+        })
+
+    if INGEST_DURABILITY == "enqueue":
+        return CodecJSONResponse(status_code=202, content={
+            "status": "queued",
+            "idempotency_key": body.get("request_id", ""),
+            "attempt": 1,
+            "priority": "FYI",
+            "sla_breach": int(body.get("sla_breaches", 0)),
+            "message": "Queued for write-behind commit (CSV/SQLite + Bronze JSONL)",
+            "queue_depth": _ingest_queue.depth(),
+        })
 
+    result = await fut
+    if not result["inserted"]:
+        return CodecJSONResponse(status_code=409, content={
+            "status": "error",
+            "message": "Duplicate request_id"
+        })
     return {
         "status": "ok",
         "idempotency_key": body.get("request_id", ""),
         "attempt": 1,
         "priority": "FYI",
         "sla_breach": int(body.get("sla_breaches", 0)),
-        "message": "Stored in local CSV/SQLite + Bronze JSONL",
-        "bronze_file": bronze_status,
+        "message": "Stored in local CSV/SQLite + Bronze JSONL (group commit)",
+        "bronze_file": result["bronze_file"],
         "pipeline_triggered": True
     }
 
+# --- 배치 적재 ---
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+
+def _parse_batch_items(raw: bytes, content_type: str) -> list:
+    """JSON 배열 또는 NDJSON 본문을 항목 리스트로 변환"""
+    text = raw.strip()
+    if not text:
+        return []
+    if "ndjson" not in content_type and "jsonl" not in content_type and text.startswith(b"["):
+        items = json_codec.loads(text)
+        if not isinstance(items, list):
+            raise ValueError("JSON body must be an array")
+        return items
+    return [json_codec.loads(line) for line in text.splitlines() if line.strip()]
+
+def _ingest_batch(raw: bytes, content_type: str) -> dict:
+    """본문 파싱 → 항목 검증/중복 확인 → 저장 (동기, threadpool 에서 실행). 응답 dict 반환"""
+    try:
+        items = _parse_batch_items(raw, content_type)
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {e}")
+    if len(items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_ITEMS} items")
+
+    now_iso = datetime.utcnow().isoformat(timespec="seconds")
+    results: list = [None] * len(items)
+    accepted: list = []  # (index, body)
+    seen_ids = set()
+    for i, item in enumerate(items):
+        try:
+            body = AppendLogRequest.model_validate(item).dict()
+        except ValidationError as e:
+            results[i] = {"index": i, "status": "invalid",
+                          "errors": json_codec.loads(e.json(include_url=False))}
+            continue
+        rid = body.get("request_id")
+        if rid and (rid in seen_ids or _is_known_request_id(rid)):
+            results[i] = {"index": i, "status": "duplicate", "idempotency_key": rid}
+            continue
+        if rid:
+            seen_ids.add(rid)
+        body["created_at"] = now_iso
+        accepted.append((i, body))
+
+    stored = 0
+    for (i, body), res in zip(accepted, _store_bodies([body for _, body in accepted])):
+        if not res["inserted"]:
+            results[i] = {"index": i, "status": "duplicate",
+                          "idempotency_key": body.get("request_id")}
+            continue
+        stored += 1
+        results[i] = {
+            "index": i,
+            "status": "ok",
+            "idempotency_key": body.get("request_id") or "",
+            "sla_breach": int(body.get("sla_breaches", 0)),
+            "bronze_file": res["bronze_file"],
+        }
+
+    return {
+        "status": "ok",
+        "received": len(items),
+        "stored": stored,
+        "duplicates": sum(1 for r in results if r["status"] == "duplicate"),
+        "invalid": sum(1 for r in results if r["status"] == "invalid"),
+        "results": results,
+        "pipeline_triggered": bool(stored),
+    }
+
+@app.post("/logs/batch")
+async def append_logs_batch(
+    req: Request,
+    x_api_key: Optional[str] = Header(None),
+    x_signature: Optional[str] = Header(None),
+    background_tasks: BackgroundTasks = None,
+):
+    """JSON 배열/NDJSON 일괄 적재 (SQLite 단일 트랜잭션, 파일당 1회 append)"""
+    _require_api_key(x_api_key)
+    raw = await req.body()
+    _verify_hmac(raw, x_signature)
+    # 최대 BATCH_MAX_ITEMS 건의 검증/중복 조회/SQLite·CSV·Bronze 쓰기는 event loop 밖에서
+    result = await run_in_threadpool(_ingest_batch, raw, req.headers.get("content-type", ""))
+
+    if result["stored"]:
+        if background_tasks is not None:
+            background_tasks.add_task(trigger_hvdc_pipeline_debounced)
+        else:
+            trigger_hvdc_pipeline_debounced()
+    return result
+
+# --- KPI 캐시 응답 ---
+def _duckdb_mtime() -> Optional[int]:
+    try:
+        return DUCKDB_PATH.stat().st_mtime_ns
+    except OSError:
+        return None
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [t.strip() for t in if_none_match.split(",")]
+    # 약한 비교 (W/ 접두어 무시)
+    return "*" in tags or any((t[2:] if t.startswith("W/") else t) == etag for t in tags)
+
+def _require_format(fmt: str):
+    if fmt != "json" and not arrow_format.ARROW_AVAILABLE:
+        raise HTTPException(status_code=406, detail=f"format={fmt} requires pyarrow")
+
+def _render_kpi(result: dict, fmt: str) -> tuple:
+    """(body, Content-Type). 오류 결과는 format 과 무관하게 JSON"""
+    metrics = result.get("metrics")
+    if fmt == "json" or result.get("status") != "ok":
+        if arrow_format.is_table(metrics):
+            result = {**result, "metrics": arrow_format.to_records(metrics)}
+        return json_codec.dumps(result).encode("utf-8"), arrow_format.MEDIA_TYPES["json"]
+    granularity = result.get("granularity", "day")
+    if not arrow_format.is_table(metrics):  # SQLite rollup / pyarrow 없는 DuckDB 경로
+        metrics = arrow_format.from_records(metrics, arrow_format.kpi_columns(granularity))
+    metadata = {"since": result["since"], "until": result["until"], "granularity": granularity}
+    if result.get("high_water_mark"):
+        metadata["high_water_mark"] = result["high_water_mark"]
+    body = arrow_format.encode(metrics, fmt, metadata)
+    return body, arrow_format.MEDIA_TYPES[fmt]
+
+def _kpi_response(key_parts: tuple, compute, if_none_match: Optional[str], fmt: str = "json") -> Response:
+    """캐시 조회/계산 → ETag 응답 (If-None-Match 일치 시 304). compute() → (result dict, headers)"""
+    def _render():
+        result, headers = compute()
+        body, content_type = _render_kpi(result, fmt)
+        return body, {**headers, "Content-Type": content_type}, result.get("status") == "ok"
+
+    if KPI_CACHE:
+        entry, source = _kpi_cache.get_or_compute(_kpi_cache.make_key(*key_parts), _render)
+    else:
+        body, headers, _ = _render()
+        entry, source = (KpiCache.make_etag(body), body, headers, time.time()), "off"
+    instrumentation.inc("kpi_cache", outcome=source)
+    etag, body, headers, _ = entry
+    resp_headers = {"ETag": etag, "Cache-Control": "no-cache", "X-KPI-Cache": source, **headers}
+    media_type = resp_headers.pop("Content-Type", "application/json")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        _kpi_cache.not_modified_hit()
+        return Response(status_code=304, headers=resp_headers)
+    return Response(content=body, media_type=media_type, headers=resp_headers)
+
+def _compute_kpi(since, until, group_name, group_match, granularity="day") -> tuple:
+    """KPI_HYBRID: DuckDB API rollup + high-water mark 이후 SQLite 행, 아니면 DuckDB 우선,
+    실패 시 SQLite rollup. (result, 응답 헤더)"""
+    fallback = False
+    if DUCKDB_ENABLED and KPI_HYBRID:
+        hybrid = None
+        try:
+            hybrid = _kpi_hybrid_from_duckdb(since, until, group_name, group_match, granularity)
+        except SnapshotDeferred:
+            pass
+        except Exception as e:
+            print(f"❌ hybrid KPI: {e} → DuckDB/SQLite")
+        if hybrid is not None:
+            history, edge, high_water, tail_from = hybrid
+            with instrumentation.phase("sqlite_tail"):
+                tail = _kpi_tail_from_sqlite(tail_from, since, until, group_name, group_match, granularity)
+            metrics, tail_net = _merge_kpi_tail(history, tail, edge)
+            instrumentation.inc("kpi_requests", engine="hybrid", outcome="ok")
+            return ({"status": "ok", "since": since or "", "until": until or "", "metrics": metrics,
+                     "granularity": granularity, "high_water_mark": high_water,
+                     "tail_logs_count": sum(r[2] for r in tail), "tail_net_rows": tail_net},
+                    {"X-KPI-Engine": "hybrid", "X-KPI-High-Water": high_water})
+    if DUCKDB_ENABLED:
+        result = None
+        try:
+            # day 도 kpi_rollup: v_kpi_daily / silver Parquet 와 sla_log rollup 을 섞지 않음.
+            # kpi_rollup 이 없으면 (파이프라인 전) 모든 granularity 를 SQLite 로
+            result = _kpi_from_duckdb(since, until, group_name, group_match, granularity, from_rollup=True)
+        except Exception:
+            pass
+        # _kpi_from_duckdb 는 실패를 status=error dict 로 돌려줌 → SQLite 로 fallback
+        if result is not None and result.get("status") == "ok":
+            instrumentation.inc("kpi_requests", engine="duckdb", outcome="ok")
+            return {**result, "granularity": granularity}, {"X-KPI-Engine": "duckdb"}
+        instrumentation.inc("kpi_requests", engine="duckdb", outcome="error")
+        fallback = True
+    with instrumentation.phase("sqlite_fallback" if fallback else "sqlite_kpi"):
+        result = _kpi_from_sqlite(since, until, group_name, group_match, granularity)
+    instrumentation.inc("kpi_requests", engine="sqlite", outcome="ok")
+    return {**result, "granularity": granularity}, {"X-KPI-Engine": "sqlite"}
+
 @app.get("/kpi")
 def get_kpi(
     since: Optional[str] = None,
     until: Optional[str] = None,
     group_name: Optional[str] = None,
-    x_api_key: Optional[str] = Header(None)
+    group_match: str = Query("exact", pattern=GROUP_MATCH_PATTERN),
+    granularity: str = Query("day", pattern=KPI_GRANULARITY_PATTERN),
+    fmt: str = Query("json", alias="format", pattern=arrow_format.FORMAT_PATTERN),
+    x_api_key: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
 ):
     _require_api_key(x_api_key)
-    if DUCKDB_ENABLED:
+    _require_format(fmt)
+    _kpi_bounds(since, until)  # 잘못된 날짜는 캐시 조회 전에 422
+    # DuckDB 결과는 파이프라인, hybrid tail / SQLite fallback 은 ingest 에 따라 바뀌므로 두 버전 모두 키에 포함
+    key = ("kpi", since, until, group_name, group_match, granularity, fmt, _kpi_cache.versions(), _duckdb_mtime())
+    return _kpi_response(key, lambda: _compute_kpi(since, until, group_name, group_match, granularity),
+                         if_none_match, fmt)
+
+# --- WhatsApp export import (JobQueue kind "import_whatsapp": 영속/취소 가능) ---
+_import_lock = threading.Lock()  # 같은 파일/그룹 중복 확인 + submit 을 한 번에
+_IMPORT_STATUS = {"succeeded": "done"}  # 나머지 job state (queued/running/failed/cancelled) 는 그대로
+
+def _resolve_import_path(path: str) -> Path:
+    root = IMPORT_DIR.resolve()
+    target = (root / path).resolve()
+    if not target.is_relative_to(root):
+        raise HTTPException(status_code=400, detail="path must be inside WHATSAPP_IMPORT_DIR")
+    if not target.is_file():
+        raise HTTPException(status_code=404, detail=f"file not found: {path}")
+    return target
+
+def _job_import_whatsapp(ctx):
+    """export 파일 backfill: 진행 통계는 result_summary, 취소는 chunk (checkpoint) 사이에서"""
+    from hvdc_logs.chat_import import import_chat
+    params = ctx.params
+
+    def _progress(stats):
+        ctx.report(stats)
+        ctx.log(f"{stats['rows']} rows, {stats['offset']}/{stats['bytes_total']} bytes, "
+                f"{stats['rows_per_sec']} rows/s")
+        ctx.check_cancelled()
+
+    try:
+        with ctx.stage("import"):
+            return import_chat(
+                params["path"], params["group_name"],
+                workers=IMPORT_WORKERS or None,
+                chunk_mb=IMPORT_CHUNK_MB,
+                dayfirst=params["dayfirst"],
+                resume=params["resume"],
+                log_dir=WHATSAPP_LOG_DIR,
+                writer=_bronze_writer,
+                progress=_progress,
+                progress_secs=JOB_HEARTBEAT_SECS,
+            )
+    finally:
+        # 취소돼도 이미 적재한 chunk 는 Bronze 에 있음
+        if (ctx.summary or {}).get("rows"):
+            trigger_hvdc_pipeline_debounced()
+
+_job_queue.register("import_whatsapp", _job_import_whatsapp, stages=["import"])
+
+def _import_status(job: dict) -> dict:
+    """job → 기존 import 응답 형태 (status, stats, error 문자열)"""
+    return {
+        "job_id": job["job_id"],
+        "status": _IMPORT_STATUS.get(job["state"], job["state"]),
+        "path": job["params"].get("path"),
+        "group_name": job["params"].get("group_name"),
+        "queued_at": job["queued_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "stats": job["result_summary"],
+        "error": (job["error"] or {}).get("message"),
+        "cancel_url": f"/hvdc/jobs/{job['job_id']}/cancel",
+    }
+
+@app.post("/import/whatsapp")
+def import_whatsapp_export(body: ChatImportRequest, x_api_key: Optional[str] = Header(None)):
+    """WhatsApp export 파일 backfill (job 큐에서 실행, 202 + job id 반환)"""
+    _require_api_key(x_api_key)
+    path = _resolve_import_path(body.path)
+    params = {"path": str(path), "group_name": body.group_name, "dayfirst": body.dayfirst, "resume": body.resume}
+    with _import_lock:
+        for state in ("queued", "running"):
+            for job in _job_queue.list(state=state, kind="import_whatsapp"):
+                if job["params"].get("path") == params["path"] and job["params"].get("group_name") == body.group_name:
+                    raise HTTPException(status_code=409, detail=f"import already running: {job['job_id']}")
         try:
-            return _kpi_from_duckdb(since, until, group_name)
-        except Exception:
-            pass
-    return _kpi_from_sqlite(since, until, group_name)
+            job = _job_queue.submit("import_whatsapp", params)
+        except JobQueueFull as e:
+            return CodecJSONResponse(status_code=503, content={"status": "error", "message": f"Job queue full: {e}"})
+    return CodecJSONResponse(status_code=202, content={
+        "status": "accepted",
+        "job_id": job["job_id"],
+        "status_url": f"/import/whatsapp/{job['job_id']}",
+    })
+
+@app.get("/import/whatsapp/{job_id}")
+def get_import_status(job_id: str, x_api_key: Optional[str] = Header(None)):
+    """import 진행 상황 (rows, offset, rows_per_sec)"""
+    _require_api_key(x_api_key)
+    job = _job_queue.get(job_id)
+    if job is None or job["kind"] != "import_whatsapp":
+        raise HTTPException(status_code=404, detail="job not found")
+    return _import_status(job)
 
 # --- HVDC Pipeline Endpoints ---
 @app.get("/hvdc/status")
@@ -536,90 +1750,156 @@ def get_hvdc_status(x_api_key: Optional[str] = Header(None)):
     _require_api_key(x_api_key)
     return _get_hvdc_status()
 
-@app.post("/hvdc/run")
+@app.post("/hvdc/run", status_code=202)
 def run_hvdc_pipeline(x_api_key: Optional[str] = Header(None)):
-    """Run HVDC pipeline manually"""
+    """Queue HVDC pipeline run (Bronze→Silver→transform). Poll GET /hvdc/jobs/{job_id}"""
     _require_api_key(x_api_key)
-    return _run_hvdc_pipeline()
+    return _submit_job("pipeline", {"trigger": "api"})
 
 @app.post("/hvdc/transform")
-def hvdc_transform(background: BackgroundTasks, x_api_key: Optional[str] = Header(None)):
-    """Trigger WSL-based DuckDB pipeline asynchronously (returns 202)."""
+def hvdc_transform(x_api_key: Optional[str] = Header(None)):
+    """Queue WSL-based DuckDB pipeline (returns 202, job is queryable)."""
     _require_api_key(x_api_key)
-
-    # Build WSL command (quote spaces in path)
-    wsl_cmd = (
-        r"wsl -d Ubuntu -- bash -lc "
-        r"\"source ~/hvdc311/bin/activate && "
-        r"cd '/mnt/c/cursor-mcp/whatsapp db/hvdc_logs' && "
-        r"python3 run_pipeline.py >> pipeline_last_wsl.log 2>&1\""
-    )
-
-    def _trigger_wsl():
-        try:
-            # Use PowerShell to run WSL command detached
-            import subprocess, shlex
-            ps_cmd = "powershell -NoProfile -Command " + wsl_cmd
-            subprocess.Popen(shlex.split(ps_cmd), shell=False)
-        except Exception:
-            pass
-
-    background.add_task(_trigger_wsl)
-    job_id = str(uuid.uuid4())
+    try:
+        job = _job_queue.submit("transform_wsl", {"trigger": "api"})
+    except JobQueueFull as e:
+        return Response(content=f"{datetime.now(timezone.utc).isoformat()} | rejected | {e}",
+                        media_type="text/plain", status_code=503)
     return Response(
-        content=f"{datetime.now(timezone.utc).isoformat()} | accepted | job={job_id}",
+        content=f"{job['queued_at']} | accepted | job={job['job_id']}",
         media_type="text/plain",
         status_code=202,
+        headers={"Location": f"/hvdc/jobs/{job['job_id']}"},
     )
 
-@app.get("/hvdc/kpi")
-def get_hvdc_kpi(
-    since: Optional[str] = None,
-    until: Optional[str] = None,
-    group_name: Optional[str] = None,
-    x_api_key: Optional[str] = Header(None)
-):
-    """Get KPI from HVDC DuckDB pipeline (if available)"""
+@app.get("/hvdc/jobs")
+def list_hvdc_jobs(state: Optional[str] = Query(None), kind: Optional[str] = Query(None),
+                   limit: int = Query(50, ge=1, le=500), x_api_key: Optional[str] = Header(None)):
+    """Recent pipeline jobs (newest first)"""
     _require_api_key(x_api_key)
+    return {"jobs": _job_queue.list(state=state, kind=kind, limit=limit)}
+
+@app.get("/hvdc/jobs/{job_id}")
+def get_hvdc_job(job_id: str, x_api_key: Optional[str] = Header(None)):
+    """Job state, stage progress, timing, output tail"""
+    _require_api_key(x_api_key)
+    job = _job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/hvdc/jobs/{job_id}/cancel", status_code=202)
+def cancel_hvdc_job(job_id: str, x_api_key: Optional[str] = Header(None)):
+    """Cancel queued job, or request stop of running job (subprocess terminated)"""
+    _require_api_key(x_api_key)
+    job = _job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["state"] in ("succeeded", "failed"):
+        raise HTTPException(status_code=409, detail=f"Job already {job['state']}")
+    return job
+
+def _compute_hvdc_kpi(since, until, group_name, group_match, granularity="day") -> tuple:
     if DUCKDB_ENABLED:
         try:
-            return _kpi_from_duckdb(since, until, group_name)
+            result = _kpi_from_duckdb(since, until, group_name, group_match, granularity)
+            if result.get("status") == "ok":
+                result = {**result, "granularity": granularity}
+            return result, {"X-KPI-Engine": "duckdb"}
         except Exception as e:
             return {
                 "status": "error",
                 "message": f"DuckDB KPI query failed: {str(e)}",
                 "fallback": "Use /kpi endpoint for SQLite-based KPI"
-            }
+            }, {}
     else:
         return {
             "status": "error",
             "message": "DuckDB not available",
             "fallback": "Use /kpi endpoint for SQLite-based KPI"
-        }
+        }, {}
+
+@app.get("/hvdc/kpi")
+def get_hvdc_kpi(
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    group_name: Optional[str] = None,
+    group_match: str = Query("exact", pattern=GROUP_MATCH_PATTERN),
+    granularity: str = Query("day", pattern=KPI_GRANULARITY_PATTERN),
+    fmt: str = Query("json", alias="format", pattern=arrow_format.FORMAT_PATTERN),
+    x_api_key: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
+    """Get KPI from HVDC DuckDB pipeline (if available)"""
+    _require_api_key(x_api_key)
+    _require_format(fmt)
+    _kpi_bounds(since, until)
+    # DuckDB 전용 → ingest 는 결과를 바꾸지 않음 (pipeline 버전 + 파일 mtime 만 키에 포함)
+    key = ("hvdc_kpi", since, until, group_name, group_match, granularity, fmt,
+           _kpi_cache.versions().get("pipeline", 0), _duckdb_mtime())
+    return _kpi_response(key, lambda: _compute_hvdc_kpi(since, until, group_name, group_match, granularity),
+                         if_none_match, fmt)
 
 # --- 새로운 자동화 엔드포인트들 ---
+_EXPORT_COLUMNS = ("date_gst", "group_name", "sla_breaches", "created_at")
+
+def _export_csv_chunks(q: str, params: list, gzip_level: Optional[int]) -> Iterator[bytes]:
+    """fetchmany 배치 → csv.writer 1개로 인코딩 → (선택) gzip. 메모리는 배치 크기로 고정"""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    comp = zlib.compressobj(gzip_level, zlib.DEFLATED, 31) if gzip_level is not None else None
+
+    def _drain() -> bytes:
+        data = buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate(0)
+        # 배치마다 sync flush → 압축해도 배치 단위로 바로 전송
+        return comp.compress(data) + comp.flush(zlib.Z_SYNC_FLUSH) if comp else data
+
+    writer.writerow(_EXPORT_COLUMNS)
+    yield _drain()  # 헤더는 조회 전에 먼저 전송
+    with _sqlite_pool.dedicated() as conn:
+        cur = conn.execute(q, params)
+        while True:
+            rows = cur.fetchmany(EXPORT_BATCH_ROWS)
+            if not rows:
+                break
+            writer.writerows(rows)
+            yield _drain()
+    if comp:
+        yield comp.flush()
+
+def _export_query(since: Optional[str], until: Optional[str], group_name: Optional[str],
+                  group_match: str) -> tuple:
+    """since/until: date_gst 일자 기준 (KPI 와 같은 의미). 상한은 다음 날 미만으로 비교해 인덱스 사용"""
+    q = f"SELECT {', '.join(_EXPORT_COLUMNS)} FROM logs WHERE 1=1"
+    params = []
+    lo, hi = _kpi_bounds(since, until)
+    if lo: q += " AND date_gst >= ?"; params.append(lo)
+    if hi: q += " AND date_gst < ?"; params.append(hi)
+    group_sql, group_params = _group_filter_sqlite(group_name, group_match)
+    q += group_sql; params.extend(group_params)
+    q += " ORDER BY date_gst DESC"
+    return q, params
+
 @app.get("/kpi/export.csv")
-def export_kpi_csv(x_api_key: Optional[str] = Header(None)):
-    """Export KPI as CSV stream"""
+def export_kpi_csv(
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    group_name: Optional[str] = None,
+    group_match: str = Query("exact", pattern=GROUP_MATCH_PATTERN),
+    x_api_key: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """Export logs (date_gst, group_name, sla_breaches, created_at) as a streamed CSV"""
     _require_api_key(x_api_key)
-    
-    def rows():
-        # SQLite에서 KPI 데이터 조회하여 CSV 변환
-        conn = sqlite3.connect(str(SQLITE_PATH))
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT date_gst, group_name, sla_breaches, created_at
-            FROM logs
-            ORDER BY date_gst DESC
-        """)
-        yield "date_gst,group_name,sla_breaches,created_at\r\n"
-        for r in cur.fetchall():
-            buf = io.StringIO()
-            csv.writer(buf).writerow(r)
-            yield buf.getvalue()
-        conn.close()
-    
-    return Response(content="".join(rows()), media_type="text/csv")
+    q, params = _export_query(since, until, group_name, group_match)
+    gzip_ok = EXPORT_GZIP and "gzip" in (accept_encoding or "").lower()
+    headers = {"Vary": "Accept-Encoding"}
+    if gzip_ok:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(_export_csv_chunks(q, params, EXPORT_GZIP_LEVEL if gzip_ok else None),
+                             media_type="text/csv", headers=headers)
 
 @app.get("/metrics")
 def get_metrics(x_api_key: Optional[str] = Header(None)):
@@ -636,18 +1916,35 @@ def get_metrics(x_api_key: Optional[str] = Header(None)):
             cpu_percent = None
             mem_percent = None
 
+    lease = _pipeline_lease.state()
     return {
         "uptime_sec": int(time.time() - start_ts),
-        "last_pipeline_epoch": _last_run,
+        "last_pipeline_epoch": lease["last_run"],
+        "pipeline_lease": lease,
         "cpu_percent": cpu_percent,
         "mem_percent": mem_percent,
         "bronze_files_count": len(list(BRONZE_ROOT.rglob("*.jsonl"))) if BRONZE_ROOT.exists() else 0,
         "duckdb_enabled": DUCKDB_ENABLED,
+        "sqlite_pool": _sqlite_pool.stats(),
+        "idempotency": _idempotency.stats(),
+        "bronze_writer": _bronze_writer.stats(),
+        "csv_lock": _csv_lock.stats(),
+        "access_log": _access_log.stats(),
+        "jobs": _job_queue.stats(),
+        "kpi_cache": {"enabled": KPI_CACHE, **_kpi_cache.stats()},
+        "duckdb_pool": {"enabled": DUCKDB_POOL, **_duckdb_pool.stats()},
+        "latency": instrumentation.REGISTRY.snapshot(),
+        "ingest": {"mode": INGEST_MODE, "durability": INGEST_DURABILITY, **_ingest_queue.stats()},
         "hvdc_status": _get_hvdc_status()
     }
-# ==== OpenAPI 스키마 강제 주입(로컬 전용) ====
-from fastapi.openapi.utils import get_openapi
+@app.get("/metrics/prom")
+def get_metrics_prom(x_api_key: Optional[str] = Header(None)):
+    """route/저장 단계/KPI 엔진 latency 히스토그램 + 카운터 (Prometheus text format)"""
+    _require_api_key(x_api_key)
+    return Response(content=instrumentation.REGISTRY.render_prometheus(),
+                    media_type="text/plain; version=0.0.4; charset=utf-8")
 
+# ==== OpenAPI 스키마 강제 주입(로컬 전용) ====
 def _custom_openapi():
     """
     - servers: '/' (루트 오리진 https://localhost 하위로 인식)
@@ -855,6 +2152,12 @@ def _custom_openapi():
         if p == "/logs":
             _ensure_op_id(item, "get", "getLogs")
             _ensure_op_id(item, "post", "appendLog")
+        if p == "/logs/batch":
+            _ensure_op_id(item, "post", "appendLogsBatch")
+        if p == "/import/whatsapp":
+            _ensure_op_id(item, "post", "importWhatsappExport")
+        if p == "/import/whatsapp/{job_id}":
+            _ensure_op_id(item, "get", "getImportStatus")
         if p == "/kpi":
             _ensure_op_id(item, "get", "getKpi")
         if p == "/hvdc/status":
@@ -863,12 +2166,20 @@ def _custom_openapi():
             _ensure_op_id(item, "post", "runHvdcPipeline")
         if p == "/hvdc/transform":
             _ensure_op_id(item, "post", "execTransformSql")
+        if p == "/hvdc/jobs":
+            _ensure_op_id(item, "get", "listHvdcJobs")
+        if p == "/hvdc/jobs/{job_id}":
+            _ensure_op_id(item, "get", "getHvdcJob")
+        if p == "/hvdc/jobs/{job_id}/cancel":
+            _ensure_op_id(item, "post", "cancelHvdcJob")
         if p == "/hvdc/kpi":
             _ensure_op_id(item, "get", "getHvdcKpi")
         if p == "/kpi/export.csv":
             _ensure_op_id(item, "get", "exportKpiCsv")
         if p == "/metrics":
             _ensure_op_id(item, "get", "getMetrics")
+        if p == "/metrics/prom":
+            _ensure_op_id(item, "get", "getMetricsProm")
 
     app.openapi_schema = openapi_schema
     return app.openapi_schema
@@ -965,15 +2276,22 @@ components:
       type: object
       properties:
         status: { type: string, example: "ok" }
-        items:
+        since: { type: string }
+        until: { type: string }
+        granularity: { type: string, enum: [hour, day, week, month], example: "day" }
+        high_water_mark: { type: string, nullable: true, example: "2025-08-09T10:00:00", description: "hybrid: 파이프라인(bronze_stage)에 반영된 마지막 created_at" }
+        tail_logs_count: { type: integer, example: 6, description: "hybrid: SQLite 에서 읽은 tail 행 수 (mark - overlap 이후, DuckDB 와 겹치는 행 포함)" }
+        tail_net_rows: { type: integer, example: 4, description: "hybrid: tail - 겹치는 DuckDB 행 (kpi_hybrid_edge) = DuckDB 결과에 실제로 더해진 행 수. 0 일 수 있음" }
+        metrics:
           type: array
           items:
             type: object
             properties:
-              date: { type: string, example: "2025-08-09" }
+              date: { type: string, example: "2025-08-09", description: "구간 시작 (hour: YYYY-MM-DD HH:00:00, week: 월요일)" }
               group_name: { type: string, example: "Jopetwil 71 Group" }
-              logs: { type: integer, example: 12 }
-              sla_breaches: { type: integer, example: 0 }
+              logs_count: { type: integer, example: 12 }
+              total_sla_breaches: { type: integer, example: 0 }
+              unique_keywords_count: { type: integer, nullable: true, example: 3 }
     MetricsResponse:            # ← 뷰어 오류 원인 해결: proper object schema
       type: object
       required: [status, uptime_seconds]
@@ -983,12 +2301,59 @@ components:
         processed: { type: integer, example: 42 }
         queue_depth: { type: integer, example: 0 }
         duckdb_connected: { type: boolean, example: true }
+        latency:
+          type: object
+          description: instrumentation snapshot (histograms p50/p95/p99 ms, counters)
+          additionalProperties: true
         timestamp: { type: string, example: "2025-08-09T13:55:00Z" }
     ErrorResponse:
       type: object
       properties:
         status: { type: string, example: "error" }
         message: { type: string, example: "Unauthorized" }
+    JobAccepted:
+      type: object
+      properties:
+        status: { type: string, example: "accepted" }
+        job_id: { type: string }
+        kind: { type: string, example: "pipeline" }
+        queued_at: { type: string, format: date-time }
+        status_url: { type: string, example: "/hvdc/jobs/8c1f..." }
+    Job:
+      type: object
+      properties:
+        job_id: { type: string }
+        kind: { type: string, example: "pipeline" }
+        state: { type: string, enum: [queued, running, succeeded, failed, cancelled] }
+        params: { type: object, additionalProperties: true }
+        queued_at: { type: string, format: date-time }
+        started_at: { type: string, format: date-time, nullable: true }
+        finished_at: { type: string, format: date-time, nullable: true }
+        queue_wait_secs: { type: number, nullable: true }
+        duration_secs: { type: number, nullable: true }
+        stage: { type: string, nullable: true, example: "silver" }
+        progress: { type: string, nullable: true, example: "1/3" }
+        stages:
+          type: array
+          items:
+            type: object
+            properties:
+              name: { type: string }
+              state: { type: string, enum: [pending, running, succeeded, failed, cancelled, skipped] }
+              started_at: { type: string, format: date-time, nullable: true }
+              finished_at: { type: string, format: date-time, nullable: true }
+              duration_secs: { type: number }
+        output_tail: { type: string, description: "stdout/stderr 마지막 JOB_OUTPUT_MAX_KB" }
+        result_summary: { type: object, nullable: true, additionalProperties: true }
+        error:
+          type: object
+          nullable: true
+          properties:
+            type: { type: string }
+            message: { type: string }
+        cancel_requested: { type: boolean }
+        worker: { type: string, nullable: true }
+        heartbeat_at: { type: string, format: date-time, nullable: true }
 
 security:
   - ApiKeyHeader: []    # 뷰어 제약: 하나만 사용
@@ -1007,6 +2372,67 @@ paths:
               schema: { $ref: "#/components/schemas/MetricsResponse" }
 
   /logs:
+    get:
+      operationId: getLogs
+      tags: [Logs]
+      summary: Recent rows, newest first (keyset pagination)
+      description: next_cursor 를 cursor 로 넘겨 다음 페이지 조회 (마지막 페이지면 null). 페이지 깊이와 무관하게 같은 비용.
+      security: [ { ApiKeyHeader: [] } ]
+      parameters:
+        - name: limit
+          in: query
+          required: false
+          schema: { type: integer, default: 10, minimum: 1 }
+          description: "최대 LOGS_PAGE_MAX (기본 200). X-Bulk-Sync-Token 이 맞으면 LOGS_BULK_PAGE_MAX (기본 5000)"
+        - name: cursor
+          in: query
+          required: false
+          schema: { type: string }
+        - name: since
+          in: query
+          required: false
+          schema: { type: string }
+          description: "created_at >= since"
+        - name: group_name
+          in: query
+          required: false
+          schema: { type: string }
+        - name: group_match
+          in: query
+          required: false
+          schema: { type: string, enum: [exact, prefix, contains], default: exact }
+          description: "exact/prefix: groups 인덱스 사용, contains: 부분 문자열 (opt-in)"
+        - name: format
+          in: query
+          required: false
+          schema: { type: string, enum: [json, arrow, parquet], default: json }
+          description: "arrow: Arrow IPC stream, parquet: Parquet 파일 (pyarrow 필요, 없으면 406)"
+        - name: X-Bulk-Sync-Token
+          in: header
+          required: false
+          schema: { type: string }
+      responses:
+        "200":
+          description: "OK (format=arrow|parquet: 다음 페이지 cursor 는 X-Next-Cursor 헤더)"
+          content:
+            application/json:
+              schema:
+                type: object
+                properties:
+                  status: { type: string, example: "ok" }
+                  rows: { type: array, items: { type: object, additionalProperties: true } }
+                  next_cursor: { type: string, nullable: true }
+                  timestamp: { type: string }
+            application/vnd.apache.arrow.stream:
+              schema: { type: string, format: binary }
+            application/vnd.apache.parquet:
+              schema: { type: string, format: binary }
+        "400":
+          description: Invalid cursor
+        "406":
+          description: pyarrow not installed (format=arrow|parquet)
+        "422":
+          description: limit over LOGS_PAGE_MAX without bulk-sync token
     post:
       operationId: appendLog
       tags: [Logs]
@@ -1035,20 +2461,162 @@ paths:
             application/json:
               schema: { $ref: "#/components/schemas/ErrorResponse" }
 
-  /hvdc/run:
+  /logs/batch:
     post:
-      operationId: runHvdc
+      operationId: appendLogsBatch
+      tags: [Logs]
+      summary: Append WhatsApp summaries in bulk (JSON array or NDJSON)
+      description: 항목별 검증/멱등성 처리 후 SQLite 단일 트랜잭션 + (일자, 그룹) 파일당 1회 append.
+      security: [ { ApiKeyHeader: [] } ]
+      requestBody:
+        required: true
+        content:
+          application/json:
+            schema:
+              type: array
+              items: { $ref: "#/components/schemas/AppendLogRequest" }
+          application/x-ndjson:
+            schema: { type: string }
+      responses:
+        "200":
+          description: 항목별 결과 (ok / duplicate / invalid)
+          content:
+            application/json:
+              schema: { type: object }
+        "400":
+          description: Bad Request
+          content:
+            application/json:
+              schema: { $ref: "#/components/schemas/ErrorResponse" }
+        "413":
+          description: Batch too large
+          content:
+            application/json:
+              schema: { $ref: "#/components/schemas/ErrorResponse" }
+
+  /import/whatsapp:
+    post:
+      operationId: importWhatsappExport
+      tags: [Logs]
+      summary: Backfill a WhatsApp chat export (_chat.txt) into Bronze + chat_log
+      description: >
+        WHATSAPP_IMPORT_DIR 아래 파일만 허용. job 큐 (kind import_whatsapp) 에서 실행, checkpoint offset 부터 resume.
+        취소는 POST /hvdc/jobs/{job_id}/cancel (chunk 사이에서 중단, 다음 요청이 이어서 처리).
+      security: [ { ApiKeyHeader: [] } ]
+      requestBody:
+        required: true
+        content:
+          application/json:
+            schema:
+              type: object
+              required: [path, group_name]
+              properties:
+                path: { type: string, example: "lightning/_chat.txt" }
+                group_name: { type: string, example: "[HVDC] Project Lightning" }
+                dayfirst: { type: boolean, default: true }
+                resume: { type: boolean, default: true }
+      responses:
+        "202":
+          description: Accepted (job_id, status_url)
+          content:
+            application/json:
+              schema: { type: object }
+        "400":
+          description: path outside WHATSAPP_IMPORT_DIR
+          content:
+            application/json:
+              schema: { $ref: "#/components/schemas/ErrorResponse" }
+        "409":
+          description: Same file/group import already running
+          content:
+            application/json:
+              schema: { $ref: "#/components/schemas/ErrorResponse" }
+        "503":
+          description: Job queue full
+
+  /import/whatsapp/{job_id}:
+    get:
+      operationId: getImportStatus
+      tags: [Logs]
+      summary: WhatsApp import progress (rows, offset, rows_per_sec)
+      description: status 는 queued / running / done / failed / cancelled. stats 는 실행 중에도 JOB_HEARTBEAT_SECS 마다 갱신.
+      security: [ { ApiKeyHeader: [] } ]
+      parameters:
+        - { name: job_id, in: path, required: true, schema: { type: string } }
+      responses:
+        "200":
+          description: OK
+          content:
+            application/json:
+              schema:
+                type: object
+                properties:
+                  job_id: { type: string }
+                  status: { type: string, enum: [queued, running, done, failed, cancelled] }
+                  path: { type: string }
+                  group_name: { type: string }
+                  queued_at: { type: string, nullable: true }
+                  started_at: { type: string, nullable: true }
+                  finished_at: { type: string, nullable: true }
+                  stats: { type: object, nullable: true, description: "rows, offset, bytes_total, rows_per_sec, ..." }
+                  error: { type: string, nullable: true }
+                  cancel_url: { type: string }
+        "404":
+          description: Unknown job
+          content:
+            application/json:
+              schema: { $ref: "#/components/schemas/ErrorResponse" }
+
+  /hvdc/status:
+    get:
+      operationId: getHvdcStatus
       tags: [HVDC]
-      summary: Run HVDC pipeline (Bronze→Silver)
+      summary: Pipeline files and scheduler state (dirty / running / last success)
       security: [ { ApiKeyHeader: [] } ]
       responses:
         "200":
           description: OK
           content:
             application/json:
-              schema: { $ref: "#/components/schemas/MetricsResponse" }  # 파이프라인 결과 요약
-        "500":
-          description: Server Error
+              schema:
+                type: object
+                properties:
+                  pipeline_script: { type: boolean }
+                  transform_sql: { type: boolean }
+                  duckdb_file: { type: boolean }
+                  bronze_data: { type: array, items: { type: string } }
+                  silver_data: { type: array, items: { type: string } }
+                  scheduler:
+                    type: object
+                    properties:
+                      dirty: { type: boolean }
+                      dirty_age_secs: { type: number, nullable: true }
+                      stale: { type: boolean }
+                      running: { type: boolean }
+                      last_success: { type: number, nullable: true, description: epoch seconds }
+                      last_error: { type: string, nullable: true }
+                      last_duration_secs: { type: number, nullable: true }
+                      runs: { type: integer }
+                      failures: { type: integer }
+                      min_interval_secs: { type: number }
+                      max_staleness_secs: { type: number }
+                    additionalProperties: true
+
+  /hvdc/run:
+    post:
+      operationId: runHvdc
+      tags: [HVDC]
+      summary: Queue HVDC pipeline run (Bronze→Silver→transform)
+      description: 요청 스레드에서 실행하지 않고 job 으로 등록. 진행은 GET /hvdc/jobs/{job_id}
+      security: [ { ApiKeyHeader: [] } ]
+      responses:
+        "202":
+          description: Accepted (Location 헤더 = status_url)
+          content:
+            application/json:
+              schema: { $ref: "#/components/schemas/JobAccepted" }
+        "503":
+          description: Job queue full
           content:
             application/json:
               schema: { $ref: "#/components/schemas/ErrorResponse" }
@@ -1057,20 +2625,96 @@ paths:
     post:
       operationId: execTransformSql
       tags: [HVDC]
-      summary: Execute transform.sql in DuckDB
+      summary: Queue WSL DuckDB pipeline (transform.sql)
       security: [ { ApiKeyHeader: [] } ]
+      responses:
+        "202":
+          description: "Accepted: `<queued_at> | accepted | job=<job_id>` (Location 헤더 = /hvdc/jobs/{job_id})"
+          content:
+            text/plain:
+              schema: { type: string }
+        "503":
+          description: Job queue full
+          content:
+            text/plain:
+              schema: { type: string }
+
+  /hvdc/jobs:
+    get:
+      operationId: listHvdcJobs
+      tags: [HVDC]
+      summary: Recent pipeline jobs (newest first)
+      security: [ { ApiKeyHeader: [] } ]
+      parameters:
+        - name: state
+          in: query
+          required: false
+          schema: { type: string, enum: [queued, running, succeeded, failed, cancelled] }
+        - name: kind
+          in: query
+          required: false
+          schema: { type: string, enum: [pipeline, auto_pipeline, transform_wsl] }
+        - name: limit
+          in: query
+          required: false
+          schema: { type: integer, default: 50, minimum: 1, maximum: 500 }
       responses:
         "200":
           description: OK
           content:
             application/json:
-              schema: { $ref: "#/components/schemas/MetricsResponse" }
+              schema:
+                type: object
+                properties:
+                  jobs: { type: array, items: { $ref: "#/components/schemas/Job" } }
+
+  /hvdc/jobs/{job_id}:
+    get:
+      operationId: getHvdcJob
+      tags: [HVDC]
+      summary: Job state, stage progress, timing and output tail
+      security: [ { ApiKeyHeader: [] } ]
+      parameters:
+        - name: job_id
+          in: path
+          required: true
+          schema: { type: string }
+      responses:
+        "200":
+          description: OK
+          content:
+            application/json:
+              schema: { $ref: "#/components/schemas/Job" }
+        "404":
+          description: Job not found
+
+  /hvdc/jobs/{job_id}/cancel:
+    post:
+      operationId: cancelHvdcJob
+      tags: [HVDC]
+      summary: Cancel queued job or stop running job
+      security: [ { ApiKeyHeader: [] } ]
+      parameters:
+        - name: job_id
+          in: path
+          required: true
+          schema: { type: string }
+      responses:
+        "202":
+          description: Cancelled (queued) or cancel requested (running)
+          content:
+            application/json:
+              schema: { $ref: "#/components/schemas/Job" }
+        "404":
+          description: Job not found
+        "409":
+          description: Job already finished
 
   /kpi:
     get:
       operationId: getKpi
       tags: [KPI]
-      summary: Query KPI (JSON)
+      summary: Query KPI (JSON / Arrow / Parquet)
       security: [ { ApiKeyHeader: [] } ]
       parameters:
         - name: since
@@ -1078,23 +2722,76 @@ paths:
           required: false
           schema: { type: string }
           description: "YYYY-MM-DD 또는 ISO8601"
+        - name: until
+          in: query
+          required: false
+          schema: { type: string }
+          description: "YYYY-MM-DD, 해당 일자 포함"
         - name: group_name
           in: query
           required: false
           schema: { type: string }
+        - name: group_match
+          in: query
+          required: false
+          schema: { type: string, enum: [exact, prefix, contains], default: exact }
+          description: "exact/prefix: groups 인덱스 사용, contains: 부분 문자열 (opt-in)"
+        - name: granularity
+          in: query
+          required: false
+          schema: { type: string, enum: [hour, day, week, month], default: day }
+          description: "구간 단위 (GST 기준, week 는 월요일 시작). hour/week/month 는 미리 계산된 rollup 에서 조회"
+        - name: format
+          in: query
+          required: false
+          schema: { type: string, enum: [json, arrow, parquet], default: json }
+          description: "arrow: Arrow IPC stream, parquet: Parquet 파일 (pyarrow 필요, 없으면 406)"
+        - name: If-None-Match
+          in: header
+          required: false
+          schema: { type: string }
+          description: 이전 응답의 ETag. 데이터 버전이 같으면 304
       responses:
         "200":
-          description: OK
+          description: "OK (ETag, X-KPI-Cache: hit|shared|miss|coalesced|uncached|off, X-KPI-Engine: hybrid|duckdb|sqlite, hybrid 이면 X-KPI-High-Water)"
           content:
             application/json:
               schema: { $ref: "#/components/schemas/KpiResponse" }
+            application/vnd.apache.arrow.stream:
+              schema: { type: string, format: binary }
+            application/vnd.apache.parquet:
+              schema: { type: string, format: binary }
+        "304":
+          description: Not Modified (If-None-Match 일치)
+        "406":
+          description: pyarrow not installed (format=arrow|parquet)
 
   /kpi/export.csv:
     get:
       operationId: exportKpiCsv
       tags: [KPI]
       summary: Export KPI as CSV (stream)
+      description: "fetchmany 배치 단위 스트리밍 (EXPORT_BATCH_ROWS). Accept-Encoding: gzip 이면 Content-Encoding: gzip"
       security: [ { ApiKeyHeader: [] } ]
+      parameters:
+        - name: since
+          in: query
+          required: false
+          schema: { type: string }
+          description: "YYYY-MM-DD (date_gst 일자 기준)"
+        - name: until
+          in: query
+          required: false
+          schema: { type: string }
+          description: "YYYY-MM-DD, 해당 일자 포함"
+        - name: group_name
+          in: query
+          required: false
+          schema: { type: string }
+        - name: group_match
+          in: query
+          required: false
+          schema: { type: string, enum: [exact, prefix, contains], default: exact }
       responses:
         "200":
           description: CSV stream
@@ -1116,6 +2813,18 @@ paths:
           content:
             application/json:
               schema: { $ref: "#/components/schemas/MetricsResponse" }
+  /metrics/prom:
+    get:
+      operationId: getMetricsProm
+      tags: [Ops]
+      summary: Latency histograms and counters (Prometheus text format)
+      security: [ { ApiKeyHeader: [] } ]
+      responses:
+        "200":
+          description: Prometheus text exposition format 0.0.4
+          content:
+            text/plain:
+              schema: { type: string }
 """
 
 def _hard_injected_openapi():
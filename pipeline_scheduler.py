@@ -0,0 +1,234 @@
+"""
+pipeline_scheduler.py — 트리거를 버리지 않는 coalescing 파이프라인 스케줄러
+
+- ingest 는 mark_dirty() 만 호출 (메모리 카운터 증가, I/O 없음)
+- worker 마다 scheduler 스레드가 tick_ms 주기로
+    1) 모아 둔 dirty 표시를 SQLite pipeline_state 에 반영 (dirty_seq += n, dirty_since 유지)
+    2) dirty_seq > done_seq 이고 실행 조건을 만족하면 SQLiteLease 를 잡고 파이프라인 실행
+- 실행 조건
+    · 실행 중인 파이프라인 없음 (lease, 모든 worker 공유 → 동시 실행 1개)
+    · 마지막 실행 시작 후 min_interval_secs 경과
+      단, dirty 상태가 max_staleness_secs 를 넘으면 min_interval 을 무시하고 실행
+      (직전 실행이 실패했으면 무시하지 않음 → 실패 재시도는 min_interval 간격)
+- 실행 시작 시점의 dirty_seq 까지를 처리한 것으로 기록 → 실행 중 들어온 데이터는
+  dirty 로 남아 후속 실행 정확히 1회로 합쳐짐 (실패 시에도 dirty 유지 → 재시도)
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+from lease import SQLiteLease
+from sqlite_pool import SQLitePool
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pipeline_state (
+  name TEXT PRIMARY KEY,
+  dirty_seq INTEGER NOT NULL DEFAULT 0,
+  done_seq INTEGER NOT NULL DEFAULT 0,
+  dirty_since REAL,
+  last_mark REAL,
+  last_start REAL,
+  last_success REAL,
+  last_error TEXT,
+  last_duration REAL,
+  runs INTEGER NOT NULL DEFAULT 0,
+  failures INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+_MARK_SQL = """
+UPDATE pipeline_state
+   SET dirty_seq = dirty_seq + ?,
+       dirty_since = COALESCE(dirty_since, ?),
+       last_mark = MAX(COALESCE(last_mark, 0), ?)
+ WHERE name = ?
+"""
+
+_STATE_SQL = """
+SELECT dirty_seq, done_seq, dirty_since, last_mark, last_start, last_success,
+       last_error, last_duration, runs, failures
+  FROM pipeline_state WHERE name = ?
+"""
+
+_SUCCESS_SQL = """
+UPDATE pipeline_state
+   SET done_seq = MAX(done_seq, ?),
+       dirty_since = CASE WHEN dirty_seq > ? THEN ? ELSE NULL END,
+       last_success = ?, last_error = NULL, last_duration = ?, runs = runs + 1
+ WHERE name = ?
+"""
+
+_FAILURE_SQL = """
+UPDATE pipeline_state
+   SET last_error = ?, last_duration = ?, runs = runs + 1, failures = failures + 1
+ WHERE name = ?
+"""
+
+_STATE_KEYS = ("dirty_seq", "done_seq", "dirty_since", "last_mark", "last_start", "last_success",
+               "last_error", "last_duration", "runs", "failures")
+
+
+class CoalescingScheduler:
+    def __init__(self, pool: SQLitePool, lease: SQLiteLease, run: Callable[[], None],
+                 min_interval_secs: float = 60, max_staleness_secs: float = 300,
+                 tick_ms: int = 500):
+        self.pool = pool
+        self.lease = lease
+        self.run = run  # 실패 시 예외
+        self.name = lease.name
+        self.min_interval_secs = min_interval_secs
+        self.max_staleness_secs = max_staleness_secs
+        self.tick_secs = max(tick_ms, 10) / 1000.0
+        self.lease.debounce_secs = min_interval_secs
+        self._pending = 0
+        self._pending_since: Optional[float] = None
+        self._pending_last = 0.0
+        self._mark_lock = threading.Lock()
+        self._ready = False
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._running_here = False
+        self._last_ok = False
+
+    # --- ingest 경로 ---
+    def mark_dirty(self):
+        """새 데이터 도착 표시 (메모리만, 다음 tick 에 SQLite 반영)"""
+        now = time.time()
+        with self._mark_lock:
+            self._pending += 1
+            if self._pending_since is None:
+                self._pending_since = now
+            self._pending_last = now
+
+    # --- 스레드 ---
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="pipeline-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """대기 중 dirty 표시를 반영하고 종료 (실행 중인 파이프라인은 기다리지 않음)"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._flush()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"❌ pipeline scheduler: {e}")
+            self._wake.wait(self.tick_secs)
+            self._wake.clear()
+
+    # --- 한 주기 ---
+    def _ensure(self, conn):
+        if not self._ready:
+            conn.execute(_SCHEMA)
+            conn.execute("INSERT OR IGNORE INTO pipeline_state(name) VALUES(?)", (self.name,))
+            self._ready = True
+
+    def _flush(self):
+        with self._mark_lock:
+            n, since, last = self._pending, self._pending_since, self._pending_last
+            self._pending, self._pending_since = 0, None
+        if not n:
+            return
+        try:
+            with self.pool.write() as conn:
+                self._ensure(conn)
+                conn.execute(_MARK_SQL, (n, since, last, self.name))
+        except Exception:
+            # 반영 실패 시 다음 tick 에 다시 시도 (표시를 잃지 않음)
+            with self._mark_lock:
+                self._pending += n
+                self._pending_since = min(since, self._pending_since or since)
+                self._pending_last = max(last, self._pending_last)
+            raise
+
+    def _read_state(self) -> dict:
+        if not self._ready:
+            with self.pool.write() as conn:
+                self._ensure(conn)
+        with self.pool.connection() as conn:
+            row = conn.execute(_STATE_SQL, (self.name,)).fetchone()
+        return dict(zip(_STATE_KEYS, row))
+
+    def tick(self) -> bool:
+        """dirty 반영 후 조건이 맞으면 실행. 이번 tick 에 실행했으면 True"""
+        self._flush()
+        state = self._read_state()
+        if state["dirty_seq"] <= state["done_seq"]:
+            return False
+        now = time.time()
+        stale = bool(self.max_staleness_secs) and now - (state["dirty_since"] or now) >= self.max_staleness_secs
+        # 실패한 실행은 dirty_since 를 되돌리지 않으므로 stale 이 계속 참 → 매 tick 재실행 방지
+        stale = stale and state["last_error"] is None
+        token = self.lease.try_acquire(debounce=not stale)
+        if token is None:
+            return False
+        try:
+            self._execute()
+        finally:
+            self.lease.release(token, "ok" if self._last_ok else "error")
+        return True
+
+    def _execute(self):
+        # lease 안에서 다시 읽어 이번 실행이 덮는 범위(seq)를 확정
+        with self.pool.write() as conn:
+            row = conn.execute("SELECT dirty_seq FROM pipeline_state WHERE name = ?", (self.name,)).fetchone()
+            conn.execute("UPDATE pipeline_state SET last_start = ? WHERE name = ?", (time.time(), self.name))
+        seq = row[0]
+        t0 = time.time()
+        self._running_here = True
+        self._last_ok = False
+        try:
+            self.run()
+            self._last_ok = True
+        except Exception as e:
+            err = f"{type(e).__name__}: {e}"
+            print(f"HVDC pipeline error: {err}")
+            with self.pool.write() as conn:
+                conn.execute(_FAILURE_SQL, (err[:2000], time.time() - t0, self.name))
+            return
+        finally:
+            self._running_here = False
+        # 실행 중 들어온 변경은 시작 시각 기준으로 staleness 계산
+        with self.pool.write() as conn:
+            conn.execute(_SUCCESS_SQL, (seq, seq, t0, time.time(), time.time() - t0, self.name))
+
+    def state(self) -> dict:
+        try:
+            state = self._read_state()
+        except Exception as e:
+            print(f"❌ pipeline scheduler state: {e}")
+            state = dict.fromkeys(_STATE_KEYS)
+        now = time.time()
+        dirty = (state["dirty_seq"] or 0) > (state["done_seq"] or 0) or self._pending > 0
+        since = state["dirty_since"] or self._pending_since
+        lease = self.lease.state()
+        return {
+            "dirty": dirty,
+            "dirty_age_secs": round(now - since, 3) if dirty and since else None,
+            "stale": bool(dirty and since and self.max_staleness_secs
+                          and now - since >= self.max_staleness_secs),
+            "running": lease["running"],
+            "running_here": self._running_here,
+            "pending_marks_here": self._pending,
+            "last_start": state["last_start"],
+            "last_success": state["last_success"],
+            "last_error": state["last_error"],
+            "last_duration_secs": state["last_duration"],
+            "runs": state["runs"],
+            "failures": state["failures"],
+            "min_interval_secs": self.min_interval_secs,
+            "max_staleness_secs": self.max_staleness_secs,
+            "scheduler_alive": self._thread is not None and self._thread.is_alive(),
+        }
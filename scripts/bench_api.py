@@ -0,0 +1,277 @@
+"""
+In-process API load test: drives main.app / app.app through httpx's ASGI transport
+(no network, no uvicorn) on a throwaway DATA_DIR and records throughput + latency
+percentiles per concurrency profile.
+
+Profiles (request i of N, `--concurrency` in flight):
+- burst_post : POST /logs with unique request_id
+- mixed_read : GET /logs?limit=50 x3 + GET /kpi x1 (app.py has no GET /logs → /kpi only)
+- export     : GET /kpi/export.csv
+- metrics    : GET /metrics + /metrics/prom (app.py → GET /health)
+
+Each target runs in its own subprocess + temp directory (module-level config is read at
+import time). Environment knobs (INGEST_MODE, JSON_CODEC, SQLITE_POOL_SIZE, ...) are
+passed through and recorded in the output.
+
+Run from repo root:
+  python scripts/bench_api.py --out bench_baseline.json
+  # after a change: compare against the baseline, exit 1 on regression
+  python scripts/bench_api.py --compare bench_baseline.json --out bench_new.json
+  # compare two stored runs without re-running
+  python scripts/bench_api.py --compare bench_baseline.json --current bench_new.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_KEY = "bench-key"
+PROFILES = ("burst_post", "mixed_read", "export", "metrics")
+# 결과 JSON 에 기록할 환경 변수 (접두어)
+KNOBS = ("INGEST_", "JSON_CODEC", "SQLITE_", "BRONZE_", "ACCESS_LOG_", "SERVER_TIMING",
+         "DUCKDB_", "IDEMPOTENCY_", "BATCH_")
+
+SUMMARY = ("High tide paused offloading at MW4; 크레인 도착 지연, ETA 11:00. "
+           "RORO 작업 18:00 재개 예정, ALS145T 예약 확인.")
+GROUPS = ("[HVDC] Project Lightning", "Abu Dhabi Logistics", "Jopetwil 71 Group", "AGI Site Ops")
+
+Request = Tuple[str, str, dict]
+
+
+def _payload(i: int) -> dict:
+    return {
+        "request_id": str(uuid.uuid4()),
+        "date_gst": f"2025-08-{1 + i % 28:02d} {i % 24:02d}:00",
+        "group_name": GROUPS[i % len(GROUPS)],
+        "summary": SUMMARY,
+        "top_keywords": ["High tide", "AGI", "크레인"],
+        "sla_breaches": 1 if i % 3 == 0 else 0,
+        "attachments": [f"IMG-2025081{i % 10}-WA00{i % 100:02d}.jpg"],
+    }
+
+
+def _post_logs(i: int) -> Request:
+    return "POST", "/logs", {"json": _payload(i)}
+
+
+# target → profile → request factory (없는 profile 은 건너뜀)
+TARGETS: Dict[str, dict] = {
+    "main": {
+        "env": lambda tmp: {"DATA_DIR": os.path.join(tmp, "data")},
+        "profiles": {
+            "burst_post": _post_logs,
+            "mixed_read": lambda i: ("GET", "/kpi", {}) if i % 4 == 3
+            else ("GET", "/logs", {"params": {"limit": 50}}),
+            "export": lambda i: ("GET", "/kpi/export.csv", {}),
+            "metrics": lambda i: ("GET", "/metrics/prom" if i % 2 else "/metrics", {}),
+        },
+    },
+    "app": {
+        "env": lambda tmp: {"HVDC_LOGS_PATH": os.path.join(tmp, "hvdc_logs")},
+        "profiles": {
+            "burst_post": _post_logs,
+            "mixed_read": lambda i: ("GET", "/kpi", {}),
+            "export": lambda i: ("GET", "/kpi/export.csv", {}),
+            "metrics": lambda i: ("GET", "/health", {}),
+        },
+    },
+}
+
+
+def _percentile(sorted_vals: List[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+
+async def _drive(client, factory: Callable[[int], Request], n: int, concurrency: int, offset: int) -> dict:
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    counter = iter(range(n))
+
+    async def worker():
+        for i in counter:
+            method, url, kwargs = factory(offset + i)
+            t0 = time.perf_counter()
+            try:
+                r = await client.request(method, url, **kwargs)
+                await r.aread()
+                if r.status_code >= 400:
+                    errors[str(r.status_code)] = errors.get(str(r.status_code), 0) + 1
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - t0
+    lat = sorted(latencies)
+    return {
+        "requests": n,
+        "concurrency": concurrency,
+        "errors": errors,
+        "wall_s": round(wall, 4),
+        "rps": round(n / wall, 2) if wall else 0.0,
+        "mean_ms": round(sum(lat) / len(lat) * 1000, 3) if lat else 0.0,
+        "p50_ms": round(_percentile(lat, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(lat, 0.95) * 1000, 3),
+        "p99_ms": round(_percentile(lat, 0.99) * 1000, 3),
+        "max_ms": round(lat[-1] * 1000, 3) if lat else 0.0,
+    }
+
+
+async def _run_target(target: str, profiles: List[str], args) -> dict:
+    import httpx
+
+    module = __import__(target)
+    if target == "main":
+        module.trigger_hvdc_pipeline_debounced = lambda: None  # 파이프라인 subprocess 제외
+    app = module.app
+    factories = TARGETS[target]["profiles"]
+    results: Dict[str, dict] = {}
+    transport = httpx.ASGITransport(app=app)
+    # ASGITransport 는 lifespan 을 보내지 않으므로 startup/shutdown 핸들러를 직접 실행
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                     headers={"x-api-key": API_KEY}, timeout=60) as client:
+            # 읽기 profile 용 seed 데이터
+            for i in range(args.seed_rows):
+                method, url, kwargs = _post_logs(i)
+                await client.request(method, url, **kwargs)
+            offset = args.seed_rows
+            for name in profiles:
+                factory = factories.get(name)
+                if factory is None:
+                    continue
+                for c in args.concurrency:
+                    if args.warmup:
+                        await _drive(client, factory, args.warmup, c, offset)
+                        offset += args.warmup
+                    results[f"{name}@c{c}"] = await _drive(client, factory, args.requests, c, offset)
+                    offset += args.requests
+    return results
+
+
+def _run_worker(target: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, API_KEY=API_KEY, ACCESS_NOTIFY="off", ACCESS_DIGEST_SECS="3600",
+                   PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+        env.update(TARGETS[target]["env"](tmp))
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker", target,
+               "--profiles", ",".join(args.profiles), "--requests", str(args.requests),
+               "--concurrency", ",".join(map(str, args.concurrency)),
+               "--seed-rows", str(args.seed_rows), "--warmup", str(args.warmup)]
+        proc = subprocess.run(cmd, cwd=tmp, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{target} worker failed:\n{proc.stderr[-2000:]}")
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _print_results(results: Dict[str, Dict[str, dict]]):
+    print(f"{'target':<7}{'profile':<18}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for target, profiles in results.items():
+        for key, r in profiles.items():
+            errs = sum(r["errors"].values())
+            print(f"{target:<7}{key:<18}{r['rps']:>10.1f}{r['p50_ms']:>10.2f}"
+                  f"{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{errs:>8}")
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """rps 가 threshold 이상 감소하거나 p95/p99 가 threshold 이상 증가하면 regression"""
+    regressions: List[str] = []
+    print(f"\n{'target':<7}{'profile':<18}{'rps Δ':>10}{'p95 Δ':>10}{'p99 Δ':>10}  verdict")
+    for target, profiles in current["results"].items():
+        for key, cur in profiles.items():
+            base = baseline.get("results", {}).get(target, {}).get(key)
+            if not base:
+                print(f"{target:<7}{key:<18}{'':>30}  new")
+                continue
+            d_rps = (cur["rps"] - base["rps"]) / base["rps"] if base["rps"] else 0.0
+            d_p95 = (cur["p95_ms"] - base["p95_ms"]) / base["p95_ms"] if base["p95_ms"] else 0.0
+            d_p99 = (cur["p99_ms"] - base["p99_ms"]) / base["p99_ms"] if base["p99_ms"] else 0.0
+            new_errors = sum(cur["errors"].values()) > sum(base["errors"].values())
+            if d_rps < -threshold or d_p95 > threshold or d_p99 > threshold or new_errors:
+                verdict = "REGRESSION"
+                regressions.append(f"{target}/{key}")
+            elif d_rps > threshold or d_p95 < -threshold:
+                verdict = "improved"
+            else:
+                verdict = "ok"
+            print(f"{target:<7}{key:<18}{d_rps:>+10.1%}{d_p95:>+10.1%}{d_p99:>+10.1%}  {verdict}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="in-process ASGI load test for main.app / app.app")
+    parser.add_argument("--targets", default="main,app")
+    parser.add_argument("--profiles", default=",".join(PROFILES))
+    parser.add_argument("--requests", type=int, default=500, help="requests per profile per concurrency")
+    parser.add_argument("--concurrency", default="1,16", help="comma-separated in-flight levels")
+    parser.add_argument("--seed-rows", type=int, default=500, help="rows POSTed before the profiles")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--out", help="write results JSON (baseline)")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--current", help="with --compare: stored run to compare instead of running")
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative change flagged (0.15 = 15%%)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.profiles = [p for p in args.profiles.split(",") if p]
+    args.concurrency = [int(c) for c in str(args.concurrency).split(",") if c]
+
+    if args.worker:
+        results = asyncio.run(_run_target(args.worker, args.profiles, args))
+        print(json.dumps(results))
+        return
+
+    if args.current:
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        current = {
+            "meta": {
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "seed_rows": args.seed_rows,
+                "env": {k: v for k, v in sorted(os.environ.items()) if k.startswith(KNOBS)},
+            },
+            "results": {},
+        }
+        for target in [t for t in args.targets.split(",") if t]:
+            if target not in TARGETS:
+                parser.error(f"unknown target: {target}")
+            current["results"][target] = _run_worker(target, args)
+        _print_results(current["results"])
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(current, f, ensure_ascii=False, indent=2)
+            print(f"\nsaved: {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\nno regressions over {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
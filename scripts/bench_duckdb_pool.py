@@ -0,0 +1,141 @@
+"""
+KPI read benchmark: cold per-request DuckDB connect vs DuckDBReadPool (snapshot + prepared statement).
+
+Builds a temp DuckDB file shaped like run_pipeline.py's output (`sla_log` table + `v_kpi_daily` view)
+and runs the same daily KPI query both ways:
+- cold  : duckdb.connect(read_only) → execute → fetch_df → iterrows → close (old _kpi_from_duckdb)
+- pooled: per-thread cursor on the long-lived snapshot connection → EXECUTE prepared → fetchall
+
+Run from repo root:
+  python scripts/bench_duckdb_pool.py --threads 4 --ops 400 --seed-rows 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from duckdb_pool import DuckDBReadPool  # noqa: E402
+
+GROUPS = ["[HVDC] Project Lightning", "Jopetwil 71 Group", "AGI Marine Ops"]
+
+SEED_SQL = """
+CREATE TABLE sla_log AS
+SELECT TIMESTAMP '2025-01-01' + INTERVAL (i % 240) DAY + INTERVAL (i % 86400) SECOND AS ts,
+       ['[HVDC] Project Lightning', 'Jopetwil 71 Group', 'AGI Marine Ops'][1 + i % 3] AS group_name,
+       CAST(i % 7 = 0 AS INTEGER) AS sla_breaches,
+       'kw' || (i % 50) AS top_keywords
+FROM range(?) t(i)
+"""
+VIEW_SQL = """
+CREATE VIEW v_kpi_daily AS
+SELECT CAST(ts AS DATE) AS date, group_name, count(*) AS logs_count,
+       sum(sla_breaches) AS total_sla_breaches, count(DISTINCT top_keywords) AS unique_keywords_count
+FROM sla_log GROUP BY 1, 2
+"""
+KPI_SQL = ("SELECT * FROM v_kpi_daily WHERE ($1 IS NULL OR date >= CAST($1 AS DATE)) "
+           "AND ($2 IS NULL OR group_name = $2) ORDER BY date DESC, group_name")
+
+
+def seed(path: str, rows: int) -> None:
+    import duckdb
+
+    conn = duckdb.connect(path)
+    conn.execute(SEED_SQL, [rows])
+    conn.execute(VIEW_SQL)
+    conn.close()
+
+
+def _args(i: int) -> list:
+    return [f"2025-{1 + i % 8:02d}-01", GROUPS[i % len(GROUPS)] if i % 2 else None]
+
+
+def run(op: Callable[[int], int], threads: int, ops: int) -> dict:
+    latencies: List[float] = []
+    lat_lock = threading.Lock()
+    per_thread = ops // threads
+
+    def worker(tid: int) -> None:
+        local: List[float] = []
+        for i in range(per_thread):
+            t0 = time.perf_counter()
+            op(tid * per_thread + i)
+            local.append(time.perf_counter() - t0)
+        with lat_lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    ts = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "ops": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "ops_per_sec": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 3),
+    }
+
+
+def bench_cold(path: str, args) -> dict:
+    import duckdb
+
+    def op(i: int) -> int:
+        conn = duckdb.connect(path, read_only=True)
+        try:
+            df = conn.execute(KPI_SQL, _args(i)).fetch_df()
+            return sum(1 for _ in df.iterrows())
+        finally:
+            conn.close()
+
+    return run(op, args.threads, args.ops)
+
+
+def bench_pooled(path: str, serving_dir: str, args) -> dict:
+    pool = DuckDBReadPool(path, serving_dir)
+
+    def op(i: int) -> int:
+        with pool.cursor() as cur:
+            return len(pool.execute_prepared(cur, "kpi", KPI_SQL, _args(i)).fetchall())
+
+    try:
+        op(0)  # snapshot publish 는 프로세스당 1회 → 측정에서 제외
+        return run(op, args.threads, args.ops)
+    finally:
+        pool.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="DuckDB cold connect vs read pool KPI benchmark")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=400)
+    parser.add_argument("--seed-rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "hvdc.duckdb")
+        seed(path, args.seed_rows)
+        cold = bench_cold(path, args)
+        pooled = bench_pooled(path, os.path.join(tmp, "serving"), args)
+
+    print(f"threads={args.threads} ops={args.ops} seed_rows={args.seed_rows}")
+    print(f"{'mode':<22}{'ops/s':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, r in (("cold per-request", cold), ("pooled (prepared)", pooled)):
+        print(f"{name:<22}{r['ops_per_sec']:>10}{r['mean_ms']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}")
+    print(f"speedup: {pooled['ops_per_sec'] / cold['ops_per_sec']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
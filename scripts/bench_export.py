@@ -0,0 +1,116 @@
+"""
+GET /kpi/export.csv benchmark: old materializing export vs streaming fetchmany export (plain / gzip).
+
+Seeds a throwaway DATA_DIR with a synthetic `logs` table (main.py schema + indexes) and measures
+- total time and bytes produced
+- time to first data chunk (old path: the whole body)
+- Python heap peak (tracemalloc, separate pass so it does not skew timings)
+
+Run from repo root:
+  python scripts/bench_export.py --rows 2000000
+  python scripts/bench_export.py --rows 5000000 --skip-old   # old path needs the whole CSV in memory
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Iterable, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+GROUPS = ["[HVDC] Project Lightning", "Jopetwil 71 Group", "AGI Marine Ops", "DSV Yard, Mussafah"]
+
+
+def seed(api, rows: int) -> None:
+    api._ensure_storage()
+    with api._sqlite_pool.write() as conn:
+        group_ids = api._resolve_group_ids(conn, GROUPS)
+        conn.executemany(
+            "INSERT INTO logs(date_gst, group_name, summary, top_keywords, sla_breaches, attachments, "
+            "created_at, request_id, processed_status, group_id) VALUES(?,?,?,?,?,?,?,?,?,?)",
+            ((f"2025-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}", GROUPS[i % len(GROUPS)],
+              "High tide paused offloading; resume at 08:00", '["High tide"]', i % 3 == 0, "[]",
+              f"2025-08-10T{i % 24:02d}:{i % 60:02d}:00", None, "ok", group_ids[GROUPS[i % len(GROUPS)]])
+             for i in range(rows)),
+        )
+
+
+def old_export(api) -> Iterable[bytes]:
+    """이전 구현: fetchall + 행마다 StringIO/csv.writer + join"""
+    def rows():
+        with api._sqlite_pool.connection() as conn:
+            cur = conn.execute("SELECT date_gst, group_name, sla_breaches, created_at FROM logs ORDER BY date_gst DESC")
+            yield "date_gst,group_name,sla_breaches,created_at\r\n"
+            for r in cur.fetchall():
+                buf = io.StringIO()
+                csv.writer(buf).writerow(r)
+                yield buf.getvalue()
+    return [("".join(rows())).encode("utf-8")]
+
+
+def measure(make: Callable[[], Iterable[bytes]]) -> Tuple[float, float, int, int]:
+    """(첫 데이터 chunk 까지 초, 전체 초, bytes, chunk 수)"""
+    t0 = time.perf_counter()
+    first = None
+    total = chunks = 0
+    for i, chunk in enumerate(make()):
+        # 스트리밍 경로의 첫 chunk 는 헤더 → 두 번째 chunk 를 첫 데이터로
+        if first is None and (i > 0 or len(chunk) > 64):
+            first = time.perf_counter() - t0
+        total += len(chunk)
+        chunks += 1
+    return first or 0.0, time.perf_counter() - t0, total, chunks
+
+
+def heap_peak(make: Callable[[], Iterable[bytes]]) -> float:
+    tracemalloc.start()
+    for _ in make():
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="/kpi/export.csv old vs streaming export benchmark")
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--batch-rows", type=int, default=5000)
+    parser.add_argument("--gzip-level", type=int, default=6)
+    parser.add_argument("--skip-old", action="store_true")
+    parser.add_argument("--skip-memory", action="store_true", help="skip the tracemalloc pass")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATA_DIR"] = tmp
+        os.environ["EXPORT_BATCH_ROWS"] = str(args.batch_rows)
+        import main as api
+
+        t0 = time.perf_counter()
+        seed(api, args.rows)
+        print(f"seeded {args.rows} rows in {time.perf_counter() - t0:.1f}s (batch_rows={args.batch_rows})")
+
+        q, params = api._export_query(None, None, None, "exact")
+        modes = [
+            ("streaming", lambda: api._export_csv_chunks(q, params, None)),
+            (f"streaming gzip-{args.gzip_level}", lambda: api._export_csv_chunks(q, params, args.gzip_level)),
+        ]
+        if not args.skip_old:
+            modes.insert(0, ("old (join fetchall)", lambda: old_export(api)))
+
+        print(f"{'mode':<22}{'first s':>10}{'total s':>10}{'MB out':>10}{'chunks':>9}{'heap MB':>10}")
+        for name, make in modes:
+            first, total, size, chunks = measure(make)
+            peak = "-" if args.skip_memory else f"{heap_peak(make):.1f}"
+            print(f"{name:<22}{first:>10.3f}{total:>10.2f}{size / 1024 / 1024:>10.1f}{chunks:>9}{peak:>10}")
+        api._sqlite_pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
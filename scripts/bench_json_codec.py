@@ -0,0 +1,147 @@
+"""
+JSON codec benchmark: stdlib json vs orjson/msgspec (json_codec) on /logs GET and POST.
+
+Two views:
+- codec : only the JSON work one request does
+          POST = parse raw body + encode top_keywords/attachments + render response
+          GET  = decode 2 columns per row + render the rows
+- e2e   : CPU time per request through main.app (httpx ASGI transport, no network),
+          one subprocess per codec (JSON_CODEC=json / auto) on a temp DATA_DIR
+
+Run from repo root:
+  python scripts/bench_json_codec.py --requests 500 --rows 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import json_codec  # noqa: E402
+
+SUMMARY = ("High tide paused offloading at MW4; 크레인 도착 지연, ETA 11:00. "
+           "RORO 작업 18:00 재개 예정, ALS145T 예약 확인. ") * 6
+
+
+def _payload(i: int) -> dict:
+    return {
+        "request_id": str(uuid.uuid4()),
+        "date_gst": f"2025-08-{1 + i % 28:02d} {i % 24:02d}:00",
+        "group_name": "[HVDC] Project Lightning",
+        "summary": SUMMARY,
+        "top_keywords": ["High tide", "AGI", "크레인", "RORO", "ETA"],
+        "sla_breaches": i % 2,
+        "attachments": [f"IMG-2025081{i % 10}-WA00{i % 100:02d}.jpg"],
+    }
+
+
+def _row(i: int) -> dict:
+    p = _payload(i)
+    p.update(created_at="2025-08-10T10:00:00", processed_status="ok")
+    return p
+
+
+def bench_codec(codec: json_codec.Codec, n: int, rows: int) -> dict:
+    bodies = [json.dumps(_payload(i), ensure_ascii=False).encode("utf-8") for i in range(n)]
+    resp = {"status": "ok", "idempotency_key": "k", "attempt": 1, "priority": "FYI",
+            "sla_breach": 0, "message": "Stored", "bronze_file": "Bronze: x.jsonl",
+            "pipeline_triggered": True}
+    t0 = time.process_time()
+    for raw in bodies:
+        body = codec.loads(raw)
+        codec.dumps_bytes(body["top_keywords"])
+        codec.dumps_bytes(body["attachments"])
+        codec.dumps_bytes(resp)
+    post = (time.process_time() - t0) / n
+
+    stored = [(json.dumps(r["top_keywords"], ensure_ascii=False),
+               json.dumps(r["attachments"], ensure_ascii=False), r) for r in map(_row, range(rows))]
+    reps = max(n // 10, 1)
+    t0 = time.process_time()
+    for _ in range(reps):
+        out = []
+        for kw, att, r in stored:
+            d = dict(r)
+            d["top_keywords"] = codec.loads(kw)
+            d["attachments"] = codec.loads(att)
+            out.append(d)
+        codec.dumps_bytes({"status": "ok", "rows": out, "timestamp": "2025-08-10T10:00:00"})
+    get = (time.process_time() - t0) / reps
+    return {"post_us": post * 1e6, "get_us": get * 1e6}
+
+
+async def _e2e(n: int, rows: int) -> dict:
+    import httpx
+    import main
+
+    main.trigger_hvdc_pipeline_debounced = lambda: None  # 파이프라인 subprocess 제외
+    main._startup()
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(rows):
+            await client.post("/logs", json=_payload(i))
+        bodies = [json.dumps(_payload(rows + i), ensure_ascii=False).encode("utf-8") for i in range(n)]
+        headers = {"content-type": "application/json"}
+        t0 = time.process_time()
+        for raw in bodies:
+            r = await client.post("/logs", content=raw, headers=headers)
+            assert r.status_code == 200, r.text
+        post = (time.process_time() - t0) / n
+        t0 = time.process_time()
+        for _ in range(n):
+            r = await client.get("/logs", params={"limit": rows})
+            assert r.status_code == 200, r.text
+        get = (time.process_time() - t0) / n
+    main._bronze_writer.close()
+    return {"backend": json_codec.BACKEND, "post_us": post * 1e6, "get_us": get * 1e6}
+
+
+def _run_worker(codec: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, JSON_CODEC=codec, DATA_DIR=os.path.join(tmp, "data"),
+                   PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker",
+             "--requests", str(args.requests), "--rows", str(args.rows)],
+            cwd=tmp, env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="stdlib json vs fast JSON codec on /logs")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=200, help="GET /logs limit")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(_e2e(args.requests, args.rows))))
+        return
+
+    fast = json_codec.get_codec("auto")
+    print(f"requests={args.requests} rows={args.rows} fast_codec={fast.name}")
+    print(f"{'view':<8}{'codec':<10}{'POST us/req':>14}{'GET us/req':>14}")
+    base = bench_codec(json_codec.STDLIB, args.requests, args.rows)
+    best = bench_codec(fast, args.requests, args.rows)
+    for name, r in (("json", base), (fast.name, best)):
+        print(f"{'codec':<8}{name:<10}{r['post_us']:>14.1f}{r['get_us']:>14.1f}")
+    e_base = _run_worker("json", args)
+    e_best = _run_worker("auto", args)
+    for r in (e_base, e_best):
+        print(f"{'e2e':<8}{r['backend']:<10}{r['post_us']:>14.1f}{r['get_us']:>14.1f}")
+    print(f"e2e CPU saved per request: POST {e_base['post_us'] - e_best['post_us']:.1f} us, "
+          f"GET {e_base['get_us'] - e_best['get_us']:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
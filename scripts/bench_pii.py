@@ -0,0 +1,112 @@
+"""
+PII masking microbenchmark: legacy two-pass re.sub vs hvdc_logs.pii single-pass engine.
+
+Corpus: Korean/English mixed logistics summaries (50 ~ 5000 chars) where roughly a third
+carry PII (phones, emails, Emirates ID, plates, satellite phones) and the rest only
+carry dates/times/quantities.
+
+- legacy     : main._mask_pii before the pii module (uncompiled, phone pass + email pass)
+- mask_pii   : one compiled alternation per summary
+- mask_many  : whole batch joined and scanned once (POST /logs/batch, chat import)
+
+Note: the legacy rule covers fewer PII classes and also masks dates, so outputs differ.
+
+Run from repo root:
+  python scripts/bench_pii.py --n 20000 --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hvdc_logs.pii import mask_many, mask_pii  # noqa: E402
+
+PHRASES = [
+    "High tide paused offloading at MW4; resume at 08:00",
+    "크레인 도착 지연, ETA 11:00 예정",
+    "RORO 작업 18:00 재개 예정, ALS145T 예약 확인",
+    "AGI 선적 3 pcs 120t 완료, 다음 항차 2025-08-12 10:00",
+    "세관 서류 보완 요청 — BL 번호 확인 필요",
+    "Weather hold: wind 28 kn, swell 2.1 m",
+    "현장 출입증 발급 완료, 내일 07:30 집결",
+    "Jopetwil 71 berthing window 10/08/2025 14:00-18:00",
+]
+PII = [
+    "연락처 +971 50 123 4567",
+    "call 050-987-6543 for gate pass",
+    "mail ops.lead@samsung-ct.com",
+    "EID 784-1990-1234567-1",
+    "트럭 12가 3456 도착",
+    "Dubai A 12345 trailer at gate 3",
+    "vessel sat phone +870 773 123 456",
+    "선장 Iridium +8816 2345 6789",
+]
+
+
+def legacy_mask(text: str) -> str:
+    if not text:
+        return text
+    text = re.sub(r'\b(\+?\d[\d\-\s]{6,}\d)\b', '****', text)
+    text = re.sub(r'[\w\.-]+@[\w\.-]+\.\w+', '****', text)
+    return text
+
+
+def corpus(n: int, seed: int = 7) -> List[str]:
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        target = int(min(5000, rnd.lognormvariate(5.5, 0.9)))
+        parts: List[str] = []
+        size = 0
+        while size < max(target, 50):
+            s = rnd.choice(PII) if rnd.random() < 0.08 else rnd.choice(PHRASES)
+            parts.append(s)
+            size += len(s) + 2
+        out.append(". ".join(parts)[:5000])
+    return out
+
+
+def bench(name: str, fn: Callable[[List[str]], List[str]], texts: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(texts)
+        best = min(best, time.perf_counter() - t0)
+    mb = sum(len(t.encode("utf-8")) for t in texts) / (1024 * 1024)
+    print(f"{name:<12}{best * 1e6 / len(texts):>12.1f}{mb / best:>10.1f}")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="PII masking microbenchmark")
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--batch", type=int, default=500, help="mask_many batch size")
+    args = parser.parse_args()
+
+    texts = corpus(args.n)
+    avg = sum(map(len, texts)) / len(texts)
+    print(f"summaries={len(texts)} avg_chars={avg:.0f}")
+    print(f"{'mode':<12}{'us/item':>12}{'MB/s':>10}")
+
+    def batched(ts: List[str]) -> List[str]:
+        out: List[str] = []
+        for i in range(0, len(ts), args.batch):
+            out.extend(mask_many(ts[i:i + args.batch]))
+        return out
+
+    base = bench("legacy", lambda ts: [legacy_mask(t) for t in ts], texts, args.repeat)
+    single = bench("mask_pii", lambda ts: [mask_pii(t) for t in ts], texts, args.repeat)
+    many = bench("mask_many", batched, texts, args.repeat)
+    print(f"speedup vs legacy: mask_pii {base / single:.2f}x, mask_many {base / many:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Mixed read/write SQLite benchmark: per-call connect (default journal) vs SQLitePool (WAL).
+
+Simulates main.py traffic against a temp copy of the `logs` schema:
+- writes: single-row INSERT (POST /logs)
+- reads : latest-N query (GET /logs) and daily KPI aggregation (GET /kpi)
+
+Run from repo root:
+  python scripts/bench_sqlite_pool.py --threads 8 --ops 2000 --write-ratio 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlite_pool import SQLitePool  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date_gst TEXT NOT NULL,
+    group_name TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    top_keywords TEXT,
+    sla_breaches INTEGER DEFAULT 0,
+    attachments TEXT,
+    created_at TEXT NOT NULL,
+    request_id TEXT UNIQUE,
+    processed_status TEXT DEFAULT 'ok'
+)
+"""
+INSERT_SQL = """
+INSERT INTO logs(date_gst, group_name, summary, top_keywords,
+                 sla_breaches, attachments, created_at, request_id, processed_status)
+VALUES(?,?,?,?,?,?,?,?,?)
+"""
+LATEST_SQL = "SELECT * FROM logs WHERE 1=1 ORDER BY created_at DESC LIMIT ?"
+KPI_SQL = ("SELECT substr(date_gst,1,10) AS date, group_name, COUNT(*), SUM(COALESCE(sla_breaches,0)) "
+           "FROM logs WHERE 1=1 GROUP BY 1,2 ORDER BY 1 DESC, 2")
+GROUPS = ["[HVDC] Project Lightning", "Jopetwil 71 Group", "AGI Marine Ops"]
+
+
+def _row(i: int) -> tuple:
+    day = 1 + i % 28
+    return (
+        f"2025-08-{day:02d} {i % 24:02d}:00",
+        GROUPS[i % len(GROUPS)],
+        "High tide paused offloading; resume at 08:00",
+        '["High tide", "AGI"]',
+        int(i % 3 == 0),
+        "[]",
+        f"2025-08-{day:02d}T{i % 24:02d}:{i % 60:02d}:00",
+        str(uuid.uuid4()),
+        "ok",
+    )
+
+
+def seed(path: str, rows: int) -> None:
+    with sqlite3.connect(path) as conn:
+        conn.execute(SCHEMA)
+        conn.executemany(INSERT_SQL, (_row(i) for i in range(rows)))
+
+
+def run(op_write: Callable[[tuple], None], op_latest: Callable[[], None], op_kpi: Callable[[], None],
+        threads: int, ops: int, write_ratio: float) -> dict:
+    latencies: List[float] = []
+    lat_lock = threading.Lock()
+    per_thread = ops // threads
+
+    def worker(tid: int) -> None:
+        rnd = random.Random(tid)
+        local: List[float] = []
+        for i in range(per_thread):
+            t0 = time.perf_counter()
+            r = rnd.random()
+            if r < write_ratio:
+                op_write(_row(tid * per_thread + i))
+            elif r < write_ratio + (1 - write_ratio) * 0.8:
+                op_latest()
+            else:
+                op_kpi()
+            local.append(time.perf_counter() - t0)
+        with lat_lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    ts = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "ops": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "ops_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 3),
+    }
+
+
+def bench_connect_per_call(path: str, args) -> dict:
+    def op_write(row: tuple) -> None:
+        with sqlite3.connect(path, timeout=30) as conn:
+            conn.execute(INSERT_SQL, row)
+            conn.commit()
+
+    def op_latest() -> None:
+        with sqlite3.connect(path, timeout=30) as conn:
+            conn.execute(LATEST_SQL, (10,)).fetchall()
+
+    def op_kpi() -> None:
+        with sqlite3.connect(path, timeout=30) as conn:
+            conn.execute(KPI_SQL).fetchall()
+
+    return run(op_write, op_latest, op_kpi, args.threads, args.ops, args.write_ratio)
+
+
+def bench_pool(path: str, args) -> dict:
+    pool = SQLitePool(path, size=args.threads)
+
+    def op_write(row: tuple) -> None:
+        with pool.write() as conn:
+            conn.execute(INSERT_SQL, row)
+
+    def op_latest() -> None:
+        with pool.connection() as conn:
+            conn.execute(LATEST_SQL, (10,)).fetchall()
+
+    def op_kpi() -> None:
+        with pool.connection() as conn:
+            conn.execute(KPI_SQL).fetchall()
+
+    try:
+        return run(op_write, op_latest, op_kpi, args.threads, args.ops, args.write_ratio)
+    finally:
+        pool.close_all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SQLite connect-per-call vs pooled WAL benchmark")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--seed-rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before_db = os.path.join(tmp, "before.sqlite")
+        after_db = os.path.join(tmp, "after.sqlite")
+        seed(before_db, args.seed_rows)
+        seed(after_db, args.seed_rows)
+
+        before = bench_connect_per_call(before_db, args)
+        after = bench_pool(after_db, args)
+
+    print(f"threads={args.threads} ops={args.ops} write_ratio={args.write_ratio} seed_rows={args.seed_rows}")
+    print(f"{'mode':<22}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, r in (("connect-per-call", before), ("pool (WAL)", after)):
+        print(f"{name:<22}{r['ops_per_sec']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}")
+    print(f"speedup: {after['ops_per_sec'] / before['ops_per_sec']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
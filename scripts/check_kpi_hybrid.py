@@ -0,0 +1,124 @@
+"""
+Hybrid KPI correctness check (KPI_HYBRID=on): DuckDB API rollup up to the pipeline high-water mark
++ SQLite rows after it must equal the SQLite `logs` table at every granularity.
+
+In a throwaway directory (main.py's relative Bronze root, DATA_DIR and DUCKDB_PATH all point there):
+1. ingest rows (same path as POST /logs/batch) and run the Bronze stage (bronze_logs + hybrid rollup + mark)
+2. ingest more rows right away (same created_at second as the mark) and one row whose Bronze record is
+   written only after the pipeline ran (ingest latency) with an older created_at
+3. compare /kpi's hybrid result with the SQLite rollup and the logs row count; run the pipeline again, compare again
+
+Run from repo root:
+  python scripts/check_kpi_hybrid.py --rows 2000
+Exit code 1 on any mismatch.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GROUPS = ["[HVDC] Project Lightning", "Jopetwil 71 Group", "AGI Marine Ops"]
+FILTERS = [{}, {"since": "2025-08-10", "until": "2025-08-20"}, {"group_name": "AGI", "group_match": "prefix"}]
+
+
+def _items(rnd: random.Random, n: int) -> list:
+    return [{"date_gst": f"2025-08-{rnd.randint(1, 28):02d} {rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}",
+             "group_name": rnd.choice(GROUPS), "summary": "Berth 3 offloading", "top_keywords": [rnd.choice("abc")],
+             "sla_breaches": rnd.randint(0, 2)} for _ in range(n)]
+
+
+def _key(metrics) -> list:
+    import arrow_format
+
+    if arrow_format.is_table(metrics):
+        metrics = arrow_format.to_records(metrics)
+    return sorted((m["date"], m["group_name"], m["logs_count"], m["total_sla_breaches"]) for m in metrics)
+
+
+def check(api, label: str) -> bool:
+    with api._sqlite_pool.connection() as conn:
+        total = conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+    ok = True
+    for granularity in ("hour", "day", "week", "month"):
+        for params in FILTERS:
+            args = (params.get("since"), params.get("until"), params.get("group_name"),
+                    params.get("group_match", "exact"), granularity)
+            result, headers = api._compute_kpi(*args)
+            expected = api._kpi_from_sqlite(*args)["metrics"]
+            engine = headers.get("X-KPI-Engine")
+            same = engine == "hybrid" and _key(result["metrics"]) == _key(expected)
+            if not params:
+                counted = sum(m[2] for m in _key(result["metrics"]))
+                same = same and counted == total
+            ok = ok and same
+            if not same:
+                print(f"  {label} {granularity} {json.dumps(params)}: engine={engine} "
+                      f"hybrid={_key(result['metrics'])[:3]} sqlite={_key(expected)[:3]}")
+    result, _ = api._compute_kpi(None, None, None, "exact", "day")
+    print(f"{label:<22} logs={total:<6} hybrid total={sum(m[2] for m in _key(result['metrics'])):<6} "
+          f"tail={result.get('tail_logs_count')!s:<5} net={result.get('tail_net_rows')!s:<5} mark={result.get('high_water_mark')} → {'PASS' if ok else 'FAIL'}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="hybrid KPI (DuckDB + SQLite tail) correctness check")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        import duckdb
+
+        duckdb_path = os.path.join(tmp, "hvdc.duckdb")
+        duckdb.connect(duckdb_path).close()  # DUCKDB_ENABLED 는 import 시 파일 존재로 결정
+        os.environ.update({"DATA_DIR": os.path.join(tmp, "data"), "DUCKDB_PATH": duckdb_path,
+                           "DUCKDB_SERVING_DIR": os.path.join(tmp, "serving"), "KPI_HYBRID": "on",
+                           "KPI_CACHE": "off"})
+        os.chdir(tmp)  # main.py Bronze root (hvdc_logs/bronze) 가 임시 디렉터리 아래로
+        sys.path.insert(0, ROOT)
+        import main as api
+        from hvdc_logs import bronze_stage
+
+        bronze_stage.DUCKDB_FILE = duckdb_path
+        bronze_stage.BRONZE_DIR = str(api.BRONZE_ROOT.absolute())
+
+        def ingest(items):
+            api._ingest_batch(json.dumps(items).encode("utf-8"), "application/json")
+
+        def pipeline():
+            bronze_stage.load_bronze_to_duckdb()
+            api._pipeline_published()
+
+        api._ensure_storage()
+        rnd = random.Random(args.seed)
+        half = max(args.rows // 2, 1)
+        ingest(_items(rnd, half))
+        # Bronze 기록이 늦은 행: SQLite 에는 mark 이전 created_at 으로 들어갔지만 Bronze 는 파이프라인 이후
+        late = dict(_items(rnd, 1)[0], created_at=(datetime.utcnow() - timedelta(seconds=30)).isoformat(timespec="seconds"))
+        api._sqlite_insert_many([late], [api._json_columns(late)])
+        pipeline()
+        ok = check(api, "after pipeline")
+        api.write_bronze_jsonl_many([late])
+        ingest(_items(rnd, args.rows - half))  # 대개 mark 와 같은 초
+        ok = check(api, "after more ingest") and ok
+        pipeline()
+        ok = check(api, "after 2nd pipeline") and ok
+        ingest(_items(rnd, 10))
+        ok = check(api, "after tail ingest") and ok
+        api._duckdb_pool.close()
+        api._bronze_writer.close()
+        api._sqlite_pool.close_all()
+        os.chdir(ROOT)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
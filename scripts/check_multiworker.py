@@ -0,0 +1,191 @@
+"""
+Multi-worker safety check for main.py (uvicorn --workers N 와 같은 조건을 프로세스 N개로 재현).
+
+N processes import main against one temp DATA_DIR and, starting at the same instant:
+- lease : call trigger_hvdc_pipeline_debounced() in a tight loop with a short minimum interval;
+          every worker runs the pipeline scheduler and the pipeline is replaced by a fake run
+          that records start/end times. Passes when no two runs (from any process) overlap and
+          a run started after the last trigger (no dropped work).
+- ingest: POST /logs through the ASGI app with BRONZE_SHARED=on and a small BRONZE_MAX_LINES.
+          Passes when logs.csv has exactly one header and every row intact, and Bronze has
+          every record exactly once with no segment over the line cap.
+
+Run from repo root:
+  python scripts/check_multiworker.py --workers 4 --posts 200
+Exit code 1 on any violation.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAX_LINES = 50
+
+
+def _wait_until(start_at: float):
+    delay = start_at - time.time()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def _worker_lease(args, runs_path: str):
+    import main
+
+    main._pipeline_lease.debounce_secs = args.debounce
+    main._pipeline_lease.retry_secs = 0.0
+    main._pipeline_scheduler.tick_secs = 0.02
+    lock = threading.Lock()
+
+    def fake_pipeline():
+        t0 = time.time()
+        time.sleep(args.run_secs)
+        t1 = time.time()
+        with lock, open(runs_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"pid": os.getpid(), "start": t0, "end": t1}) + "\n")
+
+    main._run_pipeline = fake_pipeline
+    main._startup()
+    main._pipeline_scheduler.start()
+    _wait_until(args.start_at)
+    deadline = time.time() + args.duration
+    last_mark = 0.0
+    while time.time() < deadline:
+        main.trigger_hvdc_pipeline_debounced()
+        last_mark = time.time()
+        time.sleep(0.001)
+    with lock, open(runs_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"pid": os.getpid(), "last_mark": last_mark}) + "\n")
+    # 후속 실행이 끝나 dirty 가 해소될 때까지 대기
+    give_up = time.time() + args.run_secs * 4 + args.debounce + 5
+    while main._pipeline_scheduler.state()["dirty"] and time.time() < give_up:
+        time.sleep(0.05)
+    main._pipeline_scheduler.stop()
+
+
+async def _worker_ingest(args):
+    import httpx
+    import main
+
+    main.trigger_hvdc_pipeline_debounced = lambda: None
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://w") as c:
+            _wait_until(args.start_at)
+            for i in range(args.posts):
+                r = await c.post("/logs", json={
+                    "request_id": str(uuid.uuid4()),
+                    "date_gst": "2025-08-10 10:00",
+                    "group_name": "[HVDC] Project Lightning",
+                    "summary": f"pid={os.getpid()} seq={i} " + "x" * (i % 200),
+                    "top_keywords": ["AGI"],
+                    "sla_breaches": 0,
+                    "attachments": [],
+                })
+                if r.status_code != 200:
+                    raise SystemExit(f"POST failed: {r.status_code} {r.text}")
+
+
+def _spawn(mode: str, tmp: str, args, start_at: float, extra_env: dict) -> list:
+    env = dict(os.environ, DATA_DIR=os.path.join(tmp, "data"), ACCESS_NOTIFY="off",
+               PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""), **extra_env)
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", mode, "--start-at", str(start_at),
+           "--posts", str(args.posts), "--duration", str(args.duration),
+           "--debounce", str(args.debounce), "--run-secs", str(args.run_secs)]
+    return [subprocess.Popen(cmd, cwd=tmp, env=env) for _ in range(args.workers)]
+
+
+def _join(procs: list) -> bool:
+    return all(p.wait() == 0 for p in procs)
+
+
+def check_lease(args) -> bool:
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "data"))
+        runs_path = os.path.join(tmp, "runs.jsonl")
+        procs = _spawn("lease", tmp, args, time.time() + 3.0, {"CHECK_RUNS_PATH": runs_path})
+        if not _join(procs):
+            print("lease : worker failed")
+            return False
+        with open(runs_path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+    runs = sorted((r for r in records if "start" in r), key=lambda r: r["start"])
+    last_mark = max(r["last_mark"] for r in records if "last_mark" in r)
+    overlaps = [(a, b) for a, b in zip(runs, runs[1:]) if b["start"] < a["end"]]
+    pids = {r["pid"] for r in runs}
+    covered = bool(runs) and runs[-1]["start"] >= last_mark
+    ok = bool(runs) and not overlaps and covered
+    print(f"lease : {len(runs)} pipeline runs from {len(pids)} of {args.workers} workers, "
+          f"{len(overlaps)} overlapping, run after last trigger: {covered} → {'PASS' if ok else 'FAIL'}")
+    return ok
+
+
+def check_ingest(args) -> bool:
+    expected = args.workers * args.posts
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "data"))
+        procs = _spawn("ingest", tmp, args, time.time() + 3.0,
+                       {"BRONZE_SHARED": "on", "BRONZE_MAX_LINES": str(MAX_LINES)})
+        if not _join(procs):
+            print("ingest: worker failed")
+            return False
+        with open(os.path.join(tmp, "data", "logs.csv"), newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        headers = sum(1 for r in rows if r and r[0] == "date_gst")
+        bad_rows = sum(1 for r in rows[1:] if len(r) != 9)
+        csv_ok = headers == 1 and len(rows) - 1 == expected and not bad_rows
+
+        segments = sorted(glob.glob(os.path.join(tmp, "hvdc_logs", "bronze", "**", "*.jsonl"), recursive=True))
+        seen, bad_lines, over_cap = [], 0, 0
+        for path in segments:
+            with open(path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            over_cap += len(lines) > MAX_LINES
+            for line in lines:
+                try:
+                    seen.append(json.loads(line)["request_id"])
+                except Exception:
+                    bad_lines += 1
+        bronze_ok = len(seen) == expected and len(set(seen)) == expected and not bad_lines and not over_cap
+    print(f"ingest: csv rows={len(rows) - 1}/{expected} headers={headers} malformed={bad_rows} "
+          f"→ {'PASS' if csv_ok else 'FAIL'}")
+    print(f"        bronze records={len(seen)}/{expected} unique={len(set(seen))} segments={len(segments)} "
+          f"malformed={bad_lines} over_{MAX_LINES}_lines={over_cap} → {'PASS' if bronze_ok else 'FAIL'}")
+    return csv_ok and bronze_ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="cross-process CSV/Bronze/pipeline-lease check")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--posts", type=int, default=200, help="POST /logs per worker")
+    parser.add_argument("--duration", type=float, default=3.0, help="lease: trigger loop seconds")
+    parser.add_argument("--debounce", type=float, default=0.05, help="lease: minimum interval seconds")
+    parser.add_argument("--run-secs", type=float, default=0.2, help="lease: fake pipeline runtime")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--start-at", type=float, default=0.0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker == "lease":
+        _worker_lease(args, os.environ["CHECK_RUNS_PATH"])
+        return
+    if args.worker == "ingest":
+        asyncio.run(_worker_ingest(args))
+        return
+
+    ok = check_lease(args)
+    ok = check_ingest(args) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
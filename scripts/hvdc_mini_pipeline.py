@@ -12,13 +12,18 @@ Requires (WSL):
 from __future__ import annotations
 
 import os
-from glob import glob
+import sys
+import tempfile
 import polars as pl
 import faiss  # type: ignore
 from sentence_transformers import SentenceTransformer
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hvdc_logs.bronze_codec import PLAIN, compression_of, list_segments, write_plain  # noqa: E402
+
 MODEL_NAME = "all-MiniLM-L6-v2"
-BRONZE_GLOB = os.path.join("hvdc_logs", "bronze", "*.jsonl")
+BRONZE_DIR = os.path.join("hvdc_logs", "bronze")
+BRONZE_GLOB = os.path.join(BRONZE_DIR, "*.jsonl")
 PARQUET_OUT = os.path.join("hvdc_logs", "silver", "messages.parquet")
 FAISS_OUT = os.path.join("hvdc_logs", "faiss.idx")
 MAPPING_OUT = os.path.join("hvdc_logs", "mapping.parquet")
@@ -29,29 +34,44 @@ def ensure_dirs() -> None:
     os.makedirs(os.path.dirname(FAISS_OUT), exist_ok=True)
 
 
+def decode_segments(files, tmp_dir: str) -> list[str]:
+    """Decompress gzip/zstd segments to temporary NDJSON files (streamed line by line) so they can be scanned lazily"""
+    out = []
+    for i, p in enumerate(files):
+        target = os.path.join(tmp_dir, f"{i:05d}.jsonl")
+        with open(target, "wb") as f:
+            write_plain(p, f)
+        out.append(target)
+    return out
+
+
 def bronze_to_parquet() -> pl.DataFrame:
-    files = glob(BRONZE_GLOB)
+    files = list_segments(BRONZE_DIR, recursive=False)
     if not files:
         print(f"No bronze files matched: {BRONZE_GLOB}")
-    # Lazy scan NDJSON for scalability
-    ldf = pl.scan_ndjson(BRONZE_GLOB)
-    df = (
-        ldf.with_columns(
-            pl.col("date_gst")
-            .cast(pl.Utf8)
-            .str.strptime(pl.Datetime, fmt="%Y-%m-%d %H:%M", strict=False)
-            .alias("date_gst")
+    plain = [str(p) for p in files if compression_of(p) == PLAIN]
+    packed = [p for p in files if compression_of(p) != PLAIN]
+    with tempfile.TemporaryDirectory(prefix="bronze_ndjson_") as tmp:
+        # Lazy scan NDJSON for scalability; compressed segments are decoded to temp NDJSON first
+        sources = plain + decode_segments(packed, tmp)
+        ldf = pl.scan_ndjson(sources if sources else BRONZE_GLOB)
+        df = (
+            ldf.with_columns(
+                pl.col("date_gst")
+                .cast(pl.Utf8)
+                .str.strptime(pl.Datetime, fmt="%Y-%m-%d %H:%M", strict=False)
+                .alias("date_gst")
+            )
+            .select([
+                pl.col("id").cast(pl.Utf8),
+                pl.col("date_gst"),
+                pl.col("group_name").cast(pl.Utf8),
+                pl.col("sender").cast(pl.Utf8).alias("sender"),
+                pl.col("summary").cast(pl.Utf8).alias("body"),
+                pl.col("sla_breaches").cast(pl.Int64).fill_null(0),
+            ])
+            .collect()
         )
-        .select([
-            pl.col("id").cast(pl.Utf8),
-            pl.col("date_gst"),
-            pl.col("group_name").cast(pl.Utf8),
-            pl.col("sender").cast(pl.Utf8).alias("sender"),
-            pl.col("summary").cast(pl.Utf8).alias("body"),
-            pl.col("sla_breaches").cast(pl.Int64).fill_null(0),
-        ])
-        .collect()
-    )
     # Partition key-friendly date string
     df = df.with_columns(pl.col("date_gst").dt.date().cast(pl.Utf8).alias("date"))
     df.write_parquet(PARQUET_OUT)
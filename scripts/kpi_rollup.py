@@ -0,0 +1,53 @@
+"""
+KPI rollup maintenance for main.py's SQLite store (same DATA_DIR / WHATSAPP_DB_PATH env as the API).
+
+Covers kpi_daily and the hour/week/month rows in kpi_rollup.
+- check  : compare every level against a full GROUP BY over logs (exit 1 on any mismatch)
+- rebuild: recreate all rollups from logs in one transaction (writers wait meanwhile)
+
+Run from repo root:
+  python scripts/kpi_rollup.py check
+  python scripts/kpi_rollup.py rebuild --check
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="KPI rollup check / rebuild")
+    parser.add_argument("command", choices=("check", "rebuild"))
+    parser.add_argument("--check", action="store_true", help="rebuild: run the consistency check afterwards")
+    args = parser.parse_args()
+
+    import main as api
+
+    api._ensure_storage()
+    ok = True
+    if args.command == "rebuild":
+        t0 = time.perf_counter()
+        counts = api.rebuild_kpi_rollups()
+        print(f"rebuild: {json.dumps(counts)} rollup rows in {time.perf_counter() - t0:.3f}s")
+    if args.command == "check" or args.check:
+        t0 = time.perf_counter()
+        result = api.check_kpi_rollups()
+        ok = result["ok"]
+        for granularity, level in result["levels"].items():
+            print(f"check {granularity:<5}: {level['buckets']} (bucket, group) in logs, {level['rollup_rows']} rollup rows, "
+                  f"{level['mismatch_count']} mismatches")
+            for m in level["mismatches"][:20]:
+                print("  " + json.dumps(m, ensure_ascii=False))
+        print(f"check: {time.perf_counter() - t0:.3f}s → {'PASS' if ok else 'FAIL'}")
+    api._sqlite_pool.close_all()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+sqlite_pool.py — main.py 공용 SQLite 커넥션 풀 (WAL)
+
+- 커넥션은 한 번 열어 재사용하고, 열 때 한 번만 PRAGMA 적용
+  (journal_mode=WAL, synchronous=NORMAL, mmap_size, cache_size, busy_timeout)
+- WAL: writer 1개 + reader 다수 동시 진행 (reader 가 writer 에 막히지 않음)
+- prepared statement 재사용: sqlite3 모듈은 커넥션별로 SQL 문자열 단위
+  statement 캐시(cached_statements)를 가지므로, 커넥션을 유지하고 SQL 텍스트를
+  상수로 두면 재컴파일 없이 재사용된다.
+- 쓰기는 프로세스 내 writer lock 으로 직렬화 (BUSY 재시도 대신 대기)
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+
+class SQLitePool:
+    def __init__(self, path: Union[str, Path], size: int = 8, mmap_size: int = 256 * 1024 * 1024,
+                 cache_size_kib: int = 64 * 1024, busy_timeout_ms: int = 5000,
+                 cached_statements: int = 256):
+        self.path = str(path)
+        self.size = max(size, 1)
+        self.mmap_size = mmap_size
+        self.cache_size_kib = cache_size_kib
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        # 음수 = KiB 단위
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)}")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.size:
+                conn = self._connect()
+                self._all.append(conn)
+                return conn
+        return self._idle.get()
+
+    def _release(self, conn: sqlite3.Connection):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """읽기용 커넥션 대여 (반납 시 열린 트랜잭션은 rollback)"""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    @contextmanager
+    def dedicated(self) -> Iterator[sqlite3.Connection]:
+        """풀 밖 읽기 커넥션 (같은 PRAGMA). 스트리밍 export 처럼 오래 걸리는 조회가 풀을 점유하지 않도록"""
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """쓰기 트랜잭션: 정상 종료 시 commit, 예외 시 rollback"""
+        with self._write_lock:
+            with self.connection() as conn:
+                try:
+                    yield conn
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+
+    def close_all(self):
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait()
+                except queue.Empty:
+                    break
+            for conn in self._all:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._all = []
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "size": self.size,
+            "open": len(self._all),
+            "idle": self._idle.qsize(),
+        }